@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+"""Compare Redis memory of legacy and compact anti-spam records.
+
+Usage::
+
+    python -m src.benchmarks.anti_spam_memory --users 100000 --redis-url URL
+
+With a real Redis the ``used_memory`` delta of each layout is reported.
+Without ``--redis-url`` the raw payload bytes (key names, members, fields
+and values) are computed instead, which is a lower bound of real usage.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from typing import Any, Dict, Iterator, List, Tuple
+
+from src.services.signals.anti_spam import AntiSpamManager
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "XRPUSDT", "ADAUSDT"]
+TIMEFRAMES = ["1m", "5m", "15m", "1h"]
+SIGNAL_TYPES = ["rsi_oversold_entry", "rsi_overbought_entry", "ema_death_cross"]
+PREFIX = "bench:"
+_DETAIL_RANDOM = random.Random(7)
+
+
+def generate_load(
+    users: int, keys_per_user: int, sends_per_key: int, now: int
+) -> Iterator[Tuple[int, str, str, str, List[int]]]:
+    """Yield ``(user, symbol, timeframe, signal_type, send_times)`` rows."""
+
+    rnd = random.Random(42)
+    for user_id in range(1, users + 1):
+        for _ in range(keys_per_user):
+            symbol = rnd.choice(SYMBOLS)
+            timeframe = rnd.choice(TIMEFRAMES)
+            signal_type = rnd.choice(SIGNAL_TYPES)
+            times = sorted(now - rnd.randint(0, 86_400) for _ in range(sends_per_key))
+            yield user_id, symbol, timeframe, signal_type, times
+
+
+def legacy_records(
+    row: Tuple[int, str, str, str, List[int]]
+) -> Tuple[str, Dict[str, int]]:
+    """Sorted-set layout used before: one JSON detail member per send."""
+
+    user_id, symbol, timeframe, signal_type, times = row
+    key = f"{PREFIX}signal_history:{user_id}:{symbol}:{timeframe}:{signal_type}"
+    members: Dict[str, int] = {}
+    for ts in times:
+        details: Dict[str, Any] = {
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "signal_type": signal_type,
+            "price": round(_DETAIL_RANDOM.uniform(10, 70_000), 2),
+            "rsi_value": round(_DETAIL_RANDOM.uniform(0, 100), 2),
+            "user_id": user_id,
+            "processing_time_ms": _DETAIL_RANDOM.randint(1, 200),
+            "sent_at": ts,
+        }
+        members[json.dumps(details)] = ts
+    return key, members
+
+
+def compact_record(
+    row: Tuple[int, str, str, str, List[int]], now: int
+) -> Tuple[str, str, str]:
+    """Hash field layout used by :class:`AntiSpamManager`."""
+
+    user_id, symbol, timeframe, signal_type, times = row
+    window = AntiSpamManager.WINDOW
+    window_start = now - now % window
+    current = sum(1 for ts in times if ts >= window_start)
+    previous = sum(1 for ts in times if window_start - window <= ts < window_start)
+    value = f"{times[-1]}:{window_start}:{current}:{previous}"
+    return (
+        f"{PREFIX}{AntiSpamManager._build_key(user_id)}",
+        AntiSpamManager._build_field(symbol, timeframe, signal_type),
+        value,
+    )
+
+
+def estimate_payload_bytes(
+    users: int, keys_per_user: int, sends_per_key: int, now: int
+) -> Dict[str, int]:
+    legacy = 0
+    compact_keys = set()
+    compact = 0
+    for row in generate_load(users, keys_per_user, sends_per_key, now):
+        key, members = legacy_records(row)
+        legacy += len(key) + sum(len(m) + 8 for m in members)
+        hkey, field, value = compact_record(row, now)
+        if hkey not in compact_keys:
+            compact_keys.add(hkey)
+            compact += len(hkey)
+        compact += len(field) + len(value)
+    return {"legacy_bytes": legacy, "compact_bytes": compact}
+
+
+async def measure_redis_memory(
+    url: str, users: int, keys_per_user: int, sends_per_key: int, now: int
+) -> Dict[str, int]:
+    from redis.asyncio import Redis
+
+    redis = Redis.from_url(url, decode_responses=True)
+
+    async def used_memory() -> int:
+        info = await redis.info("memory")
+        return int(info["used_memory"])
+
+    async def drop_prefix() -> None:
+        async for key in redis.scan_iter(match=f"{PREFIX}*", count=1000):
+            await redis.unlink(key)
+
+    async def write(layout: str) -> None:
+        pipeline = redis.pipeline(transaction=False)
+        for idx, row in enumerate(
+            generate_load(users, keys_per_user, sends_per_key, now)
+        ):
+            if layout == "legacy":
+                key, members = legacy_records(row)
+                pipeline.zadd(key, members)
+            else:
+                key, field, value = compact_record(row, now)
+                pipeline.hset(key, field, value)
+            if idx % 5_000 == 0:
+                await pipeline.execute()
+        await pipeline.execute()
+
+    results: Dict[str, int] = {}
+    try:
+        for layout in ("legacy", "compact"):
+            await drop_prefix()
+            before = await used_memory()
+            await write(layout)
+            results[f"{layout}_bytes"] = await used_memory() - before
+    finally:
+        await drop_prefix()
+        await redis.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--keys-per-user", type=int, default=3)
+    parser.add_argument("--sends-per-key", type=int, default=6)
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args()
+    now = 1_700_000_000
+    if args.redis_url:
+        result = asyncio.run(
+            measure_redis_memory(
+                args.redis_url, args.users, args.keys_per_user, args.sends_per_key, now
+            )
+        )
+        result["mode"] = "used_memory"  # type: ignore[assignment]
+    else:
+        result = estimate_payload_bytes(
+            args.users, args.keys_per_user, args.sends_per_key, now
+        )
+        result["mode"] = "payload_estimate"  # type: ignore[assignment]
+    result["reduction"] = round(  # type: ignore[assignment]
+        1 - result["compact_bytes"] / result["legacy_bytes"], 4
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+"""Helpers shared by the benchmark scripts."""
+
+import logging
+import subprocess
+import sys
+from typing import Any, Optional
+
+import structlog
+from redis.asyncio import Redis
+
+
+def quiet_logging() -> None:
+    """Send only warnings and errors to stderr, keeping stdout for reports."""
+
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING),
+        logger_factory=structlog.PrintLoggerFactory(sys.stderr),
+    )
+
+
+def git_commit() -> Optional[str]:
+    """Return the short hash of the checked out commit, if any."""
+
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class RedisOpCounter:
+    """Count commands sent through a Redis client.
+
+    Pipelined commands count one op each but share a single round trip.
+    """
+
+    def __init__(self, client: Redis) -> None:
+        self.ops = 0
+        self.round_trips = 0
+        execute_command = client.execute_command
+        create_pipeline = client.pipeline
+
+        async def counted_command(*args: Any, **options: Any) -> Any:
+            self.ops += 1
+            self.round_trips += 1
+            return await execute_command(*args, **options)
+
+        def counted_pipeline(*args: Any, **kwargs: Any) -> Any:
+            pipeline = create_pipeline(*args, **kwargs)
+            execute = pipeline.execute
+
+            async def counted_execute(*a: Any, **k: Any) -> Any:
+                if pipeline.command_stack:
+                    self.ops += len(pipeline.command_stack)
+                    self.round_trips += 1
+                return await execute(*a, **k)
+
+            pipeline.execute = counted_execute
+            return pipeline
+
+        client.execute_command = counted_command  # type: ignore[method-assign]
+        client.pipeline = counted_pipeline  # type: ignore[method-assign]
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+"""Local fake of the Telegram Bot API ``sendMessage`` method.
+
+Point ``BotConfig.telegram_api_url`` (or an ``AiohttpSession`` with
+``TelegramAPIServer.from_base``) at the server to exercise real delivery
+without touching Telegram. Limits mirror the production ones: a global
+messages-per-second cap and one message per second per chat. Requests over
+either limit get a 429 with ``retry_after`` exactly like the real API.
+
+Usage::
+
+    python -m src.benchmarks.fake_bot_api --port 8081
+"""
+
+import argparse
+import asyncio
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List
+
+from aiohttp import web
+
+
+class FakeBotAPI:
+    """In-process Bot API stub recording every accepted message."""
+
+    def __init__(
+        self,
+        *,
+        global_rate: int = 30,
+        per_chat_interval: float = 1.0,
+        blocked_chats: set[int] | None = None,
+        latency: float = 0.0,
+    ) -> None:
+        self.global_rate = global_rate
+        self.per_chat_interval = per_chat_interval
+        self.blocked_chats = blocked_chats or set()
+        self.latency = latency
+        self.messages: List[Dict[str, Any]] = []
+        self.rejected_429 = 0
+        self._recent: Deque[float] = deque()
+        self._last_by_chat: Dict[int, float] = defaultdict(lambda: float("-inf"))
+        self._message_id = 0
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/sendMessage", self.send_message)
+        return app
+
+    def _too_many(self, retry_after: int) -> web.Response:
+        self.rejected_429 += 1
+        return web.json_response(
+            {
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {retry_after}",
+                "parameters": {"retry_after": retry_after},
+            },
+            status=429,
+        )
+
+    async def send_message(self, request: web.Request) -> web.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        data = await request.post()
+        chat_id = int(data["chat_id"])
+        now = time.monotonic()
+
+        if chat_id in self.blocked_chats:
+            return web.json_response(
+                {
+                    "ok": False,
+                    "error_code": 403,
+                    "description": "Forbidden: bot was blocked by the user",
+                },
+                status=403,
+            )
+
+        while self._recent and now - self._recent[0] >= 1.0:
+            self._recent.popleft()
+        if len(self._recent) >= self.global_rate:
+            return self._too_many(1)
+        if now - self._last_by_chat[chat_id] < self.per_chat_interval:
+            return self._too_many(1)
+
+        self._recent.append(now)
+        self._last_by_chat[chat_id] = now
+        self._message_id += 1
+        text = str(data.get("text", ""))
+        self.messages.append({"chat_id": chat_id, "text": text, "at": now})
+        return web.json_response(
+            {
+                "ok": True,
+                "result": {
+                    "message_id": self._message_id,
+                    "date": int(time.time()),
+                    "chat": {"id": chat_id, "type": "private"},
+                    "text": text,
+                },
+            }
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--global-rate", type=int, default=30)
+    args = parser.parse_args()
+    web.run_app(
+        FakeBotAPI(global_rate=args.global_rate).make_app(),
+        host=args.host,
+        port=args.port,
+    )
+
+
+if __name__ == "__main__":
+    main()
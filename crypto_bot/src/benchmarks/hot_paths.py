@@ -0,0 +1,462 @@
+from __future__ import annotations
+
+"""Micro-benchmarks of the per-candle hot paths.
+
+Usage::
+
+    python -m src.benchmarks.hot_paths --output baseline.json
+    python -m src.benchmarks.hot_paths --baseline baseline.json --threshold 0.25
+
+Each case performs one operation per symbol and is run at 1, 100 and
+1,000 symbols (``--scales``), so per-symbol costs and costs that grow with
+the number of tracked pairs show up separately. The report gives the median
+and best microseconds per operation over ``--repeats`` samples. Redis-backed
+cases use an in-process fakeredis: they measure client-side work (command
+encoding, Lua, reply parsing), not network round trips.
+
+``--baseline`` compares against a report saved earlier on the same machine
+and exits with status 1 if any case got slower than ``--threshold``.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from redis.asyncio import Redis
+
+from src.benchmarks.common import git_commit, quiet_logging
+from src.services.cache.candle_cache import CandleCache
+from src.services.cache.indicator_cache import IndicatorCache
+from src.services.indicators.ema_calculator import EMACalculator
+from src.services.indicators.incremental import create_indicator
+from src.services.indicators.indicator_engine import IndicatorEngine
+from src.services.indicators.rsi_calculator import RSICalculator
+from src.services.notifications.message_formatter import MessageFormatter
+from src.services.signals.anti_spam import AntiSpamManager
+from src.utils.constants import EMA_PERIODS, RSI_WARMUP_PERIODS
+
+Round = Callable[[], Awaitable[None]]
+CaseFactory = Callable[[Redis, List[str]], Awaitable[Round]]
+
+SCALES = (1, 100, 1_000)
+TIMEFRAME = "1m"
+RSI_PERIOD = 14
+ENGINE_SPECS = ("macd:12:26:9", "bollinger:20:2", "atr:14", "vwap", "volume_spike:20")
+USERS_PER_SIGNAL = 10
+# small scales repeat the round until a sample covers this many operations
+MIN_SAMPLE_OPS = 200
+# slowdowns below this many microseconds are treated as noise
+NOISE_FLOOR_US = 0.5
+
+CASES: Dict[str, CaseFactory] = {}
+
+
+def case(name: str) -> Callable[[CaseFactory], CaseFactory]:
+    def register(factory: CaseFactory) -> CaseFactory:
+        CASES[name] = factory
+        return factory
+
+    return register
+
+
+def _price(index: int, step: int) -> float:
+    return 100.0 + index % 97 + (step % 13) * 0.25
+
+
+def _candle(symbol: str, index: int) -> Dict[str, Any]:
+    """A candle shaped like the ones built by ``BinanceDataProcessor``."""
+
+    open_ms = 1_700_000_000_000 + index * 60_000
+    price = Decimal(str(_price(index, index)))
+    return {
+        "symbol": symbol,
+        "timeframe": TIMEFRAME,
+        "open_time": datetime.fromtimestamp(open_ms / 1000, timezone.utc),
+        "close_time": datetime.fromtimestamp((open_ms + 59_999) / 1000, timezone.utc),
+        "open_price": price,
+        "high_price": price,
+        "low_price": price,
+        "close_price": price,
+        "volume": Decimal("12.5"),
+        "is_closed": True,
+    }
+
+
+async def _seed_candles(
+    redis: Redis, symbols: Sequence[str], count: int
+) -> CandleCache:
+    cache = CandleCache(redis, ttl=3_600)
+    pipeline = redis.pipeline(transaction=False)
+    for symbol in symbols:
+        members = {
+            json.dumps({"close_price": _price(i, i * 7)}): 1_700_000_000_000
+            + i * 60_000
+            for i in range(count)
+        }
+        pipeline.zadd(cache._key(symbol, TIMEFRAME), members)
+    await pipeline.execute()
+    return cache
+
+
+@case("rsi_incremental")
+async def _rsi_incremental(redis: Redis, symbols: List[str]) -> Round:
+    calculator = RSICalculator(IndicatorCache(redis), CandleCache(redis))
+    states = [
+        {"avg_gain": 0.5, "avg_loss": 0.4, "previous_price": 100.0} for _ in symbols
+    ]
+    step = 0
+
+    async def run() -> None:
+        nonlocal step
+        step += 1
+        for index, state in enumerate(states):
+            calculator.update_rsi_incremental(state, _price(index, step), RSI_PERIOD)
+
+    return run
+
+
+@case("rsi_real_time")
+async def _rsi_real_time(redis: Redis, symbols: List[str]) -> Round:
+    candle_cache = await _seed_candles(
+        redis, symbols, RSI_PERIOD * RSI_WARMUP_PERIODS + 1
+    )
+    calculator = RSICalculator(IndicatorCache(redis), candle_cache)
+    step = 0
+
+    async def run() -> None:
+        nonlocal step
+        step += 1
+        for index, symbol in enumerate(symbols):
+            await calculator.calculate_real_time_rsi(
+                symbol, TIMEFRAME, _price(index, step), RSI_PERIOD
+            )
+
+    return run
+
+
+@case("rsi_preview")
+async def _rsi_preview(redis: Redis, symbols: List[str]) -> Round:
+    candle_cache = await _seed_candles(
+        redis, symbols, RSI_PERIOD * RSI_WARMUP_PERIODS + 1
+    )
+    calculator = RSICalculator(IndicatorCache(redis), candle_cache)
+    step = 0
+
+    async def run() -> None:
+        nonlocal step
+        step += 1
+        for index, symbol in enumerate(symbols):
+            await calculator.calculate_real_time_rsi(
+                symbol, TIMEFRAME, _price(index, step), RSI_PERIOD, is_closed=False
+            )
+
+    return run
+
+
+@case("rsi_recompute")
+async def _rsi_recompute(redis: Redis, symbols: List[str]) -> Round:
+    candle_cache = await _seed_candles(
+        redis, symbols, RSI_PERIOD * RSI_WARMUP_PERIODS + 1
+    )
+    calculator = RSICalculator(IndicatorCache(redis), candle_cache)
+
+    async def run() -> None:
+        for symbol in symbols:
+            await calculator.calculate_rsi(symbol, TIMEFRAME, RSI_PERIOD)
+
+    return run
+
+
+@case("ema_incremental")
+async def _ema_incremental(redis: Redis, symbols: List[str]) -> Round:
+    calculator = EMACalculator(IndicatorCache(redis), CandleCache(redis))
+    values = [[100.0] * len(EMA_PERIODS) for _ in symbols]
+    step = 0
+
+    async def run() -> None:
+        nonlocal step
+        step += 1
+        for index, emas in enumerate(values):
+            price = _price(index, step)
+            for slot, period in enumerate(EMA_PERIODS):
+                emas[slot] = calculator.update_ema_incremental(
+                    emas[slot], price, period
+                )
+
+    return run
+
+
+@case("ema_real_time")
+async def _ema_real_time(redis: Redis, symbols: List[str]) -> Round:
+    candle_cache = await _seed_candles(redis, symbols, max(EMA_PERIODS) * 2)
+    calculator = EMACalculator(IndicatorCache(redis, ttl=3_600), candle_cache)
+    step = 0
+
+    async def run() -> None:
+        nonlocal step
+        step += 1
+        for index, symbol in enumerate(symbols):
+            await calculator.calculate_multiple_ema_real_time(
+                symbol, TIMEFRAME, _price(index, step), EMA_PERIODS
+            )
+
+    return run
+
+
+@case("ema_recompute")
+async def _ema_recompute(redis: Redis, symbols: List[str]) -> Round:
+    period = max(EMA_PERIODS)
+    candle_cache = await _seed_candles(redis, symbols, period * 2)
+    calculator = EMACalculator(IndicatorCache(redis), candle_cache)
+
+    async def run() -> None:
+        for symbol in symbols:
+            await calculator.calculate_ema(symbol, TIMEFRAME, period)
+
+    return run
+
+
+@case("indicator_engine")
+async def _indicator_engine(redis: Redis, symbols: List[str]) -> Round:
+    engine = IndicatorEngine(
+        IndicatorCache(redis),
+        await _seed_candles(redis, symbols, 200),
+        [create_indicator(spec) for spec in ENGINE_SPECS],
+    )
+    # the first round seeds every symbol; timed rounds fold one candle each
+    for symbol in symbols:
+        await engine.update(symbol, TIMEFRAME, _candle(symbol, 200))
+    step = 200
+
+    async def run() -> None:
+        nonlocal step
+        step += 1
+        for symbol in symbols:
+            await engine.update(symbol, TIMEFRAME, _candle(symbol, step))
+
+    return run
+
+
+@case("indicator_state_serialize")
+async def _indicator_state_serialize(redis: Redis, symbols: List[str]) -> Round:
+    states = [
+        {
+            "avg_gain": 0.51234,
+            "avg_loss": 0.40321,
+            "previous_price": _price(index, 0),
+            "period": RSI_PERIOD,
+            "last_update": "2024-01-01T00:00:00+00:00",
+        }
+        for index in range(len(symbols))
+    ]
+
+    async def run() -> None:
+        for state in states:
+            IndicatorCache._deserialize(IndicatorCache._serialize(state))
+
+    return run
+
+
+@case("indicator_state_roundtrip")
+async def _indicator_state_roundtrip(redis: Redis, symbols: List[str]) -> Round:
+    cache = IndicatorCache(redis, ttl=3_600, state_ttl=3_600)
+    state = {"avg_gain": 0.51234, "avg_loss": 0.40321, "previous_price": 101.5}
+
+    async def run() -> None:
+        for symbol in symbols:
+            await cache.save_calculation_state(
+                "rsi", symbol, TIMEFRAME, RSI_PERIOD, state
+            )
+            await cache.get_calculation_state("rsi", symbol, TIMEFRAME, RSI_PERIOD)
+
+    return run
+
+
+@case("candle_cache_write")
+async def _candle_cache_write(redis: Redis, symbols: List[str]) -> Round:
+    cache = await _seed_candles(redis, symbols, 50)
+    step = 0
+
+    async def run() -> None:
+        nonlocal step
+        step += 1
+        for symbol in symbols:
+            await cache.add_new_candle(symbol, TIMEFRAME, _candle(symbol, 50 + step))
+
+    return run
+
+
+@case("candle_cache_read")
+async def _candle_cache_read(redis: Redis, symbols: List[str]) -> Round:
+    cache = await _seed_candles(redis, symbols, 100)
+
+    async def run() -> None:
+        for symbol in symbols:
+            await cache.get_recent_prices(symbol, TIMEFRAME, limit=50)
+
+    return run
+
+
+@case("anti_spam_check")
+async def _anti_spam_check(redis: Redis, symbols: List[str]) -> Round:
+    manager = AntiSpamManager(redis)
+
+    async def run() -> None:
+        for index, symbol in enumerate(symbols):
+            await manager.can_send_signal(
+                index, symbol, TIMEFRAME, "rsi_oversold_entry"
+            )
+
+    return run
+
+
+@case("anti_spam_fanout")
+async def _anti_spam_fanout(redis: Redis, symbols: List[str]) -> Round:
+    manager = AntiSpamManager(redis)
+    users = list(range(USERS_PER_SIGNAL))
+
+    async def run() -> None:
+        # a critical signal skips the local decision cache: the Lua script
+        # runs every time
+        for symbol in symbols:
+            await manager.filter_allowed_users(
+                users, symbol, TIMEFRAME, "rsi_strong_oversold", rsi_value=10.0
+            )
+
+    return run
+
+
+@case("message_render")
+async def _message_render(redis: Redis, symbols: List[str]) -> Round:
+    formatter = MessageFormatter()
+    step = 0
+
+    async def run() -> None:
+        nonlocal step
+        step += 1
+        for index, symbol in enumerate(symbols):
+            signal = {
+                "symbol": symbol,
+                "timeframe": TIMEFRAME,
+                "signal_type": "rsi_oversold_entry",
+                "price": _price(index, step) + step,  # a new price: no cache hit
+                "rsi_value": 28.5,
+                "processing_time_ms": 3.2,
+            }
+            formatter.render_signal(signal, "en").for_user()
+
+    return run
+
+
+async def run_case(factory: CaseFactory, scale: int, repeats: int) -> Dict[str, float]:
+    """Return median and best microseconds per operation of one case."""
+
+    from fakeredis import FakeAsyncRedis
+
+    redis = FakeAsyncRedis(decode_responses=True)
+    try:
+        symbols = [f"SYM{index}USDT" for index in range(scale)]
+        run = await factory(redis, symbols)
+        await run()  # fill caches and lazily created state
+        rounds = max(1, MIN_SAMPLE_OPS // scale)
+        samples: List[float] = []
+        for _ in range(repeats):
+            start = time.perf_counter_ns()
+            for _ in range(rounds):
+                await run()
+            samples.append((time.perf_counter_ns() - start) / (rounds * scale) / 1_000)
+    finally:
+        await redis.aclose()
+    return {
+        "us_per_op": round(statistics.median(samples), 3),
+        "best_us_per_op": round(min(samples), 3),
+    }
+
+
+async def run_suite(
+    cases: Optional[Sequence[str]] = None,
+    scales: Sequence[int] = SCALES,
+    repeats: int = 5,
+) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for name in cases or CASES:
+        results[name] = {
+            str(scale): await run_case(CASES[name], scale, repeats) for scale in scales
+        }
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "created_at": int(time.time()),
+        "repeats": repeats,
+        "results": results,
+    }
+
+
+def compare_reports(
+    report: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.25
+) -> List[Dict[str, Any]]:
+    """Return cases of ``report`` slower than in ``baseline``.
+
+    A case regresses when its median grew by more than ``threshold``
+    (relative) and by more than :data:`NOISE_FLOOR_US`. Cases or scales
+    missing from the baseline are skipped.
+    """
+
+    regressions: List[Dict[str, Any]] = []
+    for name, scales in report.get("results", {}).items():
+        for scale, stats in scales.items():
+            previous = baseline.get("results", {}).get(name, {}).get(scale)
+            if previous is None:
+                continue
+            delta = stats["us_per_op"] - previous["us_per_op"]
+            if delta > NOISE_FLOOR_US and delta > threshold * previous["us_per_op"]:
+                regressions.append(
+                    {
+                        "case": name,
+                        "scale": int(scale),
+                        "baseline_us": previous["us_per_op"],
+                        "current_us": stats["us_per_op"],
+                    }
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cases", default=None, help="comma separated; default: all")
+    parser.add_argument("--scales", default=",".join(map(str, SCALES)))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", default=None, help="also write the report here")
+    parser.add_argument("--baseline", default=None, help="report to compare with")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args()
+
+    quiet_logging()
+    cases = args.cases.split(",") if args.cases else None
+    unknown = set(cases or ()) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+    scales = [int(scale) for scale in args.scales.split(",")]
+    report = asyncio.run(run_suite(cases, scales, args.repeats))
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        report["regressions"] = compare_reports(report, baseline, args.threshold)
+        report["baseline_commit"] = baseline.get("commit")
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    print(text)
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+"""Event-loop lag during a bulk indicator warm-up, inline vs process pool.
+
+Usage::
+
+    python -m src.benchmarks.indicator_warmup --pairs 500 --bars 2000
+
+For every pair RSI(14) and EMA(20/50/100/200) are seeded from ``--bars``
+synthetic prices while :class:`EventLoopMonitor` probes the loop every
+5 ms. The report gives wall time and the loop lag seen by other tasks.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from typing import Any, Dict, List
+
+from src.services.indicators.indicator_executor import IndicatorExecutor, IndicatorJob
+from src.services.monitoring.loop_monitor import LOOP_LAG_OPERATION, EventLoopMonitor
+from src.services.real_time.performance_monitor import PerformanceMonitor
+from src.utils.constants import EMA_PERIODS
+from src.utils.metrics_registry import metrics_registry
+from src.utils.time_helpers import get_high_precision_timestamp, get_time_since_ms
+
+
+def make_jobs(pairs: int, bars: int) -> List[IndicatorJob]:
+    rnd = random.Random(3)
+    jobs: List[IndicatorJob] = []
+    for index in range(pairs):
+        price = 100.0
+        prices = []
+        for _ in range(bars):
+            price *= 1 + rnd.gauss(0, 0.002)
+            prices.append(price)
+        symbol = f"PAIR{index}USDT"
+        jobs.append(IndicatorJob("rsi", symbol, "1m", 14, prices))
+        jobs.extend(
+            IndicatorJob("ema", symbol, "1m", period, prices) for period in EMA_PERIODS
+        )
+    return jobs
+
+
+async def measure(
+    executor: IndicatorExecutor, jobs: List[IndicatorJob]
+) -> Dict[str, Any]:
+    performance = PerformanceMonitor()
+    monitor = EventLoopMonitor(performance, interval_ms=5, slow_callback_ms=1_000)
+    # the lag histogram is process-wide; start each run from zero
+    metrics_registry.histogram(
+        "operation_ms", {"operation": LOOP_LAG_OPERATION}
+    ).reset()
+    await monitor.start()
+    await asyncio.sleep(0.05)
+    start = get_high_precision_timestamp()
+    await executor.run(jobs)
+    wall_ms = get_time_since_ms(start)
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+    stats = monitor.get_stats()
+    return {
+        "wall_ms": round(wall_ms, 1),
+        "loop_lag_p99_ms": round(stats.get("p99_ms", 0.0), 2),
+        "loop_lag_max_ms": round(stats.get("max_ms", 0.0), 2),
+    }
+
+
+async def run(pairs: int, bars: int, workers: int | None) -> Dict[str, Any]:
+    jobs = make_jobs(pairs, bars)
+    inline = await measure(IndicatorExecutor(), jobs)
+    executor = IndicatorExecutor(max_workers=workers, min_offload_prices=0)
+    await executor.start()
+    try:
+        pooled = await measure(executor, jobs)
+    finally:
+        await executor.shutdown()
+    return {
+        "pairs": pairs,
+        "bars": bars,
+        "jobs": len(jobs),
+        "workers": executor.max_workers,
+        "inline": inline,
+        "pool": pooled,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pairs", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.pairs, args.bars, args.workers)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
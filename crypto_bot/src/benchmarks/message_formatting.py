@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+"""Measure message formatting cost per signal fan-out.
+
+Compares formatting the message for every recipient (the old path) with
+rendering once per (signal, locale) through the render cache.
+
+Usage::
+
+    python -m src.benchmarks.message_formatting --recipients 10000
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Dict, List
+
+from src.services.notifications.message_formatter import MessageFormatter
+
+LOCALES = ["en", "ru"]
+
+
+def _signal(index: int) -> Dict[str, Any]:
+    return {
+        "symbol": "BTCUSDT",
+        "timeframe": "1m",
+        "signal_type": "rsi_oversold_entry",
+        "rsi_value": 24.5,
+        "price": 43_000.0 + index,
+        "processing_time_ms": 42,
+    }
+
+
+def per_recipient(signal: Dict[str, Any], recipients: int) -> List[str]:
+    formatter = MessageFormatter()
+    return [
+        formatter.format_real_time_signal_message(signal) for _ in range(recipients)
+    ]
+
+
+def render_once(
+    formatter: MessageFormatter, signal: Dict[str, Any], recipients: int
+) -> List[str]:
+    rendered = [formatter.render_signal(signal, locale) for locale in LOCALES]
+    return [
+        rendered[user_id % len(LOCALES)].for_user() for user_id in range(recipients)
+    ]
+
+
+def run(recipients: int, fanouts: int) -> Dict[str, float]:
+    formatter = MessageFormatter()
+    started = time.perf_counter()
+    for idx in range(fanouts):
+        per_recipient(_signal(idx), recipients)
+    naive_ms = (time.perf_counter() - started) * 1000 / fanouts
+
+    started = time.perf_counter()
+    for idx in range(fanouts):
+        render_once(formatter, _signal(idx), recipients)
+    cached_ms = (time.perf_counter() - started) * 1000 / fanouts
+
+    return {
+        "recipients": recipients,
+        "per_recipient_ms_per_fanout": round(naive_ms, 3),
+        "render_once_ms_per_fanout": round(cached_ms, 3),
+        "speedup": round(naive_ms / cached_ms, 2) if cached_ms else 0.0,
+        "renders_per_fanout": len(LOCALES),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recipients", type=int, default=10_000)
+    parser.add_argument("--fanouts", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.recipients, args.fanouts), indent=2))
+
+
+if __name__ == "__main__":
+    main()
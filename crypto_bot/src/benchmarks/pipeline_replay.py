@@ -0,0 +1,505 @@
+from __future__ import annotations
+
+"""Replay recorded or synthetic Binance kline streams through the pipeline.
+
+Usage::
+
+    python -m src.benchmarks.pipeline_replay --symbols 50 --candles 300
+    python -m src.benchmarks.pipeline_replay --recording klines.jsonl --speed 10 \\
+        --output report.json --compare baseline.json
+
+Every message enters :meth:`BinanceWebSocketClient.handle_message` as the
+raw text frame and runs through :class:`BinanceDataProcessor`, the candle
+cache, RSI/EMA updates, signal generation, anti-spam and the notification
+queue; each closed candle gets its own database session, as in the compute
+role. Redis is fakeredis unless ``--redis-url`` is given and the database
+a temporary SQLite file unless ``--database-url`` is. Point them at scratch
+instances only: the run creates tables and subscribers and leaves keys
+behind.
+
+A recording holds one WebSocket text frame per line, as received (combined
+``{"stream": ..., "data": ...}`` or a bare kline event). Messages are paced
+by their event time ``E`` divided by ``--speed``; ``--speed 0`` replays as
+fast as possible.
+
+The report is JSON: throughput, ``pipeline_stage_ms`` percentiles, event
+loop lag, RSS growth and Redis commands per message. ``--compare`` checks
+it against an earlier report and exits with status 1 when a metric got
+worse by more than ``--threshold``.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import psutil
+from redis.asyncio import Redis
+
+from src.benchmarks.common import RedisOpCounter, git_commit, quiet_logging
+from src.utils.logger import LoggerMixin
+from src.utils.time_helpers import (
+    get_high_precision_timestamp,
+    get_time_since_ms,
+    timeframe_to_milliseconds,
+)
+from src.utils.tracing import tracer
+
+# (event time ms, raw text frame)
+ReplayMessage = Tuple[int, str]
+
+SEED_USER_ID = 9_000_000_000
+WARMUP_FRACTION = 0.1
+# stages measured against the exchange clock mean nothing for old recordings
+EXCHANGE_RELATIVE_STAGES = {"exchange_to_receive", "exchange_to_delivery"}
+# report path -> (1 if a higher value is worse, -1 if a lower one is; noise floor)
+COMPARED_METRICS = {
+    "throughput.messages_per_s": (-1, 0.0),
+    "redis.ops_per_message": (1, 0.0),
+    "redis.round_trips_per_message": (1, 0.0),
+    "loop_lag.p99_ms": (1, 2.0),
+    "memory.growth_after_warmup_mb": (1, 5.0),
+}
+COMPARED_STAGE_PERCENTILES = ("p50_ms", "p99_ms")
+STAGE_NOISE_FLOOR_MS = 0.5
+
+
+def synthetic_stream(
+    symbols: int,
+    candles: int,
+    *,
+    timeframe: str = "1m",
+    updates_per_candle: int = 3,
+    seed: int = 7,
+    start_ms: int = 1_700_000_000_000,
+) -> List[ReplayMessage]:
+    """Return combined-stream kline frames for random-walk prices.
+
+    Every candle gets ``updates_per_candle - 1`` open updates spread over
+    its interval and one closing update; symbols are interleaved the way a
+    combined stream delivers them.
+    """
+
+    rnd = random.Random(seed)
+    interval = timeframe_to_milliseconds(timeframe)
+    updates = max(updates_per_candle, 1)
+    names = [f"SYM{index}USDT" for index in range(symbols)]
+    prices = {name: 100.0 * (1 + index) for index, name in enumerate(names)}
+    messages: List[ReplayMessage] = []
+    for candle in range(candles):
+        open_ms = start_ms + candle * interval
+        opens = dict(prices)
+        for update in range(1, updates + 1):
+            event_ms = (
+                open_ms + interval * update // updates - (1 if update == updates else 0)
+            )
+            closed = update == updates
+            for name in names:
+                prices[name] *= 1 + rnd.gauss(0, 0.003)
+                price = prices[name]
+                kline = {
+                    "t": open_ms,
+                    "T": open_ms + interval - 1,
+                    "s": name,
+                    "i": timeframe,
+                    "o": f"{opens[name]:.8f}",
+                    "c": f"{price:.8f}",
+                    "h": f"{max(opens[name], price):.8f}",
+                    "l": f"{min(opens[name], price):.8f}",
+                    "v": f"{rnd.uniform(1, 100):.4f}",
+                    "x": closed,
+                }
+                data = {"e": "kline", "E": event_ms, "s": name, "k": kline}
+                frame = {"stream": f"{name.lower()}@kline_{timeframe}", "data": data}
+                messages.append((event_ms, json.dumps(frame)))
+    return messages
+
+
+def load_recording(path: str | Path) -> List[ReplayMessage]:
+    """Read a recording of raw WebSocket frames, one per line."""
+
+    messages: List[ReplayMessage] = []
+    previous = 0
+    with Path(path).open() as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            data = json.loads(line)
+            payload = data.get("data", data)
+            event_ms = payload.get("E") or payload.get("k", {}).get("T") or previous
+            previous = event_ms
+            messages.append((int(event_ms), line))
+    return messages
+
+
+def stream_pairs(messages: Iterable[ReplayMessage]) -> Dict[str, set[str]]:
+    """Return the timeframes seen for every symbol in ``messages``."""
+
+    pairs: Dict[str, set[str]] = {}
+    for _, raw in messages:
+        data = json.loads(raw)
+        kline = data.get("data", data).get("k")
+        if kline:
+            pairs.setdefault(kline["s"], set()).add(kline["i"])
+    return pairs
+
+
+class SessionPipeline(LoggerMixin):
+    """Run the real-time processor with a database session per candle.
+
+    Takes the place of :class:`RealTimeProcessor` in
+    :class:`BinanceDataProcessor`, which fires closed candles off as tasks;
+    :meth:`wait_idle` lets the replay wait for the last of them.
+    """
+
+    def __init__(self, processor: Any, sessionmaker: Any) -> None:  # noqa: D401 - short
+        super().__init__()
+        self.processor = processor
+        self.sessionmaker = sessionmaker
+        self.processed = 0
+        self.signals = 0
+        self.errors: Counter[str] = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def process_websocket_data(self, candle: Dict[str, Any]) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self._idle.clear()
+        try:
+            async with self.sessionmaker() as session:
+                result = await self.processor.process_websocket_data(candle, session)
+                await session.commit()
+            self.processed += 1
+            self.signals += result["signals"]
+        except Exception as exc:  # noqa: BLE001 - counted in the report
+            if type(exc).__name__ not in self.errors:
+                self.logger.error("replay_candle_failed", error=repr(exc))
+            self.errors[type(exc).__name__] += 1
+        finally:
+            self.in_flight -= 1
+            if not self.in_flight:
+                self._idle.set()
+
+    async def wait_idle(self) -> None:
+        # tasks created by the last message have not started yet
+        await asyncio.sleep(0)
+        while self.in_flight:
+            await self._idle.wait()
+            await asyncio.sleep(0)
+
+
+async def seed_subscribers(
+    sessionmaker: Any, pairs: Dict[str, set[str]], users_per_pair: int
+) -> int:
+    """Create tables and ``users_per_pair`` subscribers per symbol/timeframe."""
+
+    from src.data.database import Base
+    from src.data.models import Pair, User, UserPair
+
+    async with sessionmaker() as session:
+        connection = await session.connection()
+        await connection.run_sync(Base.metadata.create_all)
+        user_id = SEED_USER_ID
+        for symbol, timeframes in sorted(pairs.items()):
+            pair = Pair(
+                symbol=symbol, base_asset=symbol[:-4] or symbol, quote_asset=symbol[-4:]
+            )
+            session.add(pair)
+            await session.flush()
+            for timeframe in sorted(timeframes):
+                for _ in range(users_per_pair):
+                    user_id += 1
+                    session.add(User(id=user_id, language_code="en"))
+                    await session.flush()
+                    session.add(
+                        UserPair(
+                            user_id=user_id,
+                            pair_id=pair.id,
+                            timeframes={timeframe: True},
+                        )
+                    )
+        await session.commit()
+    return user_id - SEED_USER_ID
+
+
+def _rss_mb() -> float:
+    return psutil.Process().memory_info().rss / 1024 / 1024
+
+
+async def replay(
+    messages: Sequence[ReplayMessage],
+    *,
+    speed: float = 0.0,
+    redis: Optional[Redis] = None,
+    database_url: Optional[str] = None,
+    users_per_pair: int = 1,
+) -> Dict[str, Any]:
+    """Replay ``messages`` through the full pipeline and return the report."""
+
+    from fakeredis import FakeAsyncRedis
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from src.config.binance_config import get_binance_config
+    from src.data import redis_client
+    from src.services.cache.candle_cache import CandleCache
+    from src.services.cache.indicator_cache import IndicatorCache
+    from src.services.indicators.ema_calculator import EMACalculator
+    from src.services.indicators.rsi_calculator import RSICalculator
+    from src.services.monitoring.loop_monitor import (
+        LOOP_LAG_OPERATION,
+        EventLoopMonitor,
+    )
+    from src.services.notifications.notification_queue import NotificationQueue
+    from src.services.real_time.performance_monitor import PerformanceMonitor
+    from src.services.real_time.real_time_processor import RealTimeProcessor
+    from src.services.signals.ema_signals import EMASignalGenerator
+    from src.services.signals.rsi_signals import RSISignalGenerator
+    from src.services.signals.signal_aggregator import SignalAggregator
+    from src.services.websocket.binance_data_processor import BinanceDataProcessor
+    from src.services.websocket.binance_websocket import BinanceWebSocketClient
+    from src.utils.metrics_registry import metrics_registry
+
+    owns_redis = redis is None
+    client: Redis = (
+        redis if redis is not None else FakeAsyncRedis(decode_responses=True)
+    )
+    # anti-spam and other lazily connected services use the global client
+    previous_client = redis_client._redis
+    redis_client.set_redis(client)
+    scratch = tempfile.TemporaryDirectory() if database_url is None else None
+    if scratch is not None:
+        # not :memory:, which would be a single connection shared by all sessions
+        database_url = f"sqlite+aiosqlite:///{scratch.name}/replay.db"
+    engine = create_async_engine(database_url)
+    sessionmaker = async_sessionmaker(bind=engine, expire_on_commit=False)
+    try:
+        subscribers = await seed_subscribers(
+            sessionmaker, stream_pairs(messages), users_per_pair
+        )
+        candle_cache = CandleCache(client)
+        indicator_cache = IndicatorCache(client)
+        queue = NotificationQueue(client)
+        performance = PerformanceMonitor()
+        processor = RealTimeProcessor(
+            RSICalculator(indicator_cache, candle_cache),
+            EMACalculator(indicator_cache, candle_cache),
+            performance,
+            SignalAggregator(RSISignalGenerator(queue=queue), EMASignalGenerator()),
+        )
+        pipeline = SessionPipeline(processor, sessionmaker)
+        websocket = BinanceWebSocketClient(
+            get_binance_config(),
+            message_handler=BinanceDataProcessor(
+                candle_cache, pipeline
+            ).process_websocket_message,
+        )
+        counter = RedisOpCounter(client)
+        monitor = EventLoopMonitor(performance, interval_ms=10, slow_callback_ms=1_000)
+
+        tracer.reset()
+        metrics_registry.histogram(
+            "operation_ms", {"operation": LOOP_LAG_OPERATION}
+        ).reset()
+        gc.collect()
+        rss_start = rss_warm = _rss_mb()
+        warmup = max(1, int(len(messages) * WARMUP_FRACTION))
+        schedule_lag_ms = 0.0
+        await monitor.start()
+        loop = asyncio.get_running_loop()
+        first_event = messages[0][0] if messages else 0
+        loop_start = loop.time()
+        start = get_high_precision_timestamp()
+        for index, (event_ms, raw) in enumerate(messages):
+            if speed > 0:
+                due = loop_start + (event_ms - first_event) / 1000 / speed
+                delay = due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    schedule_lag_ms = max(schedule_lag_ms, -delay * 1000)
+            await websocket.handle_message(raw)
+            if index + 1 == warmup:
+                rss_warm = _rss_mb()
+        await pipeline.wait_idle()
+        wall_ms = get_time_since_ms(start)
+        await monitor.stop()
+        gc.collect()
+        rss_end = _rss_mb()
+        loop_lag = monitor.get_stats()
+        notifications = await queue.get_real_time_queue_size()
+    finally:
+        redis_client.set_redis(previous_client)
+        await engine.dispose()
+        if scratch is not None:
+            scratch.cleanup()
+        if owns_redis:
+            await client.aclose()
+
+    count = max(len(messages), 1)
+    closed = pipeline.processed + sum(pipeline.errors.values())
+    stages = {
+        stage: {key: round(value, 3) for key, value in stats.items()}
+        for stage, stats in tracer.get_stage_stats().items()
+        if stage not in EXCHANGE_RELATIVE_STAGES
+    }
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "created_at": int(time.time()),
+        "config": {
+            "speed": speed,
+            "database": engine.url.get_backend_name(),
+            "redis": "fakeredis" if owns_redis else "redis",
+            "subscribers": subscribers,
+        },
+        "messages": len(messages),
+        "closed_candles": closed,
+        "candles_failed": dict(pipeline.errors),
+        "signals": pipeline.signals,
+        "notifications_queued": notifications,
+        "throughput": {
+            "wall_ms": round(wall_ms, 1),
+            "messages_per_s": round(len(messages) / (wall_ms / 1000), 1)
+            if wall_ms
+            else 0.0,
+            "closed_candles_per_s": round(closed / (wall_ms / 1000), 1)
+            if wall_ms
+            else 0.0,
+            "schedule_lag_max_ms": round(schedule_lag_ms, 1),
+            "max_candles_in_flight": pipeline.max_in_flight,
+        },
+        "stages": stages,
+        "loop_lag": {
+            key: round(loop_lag.get(key, 0.0), 3)
+            for key in ("p50_ms", "p99_ms", "max_ms")
+        },
+        "memory": {
+            "rss_start_mb": round(rss_start, 1),
+            "rss_end_mb": round(rss_end, 1),
+            "growth_mb": round(rss_end - rss_start, 1),
+            "growth_after_warmup_mb": round(rss_end - rss_warm, 1),
+        },
+        "redis": {
+            "ops": counter.ops,
+            "round_trips": counter.round_trips,
+            "ops_per_message": round(counter.ops / count, 2),
+            "round_trips_per_message": round(counter.round_trips / count, 2),
+            "ops_per_closed_candle": round(counter.ops / max(closed, 1), 2),
+        },
+    }
+
+
+def _lookup(report: Dict[str, Any], path: str) -> Optional[float]:
+    value: Any = report
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+def compare_reports(
+    report: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.1
+) -> List[Dict[str, Any]]:
+    """Return the metrics of ``report`` that are worse than ``baseline``.
+
+    A metric regresses when it moved in its bad direction by more than
+    ``threshold`` (relative) and by more than its noise floor (absolute).
+    Metrics missing from either report are skipped. Only reports of the
+    same stream replayed at the same speed are comparable.
+    """
+
+    metrics = dict(COMPARED_METRICS)
+    for stage in report.get("stages", {}):
+        for percentile in COMPARED_STAGE_PERCENTILES:
+            metrics[f"stages.{stage}.{percentile}"] = (1, STAGE_NOISE_FLOOR_MS)
+    regressions: List[Dict[str, Any]] = []
+    for path, (direction, floor) in metrics.items():
+        current = _lookup(report, path)
+        previous = _lookup(baseline, path)
+        if current is None or previous is None:
+            continue
+        delta = (current - previous) * direction
+        if delta > floor and delta > threshold * abs(previous):
+            regressions.append(
+                {"metric": path, "baseline": previous, "current": current}
+            )
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.recording:
+        messages = load_recording(args.recording)
+    else:
+        messages = synthetic_stream(
+            args.symbols, args.candles, updates_per_candle=args.updates_per_candle
+        )
+    redis = None
+    if args.redis_url:
+        from redis.asyncio import Redis as RedisClient
+
+        redis = RedisClient.from_url(args.redis_url, decode_responses=True)
+    try:
+        return await replay(
+            messages,
+            speed=args.speed,
+            redis=redis,
+            database_url=args.database_url,
+            users_per_pair=args.users_per_pair,
+        )
+    finally:
+        if redis is not None:
+            await redis.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--recording", help="file with one raw WebSocket frame per line"
+    )
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--candles", type=int, default=200)
+    parser.add_argument("--updates-per-candle", type=int, default=3)
+    parser.add_argument(
+        "--speed", type=float, default=0.0, help="1 = real time, 0 = max"
+    )
+    parser.add_argument("--users-per-pair", type=int, default=1)
+    parser.add_argument("--redis-url", default=None)
+    parser.add_argument(
+        "--database-url", default=None, help="default: temporary SQLite file"
+    )
+    parser.add_argument("--output", default=None)
+    parser.add_argument(
+        "--compare", default=None, help="baseline report to compare with"
+    )
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    quiet_logging()
+    report = asyncio.run(run(args))
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        report["regressions"] = compare_reports(report, baseline, args.threshold)
+        report["baseline_commit"] = baseline.get("commit")
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    print(text)
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+"""Measure the per-call overhead of the timing decorators.
+
+Usage::
+
+    python -m src.benchmarks.timing_overhead --iterations 200000
+"""
+
+import argparse
+import json
+import time
+from typing import Callable, Dict
+
+from src.utils.performance_utils import (
+    DECORATOR_OVERHEAD_BUDGET_NS,
+    measure_time,
+    monitor_real_time_performance,
+)
+
+
+def _noop(value: int) -> int:
+    return value
+
+
+def overhead_ns(
+    decorator: Callable[[Callable[[int], int]], Callable[[int], int]],
+    iterations: int = 100_000,
+    repeats: int = 5,
+) -> float:
+    """Return the best-of-``repeats`` extra nanoseconds per decorated call."""
+
+    wrapped = decorator(_noop)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        for i in range(iterations):
+            _noop(i)
+        plain = time.perf_counter_ns() - start
+        start = time.perf_counter_ns()
+        for i in range(iterations):
+            wrapped(i)
+        decorated = time.perf_counter_ns() - start
+        best = min(best, (decorated - plain) / iterations)
+    return max(best, 0.0)
+
+
+def run(iterations: int) -> Dict[str, float]:
+    return {
+        "budget_ns": DECORATOR_OVERHEAD_BUDGET_NS,
+        "measure_time_ns": round(overhead_ns(measure_time(), iterations), 1),
+        "monitor_real_time_performance_ns": round(
+            overhead_ns(monitor_real_time_performance("benchmark_noop"), iterations), 1
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.iterations), indent=2))
+
+
+if __name__ == "__main__":
+    main()
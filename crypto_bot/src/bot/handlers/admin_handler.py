@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+"""Operator-only commands."""
+
+from typing import Any, Dict, List
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from src.config.bot_config import BotConfig
+from src.services.monitoring.sampling_profiler import ProfileResult, sampling_profiler
+from src.services.topology.health import get_cluster_health
+
+admin_router = Router()
+config = BotConfig()
+
+DEFAULT_PROFILE_SECONDS = 10.0
+
+
+def register_admin_handlers(dp) -> None:  # type: ignore[override]
+    dp.include_router(admin_router)
+
+
+def is_admin(user_id: int) -> bool:
+    return user_id in config.admin_user_ids
+
+
+def create_profile_report(result: ProfileResult) -> str:
+    lines = [
+        f"🔬 <b>Профиль event loop</b> "
+        f"({result.duration_s:.1f}s, {result.samples} samples)"
+    ]
+    for component, share in result.top_components():
+        lines.append(f"{component}: {share:.1f}%")
+    if result.speedscope_path:
+        lines.append(f"\n<code>{result.speedscope_path}</code>")
+    return "\n".join(lines)
+
+
+def create_health_report(roles: Dict[str, List[Dict[str, Any]]]) -> str:
+    if not roles:
+        return "Нет активных процессов (single-process режим)"
+    lines = ["🩺 <b>Процессы</b>"]
+    for role, records in sorted(roles.items()):
+        for record in records:
+            lines.append(
+                f"{role}[{record['instance']}] pid={record['pid']} "
+                f"host={record['host']} age={record['age_s']}s"
+            )
+    return "\n".join(lines)
+
+
+@admin_router.message(Command("health"))
+async def handle_health_command(message: Message) -> None:
+    """Handle ``/health``: list live worker processes by role."""
+
+    if message.from_user is None or not is_admin(message.from_user.id):
+        return
+    await message.answer(create_health_report(await get_cluster_health()))
+
+
+@admin_router.message(Command("profile"))
+async def handle_profile_command(message: Message, command: CommandObject) -> None:
+    """Handle ``/profile [seconds]``: sample the event loop and report."""
+
+    if message.from_user is None or not is_admin(message.from_user.id):
+        return
+    try:
+        seconds = float(command.args) if command.args else DEFAULT_PROFILE_SECONDS
+    except ValueError:
+        seconds = 0.0
+    if not seconds > 0:
+        await message.answer("Использование: /profile [секунды > 0]")
+        return
+    seconds = min(seconds, sampling_profiler.MAX_DURATION_S)
+    if sampling_profiler.is_running:
+        await message.answer("Профилирование уже запущено")
+        return
+    await message.answer(f"🔬 Профилирую {seconds:.0f}s...")
+    result = await sampling_profiler.profile_for(seconds)
+    if result is None or not result.samples:
+        await message.answer("Профиль пуст")
+        return
+    await message.answer(create_profile_report(result))
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 """Pydantic settings for bot configuration."""
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -22,9 +22,72 @@ class BotConfig(BaseSettings):
     max_real_time_pairs: int = 20
     notification_rate_limit: int = 10
 
+    # Telegram delivery
+    telegram_api_url: Optional[str] = None
+    delivery_global_rate: float = 28.0
+    delivery_per_chat_rate: float = 0.9
+    delivery_workers: int = 8
+    notification_queue_workers: int = 4
+    digest_enabled: bool = True
+    digest_window_seconds: float = 2.0
+
+    # Latency tracing exporters
+    trace_export_path: Optional[str] = None
+    trace_otlp_endpoint: Optional[str] = None
+
+    # Prometheus exposition endpoint (disabled when port is not set)
+    metrics_host: str = "0.0.0.0"
+    metrics_port: Optional[int] = None
+
+    # Process pool for bulk indicator seeding (None = CPU count - 1)
+    indicator_pool_enabled: bool = True
+    indicator_pool_workers: Optional[int] = None
+
+    # Incremental indicators of every pair ("name:param:..."), see
+    # src/services/indicators/incremental.py; subscribers add their own via
+    # UserPair.custom_settings["indicators"], reloaded every refresh interval
+    indicator_specs: List[str] = [
+        "ema:20",
+        "ema:50",
+        "ema:100",
+        "ema:200",
+        "ema_cross:20:50",
+        "ema_cross:50:200",
+        "trend:20:50:200",
+        "macd:12:26:9",
+        "bollinger:20:2",
+        "atr:14",
+        "vwap",
+        "volume_spike:20",
+    ]
+    indicator_plan_refresh_seconds: float = 60.0
+
+    # Multi-process deployment (python -m src.worker <role>)
+    compute_shards: int = 1
+    # delivery_global_rate is split evenly between the delivery processes
+    delivery_processes: int = 1
+    heartbeat_interval_seconds: float = 5.0
+
+    # Symbol ownership across replicas (consistent hashing + Redis leases)
+    sharding_enabled: bool = False
+    replica_id: Optional[str] = None
+    shard_lease_ttl_seconds: float = 15.0
+
+    # Event-loop health monitor
+    loop_lag_interval_ms: float = 100.0
+    slow_callback_ms: float = 50.0
+
+    # On-demand sampling profiler (/profile command, SIGUSR2)
+    admin_user_ids: List[int] = []
+    profiler_interval_ms: float = 5.0
+    profiler_output_dir: str = "logs"
+    profiler_signal_seconds: float = 30.0
+
     default_pair: str = "BTCUSDT"
 
     rsi_period: int = 14
+    # closed candles used to seed RSI, in multiples of rsi_period
+    rsi_warmup_periods: int = 10
     rsi_oversold_strong: float = 20
     rsi_oversold_normal: float = 30
     rsi_overbought_normal: float = 70
@@ -62,4 +125,4 @@ class BotConfig(BaseSettings):
             "signal_generation": 200,
             "notification_delivery": 500,
             "total_processing": 1000,
-        }
\ No newline at end of file
+        }
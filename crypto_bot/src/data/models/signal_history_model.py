@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base_model import BaseModel
@@ -23,7 +23,9 @@ class SignalHistory(BaseModel):
     signal_value: Mapped[float | None] = mapped_column(Float)
     price: Mapped[float | None] = mapped_column(Float)
     volume_change: Mapped[float | None] = mapped_column(Float)
-    sent_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default="now()")
+    sent_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
     processing_time_ms: Mapped[int | None] = mapped_column(Integer)
     delivery_time_ms: Mapped[int | None] = mapped_column(Integer)
 
@@ -40,6 +40,13 @@ async def close_redis() -> None:
         _redis = None
 
 
+def set_redis(client: redis.Redis | None) -> None:
+    """Use an already created client (e.g. fakeredis in benchmarks)."""
+
+    global _redis
+    _redis = client
+
+
 def get_redis() -> redis.Redis:
     if _redis is None:
         raise RuntimeError("Redis is not initialized")
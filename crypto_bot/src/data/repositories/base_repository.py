@@ -51,12 +51,12 @@ class BaseRepository(Generic[ModelType]):
 
     async def get_with_performance_tracking(
         self, session: AsyncSession, obj_id: Any
-    ) -> tuple[Optional[ModelType], int]:
+    ) -> tuple[Optional[ModelType], float]:
         """Fetch object by id and return time taken in milliseconds."""
 
         start = perf_counter()
         obj = await self.get_by_id(session, obj_id)
-        elapsed_ms = int((perf_counter() - start) * 1000)
+        elapsed_ms = (perf_counter() - start) * 1000
         return obj, elapsed_ms
 
     async def bulk_update_optimized(
@@ -11,6 +11,12 @@ from .base_repository import BaseRepository
 from src.data.models import SignalHistory
 
 
+def _whole_ms(value: float | None) -> int | None:
+    """Round timings to the integer millisecond columns of ``signal_history``."""
+
+    return None if value is None else round(value)
+
+
 class SignalRepository(BaseRepository[SignalHistory]):
     def __init__(self) -> None:
         super().__init__(SignalHistory)
@@ -46,8 +52,9 @@ class SignalRepository(BaseRepository[SignalHistory]):
         *,
         signal_value: float | None = None,
         price: float | None = None,
-        processing_time_ms: int | None = None,
-        delivery_time_ms: int | None = None,
+        volume_change: float | None = None,
+        processing_time_ms: float | None = None,
+        delivery_time_ms: float | None = None,
     ) -> None:
         """Persist a :class:`SignalHistory` entry with timing metrics."""
 
@@ -58,8 +65,9 @@ class SignalRepository(BaseRepository[SignalHistory]):
             signal_type=signal_type,
             signal_value=signal_value,
             price=price,
-            processing_time_ms=processing_time_ms,
-            delivery_time_ms=delivery_time_ms,
+            volume_change=volume_change,
+            processing_time_ms=_whole_ms(processing_time_ms),
+            delivery_time_ms=_whole_ms(delivery_time_ms),
         )
         session.add(history)
         await session.commit()
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 """Repository for user-pair relationships."""
 
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -26,3 +26,15 @@ class UserPairRepository(BaseRepository[UserPair]):
             .where(UserPair.real_time_active.is_(True))
         )
         return result.scalars().all()
+
+    async def get_indicator_settings(
+        self, session: AsyncSession
+    ) -> List[Tuple[str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        """Return ``(symbol, timeframes, custom_settings)`` of every subscription."""
+
+        result = await session.execute(
+            select(Pair.symbol, UserPair.timeframes, UserPair.custom_settings).join(
+                UserPair, UserPair.pair_id == Pair.id
+            )
+        )
+        return [tuple(row) for row in result.all()]
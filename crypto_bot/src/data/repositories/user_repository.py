@@ -50,4 +50,4 @@ class UserRepository(BaseRepository[User]):
             )
         )
         result = await session.execute(stmt)
-        return result.scalars().all()
+        return result.scalars().unique().all()
@@ -11,7 +11,10 @@ import sys
 from typing import Optional
 
 from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from src.bot.handlers.add_pair.add_pair_handler import register_add_pair_handlers
+from src.bot.handlers.admin_handler import register_admin_handlers
 from src.bot.handlers.my_pairs.my_pairs_handler import register_my_pairs_handlers
 from src.bot.handlers.remove_pair_handler import register_remove_pair_handlers
 from src.bot.handlers.start_handler import register_start_handlers
@@ -44,13 +47,18 @@ stream_manager: Optional[StreamManager] = None
 telegram_sender: Optional[object] = None
 real_time_processor: Optional[object] = None
 performance_monitor: Optional[object] = None
+metrics_exporter: Optional[object] = None
+loop_monitor: Optional[object] = None
 
 
 async def create_bot() -> Bot:
     """Создать и настроить экземпляр Telegram бота"""
 
     cfg = BotConfig()
-    return Bot(cfg.bot_token, parse_mode="HTML")
+    session = None
+    if cfg.telegram_api_url:
+        session = AiohttpSession(api=TelegramAPIServer.from_base(cfg.telegram_api_url))
+    return Bot(cfg.bot_token, session=session, parse_mode="HTML")
 
 
 async def setup_dispatcher(bot: Bot) -> Dispatcher:
@@ -62,6 +70,7 @@ async def setup_dispatcher(bot: Bot) -> Dispatcher:
     register_add_pair_handlers(dispatcher)
     register_my_pairs_handlers(dispatcher)
     register_remove_pair_handlers(dispatcher)
+    register_admin_handlers(dispatcher)
     return dispatcher
 
 
@@ -82,12 +91,27 @@ def setup_signal_handlers() -> None:
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
+    if hasattr(signal, "SIGUSR2"):
+        from src.services.monitoring.sampling_profiler import sampling_profiler
+
+        cfg = BotConfig()
+        sampling_profiler.interval = cfg.profiler_interval_ms / 1000
+        sampling_profiler.output_dir = cfg.profiler_output_dir
+
+        def profile_handler(signum, frame):
+            # runs on the main (event loop) thread, so that is what gets sampled
+            if sampling_profiler.start(cfg.profiler_signal_seconds):
+                print(f"🔬 Profiling event loop for {cfg.profiler_signal_seconds}s")
+
+        signal.signal(signal.SIGUSR2, profile_handler)
+
 
 async def init_services() -> None:
     """Инициализировать все сервисы: БД, Redis, WebSocket, уведомления + реальное время"""
     print("🔧 Initializing services...")
 
     global stream_manager, telegram_sender, real_time_processor, performance_monitor
+    global metrics_exporter, loop_monitor
 
     try:
         # Инициализация БД
@@ -100,11 +124,38 @@ async def init_services() -> None:
         await init_redis()
         print("✅ Redis initialized")
 
+        cfg = BotConfig()
+        if cfg.trace_export_path or cfg.trace_otlp_endpoint:
+            from src.utils.tracing import configure_tracing
+
+            configure_tracing(cfg.trace_export_path, cfg.trace_otlp_endpoint)
+            print("✅ Trace exporters configured")
+
+        if cfg.metrics_port:
+            from src.services.monitoring.metrics_exporter import MetricsExporter
+
+            metrics_exporter = MetricsExporter(
+                host=cfg.metrics_host, port=cfg.metrics_port
+            )
+            await metrics_exporter.start()
+            print(f"✅ Metrics exporter listening on :{cfg.metrics_port}")
+
+        from src.services.monitoring.loop_monitor import EventLoopMonitor
+        from src.services.real_time.performance_monitor import PerformanceMonitor
+
+        performance_monitor = PerformanceMonitor()
+        loop_monitor = EventLoopMonitor(
+            performance_monitor,
+            interval_ms=cfg.loop_lag_interval_ms,
+            slow_callback_ms=cfg.slow_callback_ms,
+        )
+        await loop_monitor.start()
+        print("✅ Event loop monitor started")
+
         # Заглушки для сервисов (будут реализованы позже)
         stream_manager = None
         telegram_sender = None
         real_time_processor = None
-        performance_monitor = None
 
         print("✅ All services initialized (stubs)")
 
@@ -3,6 +3,7 @@ from __future__ import annotations
 """Caching of candle (kline) data in Redis."""
 
 import json
+from datetime import datetime
 from typing import Any, Dict, List
 
 from redis.asyncio import Redis
@@ -23,11 +24,29 @@ class CandleCache:
         raw = await self.redis.zrange(key, -limit, -1)
         return [json.loads(item) for item in raw]
 
+    async def get_closed_candles(
+        self, symbol: str, timeframe: str, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        # at most the newest candle is still open
+        candles = await self.get_candles(symbol, timeframe, limit + 1)
+        return [c for c in candles if c.get("is_closed", True)][-limit:]
+
+    @staticmethod
+    def _score(candle: Dict[str, Any]) -> float:
+        value = candle.get("close_time") or candle.get("t") or 0
+        if isinstance(value, datetime):
+            return value.timestamp() * 1000
+        return float(value)
+
     async def add_new_candle(self, symbol: str, timeframe: str, candle: Dict[str, Any]) -> None:
         key = self._key(symbol, timeframe)
-        score = candle.get("close_time") or candle.get("t") or 0
-        await self.redis.zadd(key, {json.dumps(candle): score})
-        await self.redis.expire(key, self.ttl)
+        score = self._score(candle)
+        pipeline = self.redis.pipeline(transaction=True)
+        # an update of the still open candle replaces the previous one
+        pipeline.zremrangebyscore(key, score, score)
+        pipeline.zadd(key, {json.dumps(candle, default=str): score})
+        pipeline.expire(key, self.ttl)
+        await pipeline.execute()
 
     async def update_last_candle(self, symbol: str, timeframe: str, candle: Dict[str, Any]) -> None:
         await self.add_new_candle(symbol, timeframe, candle)
@@ -42,8 +61,13 @@ class CandleCache:
             return None
         return float(candles[-1].get("close_price") or candles[-1].get("c"))
 
-    async def get_recent_prices(self, symbol: str, timeframe: str, limit: int = 50) -> List[float]:
-        candles = await self.get_candles(symbol, timeframe, limit)
+    async def get_recent_prices(
+        self, symbol: str, timeframe: str, limit: int = 50, closed_only: bool = False
+    ) -> List[float]:
+        if closed_only:
+            candles = await self.get_closed_candles(symbol, timeframe, limit)
+        else:
+            candles = await self.get_candles(symbol, timeframe, limit)
         return [float(c.get("close_price") or c.get("c", 0.0)) for c in candles]
 
     async def clear_cache(self, symbol: str, timeframe: str) -> None:
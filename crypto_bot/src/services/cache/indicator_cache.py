@@ -10,10 +10,22 @@ from typing import Any, Dict, List, Tuple
 import orjson
 from redis.asyncio import Redis
 from src.config.redis_config import get_redis_config
+from src.utils.metrics_registry import metrics_registry
 from src.utils.time_helpers import get_current_timestamp, get_high_precision_timestamp
 
 logger = logging.getLogger(__name__)
 
+_STATE_HITS = metrics_registry.counter(
+    "cache_requests_total", {"cache": "indicator_state", "result": "hit"}
+)
+_STATE_MISSES = metrics_registry.counter(
+    "cache_requests_total", {"cache": "indicator_state", "result": "miss"}
+)
+
+
+def _count_lookup(data: Any) -> None:
+    (_STATE_HITS if data else _STATE_MISSES).inc()
+
 
 class IndicatorCache:
     """Cache for technical indicators with batching and compression."""
@@ -271,16 +283,22 @@ class IndicatorCache:
 
     # ------------------------------------------------------------------
     async def save_indicator_state(
-        self, name: str, symbol: str, timeframe: str, state: Dict[str, Any]
+        self,
+        name: str,
+        symbol: str,
+        timeframe: str,
+        state: Dict[str, Any],
+        ttl: int | None = None,
     ) -> None:
         key = self._state_key(name, symbol, timeframe)
-        await self.redis.set(key, self._serialize(state), ex=self.state_ttl)
+        await self.redis.set(key, self._serialize(state), ex=ttl or self.state_ttl)
 
     async def get_indicator_state(
         self, name: str, symbol: str, timeframe: str
     ) -> Dict[str, Any] | None:
         key = self._state_key(name, symbol, timeframe)
         data = await self.redis.get(key)
+        _count_lookup(data)
         return self._deserialize(data)
 
     async def save_calculation_state(
@@ -300,6 +318,7 @@ class IndicatorCache:
     ) -> Dict[str, Any] | None:
         key = self._calc_state_key(indicator, symbol, timeframe, period)
         data = await self.redis.get(key)
+        _count_lookup(data)
         return self._deserialize(data)
 
     async def invalidate_indicators(self, symbol: str, timeframe: str) -> None:
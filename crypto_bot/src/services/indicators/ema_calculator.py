@@ -2,12 +2,14 @@ from __future__ import annotations
 
 import asyncio
 from decimal import Decimal
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from datetime import datetime, timezone
 
 from src.services.cache.indicator_cache import IndicatorCache
 from src.services.cache.candle_cache import CandleCache
+from src.services.indicators.indicator_executor import IndicatorExecutor, IndicatorJob
 from src.utils.logger import LoggerMixin
+from src.utils.metrics_registry import metrics_registry
 from src.utils.math_helpers import calculate_simple_moving_average
 from src.utils.performance_utils import measure_time
 from src.utils.time_helpers import get_high_precision_timestamp, get_time_since_ms
@@ -16,16 +18,22 @@ from src.utils.time_helpers import get_high_precision_timestamp, get_time_since_
 class EMACalculator(LoggerMixin):
     """Exponential Moving Average real-time calculator."""
 
-    def __init__(self, indicator_cache: IndicatorCache, candle_cache: CandleCache) -> None:
+    def __init__(
+        self,
+        indicator_cache: IndicatorCache,
+        candle_cache: CandleCache,
+        executor: Optional[IndicatorExecutor] = None,
+    ) -> None:
         super().__init__()
         self.indicator_cache = indicator_cache
         self.candle_cache = candle_cache
-        self.processing_times: List[int] = []
+        self.executor = executor or IndicatorExecutor()
+        self.processing_times = metrics_registry.histogram("ema_calculation_ms")
 
     @measure_time(target_ms=50)
     async def calculate_real_time_ema(
         self, symbol: str, timeframe: str, current_price: float, period: int
-    ) -> Tuple[float | None, int]:
+    ) -> Tuple[float | None, float]:
         """Return EMA value for ``symbol`` and processing time in ms."""
 
         start = get_high_precision_timestamp()
@@ -33,18 +41,18 @@ class EMACalculator(LoggerMixin):
         if prev is None:
             prev = await self.calculate_ema(symbol, timeframe, period)
             if prev is None:
-                return None, int(get_time_since_ms(start))
+                return None, get_time_since_ms(start)
         k = Decimal(2) / Decimal(period + 1)
         new_ema = (Decimal(current_price) * k) + (Decimal(prev) * (Decimal(1) - k))
         await self._save_ema_value(symbol, timeframe, period, float(new_ema))
-        elapsed = int(get_time_since_ms(start))
-        self.processing_times.append(elapsed)
+        elapsed = get_time_since_ms(start)
+        self.processing_times.record(elapsed)
         return float(new_ema), elapsed
 
     async def calculate_multiple_ema_real_time(
         self, symbol: str, timeframe: str, current_price: float, periods: List[int]
-    ) -> Dict[int, Tuple[float | None, int]]:
-        results: Dict[int, Tuple[float | None, int]] = {}
+    ) -> Dict[int, Tuple[float | None, float]]:
+        results: Dict[int, Tuple[float | None, float]] = {}
         for period in periods:
             ema, t = await self.calculate_real_time_ema(symbol, timeframe, current_price, period)
             results[period] = (ema, t)
@@ -64,7 +72,7 @@ class EMACalculator(LoggerMixin):
     async def _save_ema_value(
         self, symbol: str, timeframe: str, period: int, value: float
     ) -> None:
-        await self.indicator_cache.set_ema_real_time(symbol, timeframe, period, value)
+        await self.indicator_cache.set_ema(symbol, timeframe, period, value)
 
     async def calculate_ema(
         self, symbol: str, timeframe: str, period: int
@@ -81,6 +89,43 @@ class EMACalculator(LoggerMixin):
             ema = (Decimal(price) * k) + (ema * (Decimal(1) - k))
         return float(ema)
 
+    async def recalculate_many(
+        self,
+        pairs: Sequence[Tuple[str, str]],
+        periods: Sequence[int],
+        history: Optional[int] = None,
+    ) -> Dict[Tuple[str, str, int], float | None]:
+        """Seed EMAs of ``periods`` for many ``(symbol, timeframe)`` pairs.
+
+        Each period uses the last ``history`` prices (``period * 2`` by
+        default, as :meth:`calculate_ema` does); the maths runs in the
+        executor's worker processes when it is started.
+        """
+
+        limit = history or max(periods) * 2
+        price_lists = await asyncio.gather(
+            *(self.candle_cache.get_recent_prices(s, tf, limit) for s, tf in pairs)
+        )
+        jobs = [
+            IndicatorJob(
+                "ema", symbol, timeframe, period, prices[-(history or period * 2) :]
+            )
+            for (symbol, timeframe), prices in zip(pairs, price_lists)
+            for period in periods
+        ]
+        results = await self.executor.run(jobs)
+        values: Dict[Tuple[str, str, int], float | None] = {}
+        saves = []
+        for job, result in zip(jobs, results):
+            value = result["ema"] if result is not None else None
+            values[(job.symbol, job.timeframe, job.period)] = value
+            if value is not None:
+                saves.append(
+                    self._save_ema_value(job.symbol, job.timeframe, job.period, value)
+                )
+        await asyncio.gather(*saves)
+        return values
+
     def detect_ema_crossover(
         self,
         ema_short: float,
@@ -95,9 +140,7 @@ class EMACalculator(LoggerMixin):
         return None
 
     def get_performance_stats(self) -> Dict[str, Any]:
-        if not self.processing_times:
+        snapshot = self.processing_times.snapshot()
+        if not snapshot.count:
             return {}
-        times = sorted(self.processing_times)
-        avg = sum(times) / len(times)
-        p95 = times[int(len(times) * 0.95) - 1]
-        return {"avg_ms": avg, "max_ms": max(times), "p95_ms": p95}
+        return snapshot.summary()
@@ -0,0 +1,418 @@
+from __future__ import annotations
+
+"""Pluggable incremental indicators.
+
+An :class:`IncrementalIndicator` folds one closed candle into a small,
+JSON-serializable ``state`` dict in O(1) and returns the new value (``None``
+until it has seen enough candles). It declares how many candles a cold
+start has to replay. The :class:`IndicatorEngine` in :mod:`indicator_engine`
+handles state loading, seeding and persistence for all indicators of a pair
+at once, so a new indicator is only a subclass registered with
+:func:`register_indicator`.
+
+Indicators are addressed by spec strings, the name followed by the
+parameters: ``"rsi:14"``, ``"macd:12:26:9"``, ``"bollinger:20:2"``.
+
+An indicator built on others (MACD on two EMAs, a crossover on a pair of
+EMAs) lists them in :meth:`IncrementalIndicator.dependencies` and reads
+their values of the same candle from ``inputs``. :func:`resolve_graph` turns
+the indicators of a pair into one list, dependencies first and every key
+once, so an EMA shared by several consumers is computed once per candle.
+"""
+
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Type, TypeVar
+
+from src.services.indicators.indicator_math import rsi_from_averages, rsi_step
+from src.utils.constants import RSI_WARMUP_PERIODS
+from src.utils.time_helpers import timeframe_to_milliseconds, to_timestamp_ms
+
+Candle = Mapping[str, Any]
+State = Dict[str, Any]
+Inputs = Mapping[str, Any]
+
+NO_INPUTS: Inputs = MappingProxyType({})
+
+INDICATORS: Dict[str, Type["IncrementalIndicator"]] = {}
+
+_I = TypeVar("_I", bound=Type["IncrementalIndicator"])
+
+DAY_MS = 86_400_000
+
+
+def register_indicator(cls: _I) -> _I:
+    INDICATORS[cls.name] = cls
+    return cls
+
+
+def create_indicator(spec: str) -> "IncrementalIndicator":
+    """Build the indicator for ``spec`` (``"name:param:param"``)."""
+
+    name, *raw = spec.strip().split(":")
+    cls = INDICATORS.get(name)
+    if cls is None:
+        raise ValueError(f"Unknown indicator: {name}")
+    params = [float(p) if "." in p else int(p) for p in raw]
+    return cls(*params)
+
+
+def resolve_graph(
+    indicators: Iterable["IncrementalIndicator"],
+) -> List["IncrementalIndicator"]:
+    """``indicators`` and their dependencies, each key once, dependencies first."""
+
+    graph: Dict[str, IncrementalIndicator] = {}
+
+    def visit(indicator: IncrementalIndicator, path: Tuple[str, ...]) -> None:
+        key = indicator.key
+        if key in graph:
+            return
+        if key in path:
+            raise ValueError(f"Indicator dependency cycle: {' -> '.join((*path, key))}")
+        for dependency in indicator.dependencies():
+            visit(dependency, (*path, key))
+        graph[key] = indicator
+
+    for indicator in indicators:
+        visit(indicator, ())
+    return list(graph.values())
+
+
+def candle_price(candle: Candle, field: str = "close") -> float:
+    value = candle.get(f"{field}_price")
+    if value is None:
+        value = candle.get("close_price", candle.get("c"))
+    return float(value)
+
+
+def candle_volume(candle: Candle) -> float:
+    return float(candle.get("volume") or candle.get("v") or 0.0)
+
+
+class IncrementalIndicator:
+    """Base class: ``update`` one closed candle at a time."""
+
+    name = ""
+
+    def __init__(self, *params: Any) -> None:
+        self.params = params
+
+    @cached_property
+    def key(self) -> str:
+        return ":".join([self.name, *(f"{p:g}" for p in self.params)])
+
+    def warmup(self, timeframe: str) -> int:
+        """Closed candles a cold start folds in before the first live one."""
+
+        raise NotImplementedError
+
+    def dependencies(self) -> List["IncrementalIndicator"]:
+        """Indicators whose same-candle values ``update`` reads from ``inputs``."""
+
+        return []
+
+    def update(self, state: State, candle: Candle, inputs: Inputs = NO_INPUTS) -> Any:
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.key}>"
+
+
+def _ema_update(state: State, value: float, period: int) -> Optional[float]:
+    """SMA of the first ``period`` values, EMA afterwards (as ``ema_seed``)."""
+
+    count = state.get("count", 0) + 1
+    state["count"] = count
+    if count < period:
+        state["sum"] = state.get("sum", 0.0) + value
+        return None
+    if count == period:
+        ema = (state.pop("sum", 0.0) + value) / period
+    else:
+        k = 2 / (period + 1)
+        ema = value * k + state["ema"] * (1 - k)
+    state["ema"] = ema
+    return ema
+
+
+def _window_push(state: State, value: float, size: int) -> None:
+    """Ring buffer of the last ``size`` values with running sums."""
+
+    window: List[float] = state.setdefault("window", [])
+    if len(window) < size:
+        window.append(value)
+        state["sum"] = state.get("sum", 0.0) + value
+        state["sum_sq"] = state.get("sum_sq", 0.0) + value * value
+        return
+    index = state.get("index", 0)
+    old = window[index]
+    window[index] = value
+    state["index"] = (index + 1) % size
+    if state["index"] == 0:
+        # resum once per lap so rounding errors do not accumulate
+        state["sum"] = sum(window)
+        state["sum_sq"] = sum(v * v for v in window)
+    else:
+        state["sum"] += value - old
+        state["sum_sq"] += value * value - old * old
+
+
+def _wilder_update(state: State, value: float, period: int) -> Optional[float]:
+    """Plain average of the first ``period`` values, Wilder smoothing after."""
+
+    count = state.get("count", 0) + 1
+    state["count"] = count
+    if count <= period:
+        state["avg"] = state.get("avg", 0.0) + value / period
+        return state["avg"] if count == period else None
+    state["avg"] = (state["avg"] * (period - 1) + value) / period
+    return state["avg"]
+
+
+@register_indicator
+class RSIIndicator(IncrementalIndicator):
+    name = "rsi"
+
+    def __init__(self, period: int = 14) -> None:
+        super().__init__(period)
+        self.period = period
+
+    def warmup(self, timeframe: str) -> int:
+        return self.period * RSI_WARMUP_PERIODS + 1
+
+    def update(
+        self, state: State, candle: Candle, inputs: Inputs = NO_INPUTS
+    ) -> Optional[float]:
+        close = candle_price(candle)
+        count = state.get("count", -1) + 1
+        state["count"] = count
+        if count == 0:
+            state.update(previous_price=close, avg_gain=0.0, avg_loss=0.0)
+            return None
+        if count <= self.period:
+            change = close - state["previous_price"]
+            state["avg_gain"] += max(change, 0.0) / self.period
+            state["avg_loss"] += max(-change, 0.0) / self.period
+            state["previous_price"] = close
+            if count < self.period:
+                return None
+            return rsi_from_averages(state["avg_gain"], state["avg_loss"])
+        rsi, state["avg_gain"], state["avg_loss"] = rsi_step(state, close, self.period)
+        state["previous_price"] = close
+        return rsi
+
+
+@register_indicator
+class EMAIndicator(IncrementalIndicator):
+    name = "ema"
+
+    def __init__(self, period: int = 20) -> None:
+        super().__init__(period)
+        self.period = period
+
+    def warmup(self, timeframe: str) -> int:
+        return self.period * 2
+
+    def update(
+        self, state: State, candle: Candle, inputs: Inputs = NO_INPUTS
+    ) -> Optional[float]:
+        return _ema_update(state, candle_price(candle), self.period)
+
+
+@register_indicator
+class MACDIndicator(IncrementalIndicator):
+    name = "macd"
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9) -> None:
+        super().__init__(fast, slow, signal)
+        self.fast, self.slow, self.signal = fast, slow, signal
+        self._fast, self._slow = EMAIndicator(fast), EMAIndicator(slow)
+
+    def warmup(self, timeframe: str) -> int:
+        return self.slow * 3 + self.signal
+
+    def dependencies(self) -> List[IncrementalIndicator]:
+        return [self._fast, self._slow]
+
+    def update(
+        self, state: State, candle: Candle, inputs: Inputs = NO_INPUTS
+    ) -> Optional[Dict[str, float]]:
+        fast, slow = inputs.get(self._fast.key), inputs.get(self._slow.key)
+        if fast is None or slow is None:
+            return None
+        macd = fast - slow
+        signal = _ema_update(state.setdefault("signal", {}), macd, self.signal)
+        if signal is None:
+            return None
+        return {"macd": macd, "signal": signal, "histogram": macd - signal}
+
+
+@register_indicator
+class EMACrossIndicator(IncrementalIndicator):
+    """Short/long EMA pair; ``cross`` is set on the candle where they cross."""
+
+    name = "ema_cross"
+
+    def __init__(self, short: int = 20, long: int = 50) -> None:
+        super().__init__(short, long)
+        self.short, self.long = short, long
+        self._short, self._long = EMAIndicator(short), EMAIndicator(long)
+
+    def warmup(self, timeframe: str) -> int:
+        return self.long * 2
+
+    def dependencies(self) -> List[IncrementalIndicator]:
+        return [self._short, self._long]
+
+    def update(
+        self, state: State, candle: Candle, inputs: Inputs = NO_INPUTS
+    ) -> Optional[Dict[str, Any]]:
+        short, long = inputs.get(self._short.key), inputs.get(self._long.key)
+        if short is None or long is None:
+            return None
+        side = (short > long) - (short < long)
+        previous = state.get("side")
+        state["side"] = side
+        cross = None
+        if previous == -1 and side == 1:
+            cross = "golden"
+        elif previous == 1 and side == -1:
+            cross = "death"
+        return {"short": short, "long": long, "cross": cross}
+
+
+@register_indicator
+class TrendIndicator(IncrementalIndicator):
+    """Direction of stacked EMAs: 1 when short > mid > long, -1 when reversed."""
+
+    name = "trend"
+
+    def __init__(self, short: int = 20, mid: int = 50, long: int = 200) -> None:
+        super().__init__(short, mid, long)
+        self._emas = [EMAIndicator(short), EMAIndicator(mid), EMAIndicator(long)]
+
+    def warmup(self, timeframe: str) -> int:
+        return self._emas[-1].warmup(timeframe)
+
+    def dependencies(self) -> List[IncrementalIndicator]:
+        return list(self._emas)
+
+    def update(
+        self, state: State, candle: Candle, inputs: Inputs = NO_INPUTS
+    ) -> Optional[Dict[str, Any]]:
+        short, mid, long = (inputs.get(ema.key) for ema in self._emas)
+        if short is None or mid is None or long is None:
+            return None
+        direction = 1 if short > mid > long else -1 if short < mid < long else 0
+        previous = state.get("direction")
+        state["direction"] = direction
+        return {
+            "direction": direction,
+            "changed": previous is not None and previous != direction,
+            "spread_percent": (short - long) / long * 100 if long else 0.0,
+        }
+
+
+@register_indicator
+class BollingerIndicator(IncrementalIndicator):
+    name = "bollinger"
+
+    def __init__(self, period: int = 20, width: float = 2.0) -> None:
+        super().__init__(period, width)
+        self.period = period
+        self.width = width
+
+    def warmup(self, timeframe: str) -> int:
+        return self.period
+
+    def update(
+        self, state: State, candle: Candle, inputs: Inputs = NO_INPUTS
+    ) -> Optional[Dict[str, float]]:
+        _window_push(state, candle_price(candle), self.period)
+        if len(state["window"]) < self.period:
+            return None
+        middle = state["sum"] / self.period
+        deviation = max(state["sum_sq"] / self.period - middle * middle, 0.0) ** 0.5
+        return {
+            "middle": middle,
+            "upper": middle + self.width * deviation,
+            "lower": middle - self.width * deviation,
+            "bandwidth": 2 * self.width * deviation / middle if middle else 0.0,
+        }
+
+
+@register_indicator
+class ATRIndicator(IncrementalIndicator):
+    name = "atr"
+
+    def __init__(self, period: int = 14) -> None:
+        super().__init__(period)
+        self.period = period
+
+    def warmup(self, timeframe: str) -> int:
+        return self.period * RSI_WARMUP_PERIODS + 1
+
+    def update(
+        self, state: State, candle: Candle, inputs: Inputs = NO_INPUTS
+    ) -> Optional[float]:
+        high = candle_price(candle, "high")
+        low = candle_price(candle, "low")
+        previous = state.get("previous_close")
+        true_range = high - low
+        if previous is not None:
+            true_range = max(true_range, abs(high - previous), abs(low - previous))
+        state["previous_close"] = candle_price(candle)
+        return _wilder_update(state, true_range, self.period)
+
+
+@register_indicator
+class VWAPIndicator(IncrementalIndicator):
+    """Volume-weighted average price, restarted every UTC day."""
+
+    name = "vwap"
+
+    def warmup(self, timeframe: str) -> int:
+        try:
+            return max(1, DAY_MS // timeframe_to_milliseconds(timeframe))
+        except ValueError:
+            return 1
+
+    def update(
+        self, state: State, candle: Candle, inputs: Inputs = NO_INPUTS
+    ) -> Optional[float]:
+        close_ms = to_timestamp_ms(candle.get("close_time"))
+        session = close_ms // DAY_MS if close_ms is not None else state.get("session")
+        if session != state.get("session"):
+            state.update(session=session, pv=0.0, volume=0.0)
+        high, low = candle_price(candle, "high"), candle_price(candle, "low")
+        typical = (high + low + candle_price(candle)) / 3
+        volume = candle_volume(candle)
+        state["pv"] = state.get("pv", 0.0) + typical * volume
+        state["volume"] = state.get("volume", 0.0) + volume
+        return state["pv"] / state["volume"] if state["volume"] else None
+
+
+@register_indicator
+class VolumeSpikeIndicator(IncrementalIndicator):
+    """Volume change in percent against the average of the previous candles."""
+
+    name = "volume_spike"
+
+    def __init__(self, period: int = 20) -> None:
+        super().__init__(period)
+        self.period = period
+
+    def warmup(self, timeframe: str) -> int:
+        return self.period + 1
+
+    def update(
+        self, state: State, candle: Candle, inputs: Inputs = NO_INPUTS
+    ) -> Optional[float]:
+        volume = candle_volume(candle)
+        full = len(state.get("window", ())) == self.period
+        average = state["sum"] / self.period if full else 0.0
+        _window_push(state, volume, self.period)
+        if not average:
+            return None
+        return (volume / average - 1) * 100
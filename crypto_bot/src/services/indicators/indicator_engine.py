@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+"""Run every incremental indicator of a pair in one pass.
+
+The states of all indicators of ``(symbol, timeframe)`` live in a single
+``state:engine:<symbol>:<timeframe>`` value together with the close time of
+the last folded candle and the last values. :meth:`IndicatorEngine.update`
+reads it once, folds the candle into each indicator and writes it back once,
+so adding an indicator adds CPU work but no Redis round trips. Indicators
+without state (cold start, or newly added) are seeded together from one
+read of the closed candle history. :meth:`IndicatorEngine.warm_up` seeds
+many pairs in one batch, replayed in the executor's worker processes.
+
+Each pair runs a plan: the engine defaults plus every indicator the pair's
+subscribers asked for in ``UserPair.custom_settings["indicators"]``,
+resolved into one dependency graph (:func:`resolve_graph`). A key is
+computed once per candle however many plans and signal rules use it.
+"""
+
+import asyncio
+import copy
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.data.repositories.user_pair_repository import UserPairRepository
+from src.services.cache.candle_cache import CandleCache
+from src.services.cache.indicator_cache import IndicatorCache
+from src.services.indicators.indicator_executor import IndicatorExecutor
+from src.services.indicators.incremental import (
+    Candle,
+    IncrementalIndicator,
+    State,
+    create_indicator,
+    resolve_graph,
+)
+from src.utils.logger import LoggerMixin
+from src.utils.metrics_registry import metrics_registry
+from src.utils.time_helpers import (
+    get_high_precision_timestamp,
+    get_time_since_ms,
+    timeframe_state_ttl,
+    timeframe_to_milliseconds,
+    to_timestamp_ms,
+)
+
+ENGINE_STATE = "engine"
+
+PairKey = Tuple[str, str]
+
+
+def collect_indicator_specs(
+    rows: Iterable[
+        Tuple[str, Optional[Mapping[str, Any]], Optional[Mapping[str, Any]]]
+    ],
+) -> Dict[PairKey, Set[str]]:
+    """Union the indicator specs of subscriptions by ``(symbol, timeframe)``.
+
+    ``rows`` are ``(symbol, timeframes, custom_settings)`` as returned by
+    :meth:`UserPairRepository.get_indicator_settings`; the specs of a
+    subscription apply to each of its enabled timeframes.
+    """
+
+    specs: Dict[PairKey, Set[str]] = defaultdict(set)
+    for symbol, timeframes, settings in rows:
+        wanted = (settings or {}).get("indicators") or []
+        if not wanted:
+            continue
+        for timeframe, enabled in (timeframes or {}).items():
+            if enabled:
+                specs[(symbol, timeframe)].update(wanted)
+    return dict(specs)
+
+
+def _seed_spans(
+    graph: Sequence[IncrementalIndicator], timeframe: str
+) -> Dict[str, int]:
+    """Candles each node replays: its own warm-up, or its dependents' if longer."""
+
+    spans = {indicator.key: indicator.warmup(timeframe) for indicator in graph}
+    for indicator in reversed(graph):
+        for dependency in indicator.dependencies():
+            spans[dependency.key] = max(spans[dependency.key], spans[indicator.key])
+    return spans
+
+
+def _replay(
+    graph: Sequence[IncrementalIndicator],
+    spans: Mapping[str, int],
+    candles: Sequence[Candle],
+) -> Tuple[Dict[str, State], Dict[str, Any]]:
+    """Fold ``candles`` into fresh states of ``graph``; return states and values.
+
+    A node starts folding where its span begins. Module level, so
+    :meth:`IndicatorExecutor.call` can run it in a worker process.
+    """
+
+    states: Dict[str, State] = {indicator.key: {} for indicator in graph}
+    values: Dict[str, Any] = {}
+    for offset, past in enumerate(candles):
+        remaining = len(candles) - offset
+        values = {}
+        for indicator in graph:
+            if remaining <= spans[indicator.key]:
+                values[indicator.key] = indicator.update(
+                    states[indicator.key], past, values
+                )
+    return states, values
+
+
+def _replay_many(
+    batch: Sequence[
+        Tuple[Sequence[IncrementalIndicator], Mapping[str, int], Sequence[Candle]]
+    ],
+) -> List[Tuple[Dict[str, State], Dict[str, Any]]]:
+    return [_replay(graph, spans, candles) for graph, spans, candles in batch]
+
+
+class IndicatorEngine(LoggerMixin):
+    """Load, update and save the indicator states of a pair together."""
+
+    def __init__(
+        self,
+        indicator_cache: IndicatorCache,
+        candle_cache: CandleCache,
+        indicators: Iterable[IncrementalIndicator] = (),
+        executor: Optional[IndicatorExecutor] = None,
+    ) -> None:
+        super().__init__()
+        self.indicator_cache = indicator_cache
+        self.candle_cache = candle_cache
+        self.executor = executor or IndicatorExecutor()
+        self.indicators = {indicator.key: indicator for indicator in indicators}
+        self._default_graph = resolve_graph(self.indicators.values())
+        self._plans: Dict[PairKey, List[IncrementalIndicator]] = {}
+        self.processing_times = metrics_registry.histogram("indicator_engine_ms")
+        self._seeded = metrics_registry.counter("indicator_engine_seeds_total")
+
+    async def update(
+        self,
+        symbol: str,
+        timeframe: str,
+        candle: Candle,
+        indicators: Optional[Sequence[IncrementalIndicator]] = None,
+    ) -> Dict[str, Any]:
+        """Fold ``candle`` into ``indicators`` (default: the pair's plan).
+
+        Returns the values keyed by spec, dependencies included. A closed
+        candle advances and saves the states; a close at or before the last
+        folded one (a replayed message) returns the stored values, and one
+        more than a candle after it reseeds every state, as a close was
+        missed. An open candle is folded into copies, as a preview. Replays
+        and previews do not write.
+        States of keys outside the resolved graph are dropped, as they
+        would miss this candle.
+        """
+
+        start = get_high_precision_timestamp()
+        if indicators is not None:
+            graph = resolve_graph(indicators)
+        else:
+            graph = self.graph_for(symbol, timeframe)
+        stored = await self.indicator_cache.get_indicator_state(
+            ENGINE_STATE, symbol, timeframe
+        )
+        stored = stored or {}
+        states: Dict[str, State] = stored.get("states", {})
+        committed: Dict[str, Any] = stored.get("values", {})
+        last_close: Optional[int] = stored.get("close_time_ms")
+        close_time_ms = to_timestamp_ms(candle.get("close_time"))
+        is_closed = bool(candle.get("is_closed", True))
+        if (
+            close_time_ms is not None
+            and last_close is not None
+            and close_time_ms - last_close > timeframe_to_milliseconds(timeframe)
+        ):
+            # a close was missed: every state is reseeded from the history
+            states, committed, last_close = {}, {}, None
+        replayed = (
+            is_closed
+            and close_time_ms is not None
+            and last_close is not None
+            and close_time_ms <= last_close
+        )
+
+        # seeds whose history already holds the candle closing now
+        up_to_date: set[str] = set()
+        missing = [indicator for indicator in graph if indicator.key not in states]
+        seeded = {indicator.key for indicator in missing}
+        if missing:
+            last_candle = await self._seed(
+                symbol, timeframe, missing, states, committed
+            )
+            if last_candle is not None:
+                through = to_timestamp_ms(last_candle.get("close_time"))
+                unknown = close_time_ms is None or through is None
+                if is_closed and (unknown or close_time_ms <= through):
+                    up_to_date = seeded
+                if last_close is None:
+                    last_close = through
+
+        values: Dict[str, Any] = {}
+        for indicator in graph:
+            # dependencies come first, so ``values`` holds this candle's inputs
+            key = indicator.key
+            if key in up_to_date or (replayed and key not in seeded):
+                values[key] = committed.get(key)
+            elif is_closed:
+                values[key] = committed[key] = indicator.update(
+                    states[key], candle, values
+                )
+            else:
+                values[key] = indicator.update(
+                    copy.deepcopy(states[key]), candle, values
+                )
+
+        advanced = is_closed and not replayed
+        if advanced or missing:
+            if advanced and close_time_ms is not None:
+                last_close = close_time_ms
+            keep = [indicator.key for indicator in graph]
+            await self.indicator_cache.save_indicator_state(
+                ENGINE_STATE,
+                symbol,
+                timeframe,
+                {
+                    "close_time_ms": last_close,
+                    "states": {key: states[key] for key in keep},
+                    "values": {key: committed.get(key) for key in keep},
+                },
+                ttl=timeframe_state_ttl(timeframe),
+            )
+        self.processing_times.record(get_time_since_ms(start))
+        return values
+
+    async def _seed(
+        self,
+        symbol: str,
+        timeframe: str,
+        indicators: List[IncrementalIndicator],
+        states: Dict[str, State],
+        values: Dict[str, Any],
+    ) -> Optional[Candle]:
+        """Replay closed history into ``states``/``values``; return its last candle.
+
+        The history of all ``indicators`` comes from one candle cache read.
+        Their dependencies are replayed alongside in scratch states, so a
+        stored dependency is not rewound; a node starts folding where its
+        span (:func:`_seed_spans`) begins.
+        """
+
+        graph = resolve_graph(indicators)
+        spans = _seed_spans(graph, timeframe)
+        candles = await self.candle_cache.get_closed_candles(
+            symbol, timeframe, max(spans.values())
+        )
+        scratch, inputs = await self.executor.call(
+            _replay, graph, spans, candles, size=len(candles) * len(graph)
+        )
+        for indicator in indicators:
+            states[indicator.key] = scratch[indicator.key]
+            values[indicator.key] = inputs.get(indicator.key)
+        self._seeded.inc(len(indicators))
+        return candles[-1] if candles else None
+
+    async def warm_up(self, pairs: Sequence[PairKey]) -> int:
+        """Seed the plans of ``pairs`` that have no stored state; return how many.
+
+        Used at startup so the first candles of a shard do not each replay
+        their history on the event loop: all histories are read together and
+        replayed in one executor batch.
+        """
+
+        stored = await asyncio.gather(
+            *(
+                self.indicator_cache.get_indicator_state(ENGINE_STATE, *pair)
+                for pair in pairs
+            )
+        )
+        cold = [pair for pair, state in zip(pairs, stored) if not state]
+        graphs = [self.graph_for(*pair) for pair in cold]
+        spans = [
+            _seed_spans(graph, timeframe) for graph, (_, timeframe) in zip(graphs, cold)
+        ]
+        histories = await asyncio.gather(
+            *(
+                self.candle_cache.get_closed_candles(
+                    symbol, timeframe, max(span.values())
+                )
+                for (symbol, timeframe), span in zip(cold, spans)
+            )
+        )
+        batch = [
+            (graph, span, candles)
+            for graph, span, candles in zip(graphs, spans, histories)
+            if candles
+        ]
+        size = sum(len(candles) * len(graph) for graph, _, candles in batch)
+        results = iter(await self.executor.call(_replay_many, batch, size=size))
+        saves = []
+        for (symbol, timeframe), graph, candles in zip(cold, graphs, histories):
+            if not candles:
+                continue
+            states, values = next(results)
+            self._seeded.inc(len(graph))
+            saves.append(
+                self.indicator_cache.save_indicator_state(
+                    ENGINE_STATE,
+                    symbol,
+                    timeframe,
+                    {
+                        "close_time_ms": to_timestamp_ms(candles[-1].get("close_time")),
+                        "states": states,
+                        "values": {key: values.get(key) for key in states},
+                    },
+                    ttl=timeframe_state_ttl(timeframe),
+                )
+            )
+        await asyncio.gather(*saves)
+        return len(saves)
+
+    def graph_for(self, symbol: str, timeframe: str) -> List[IncrementalIndicator]:
+        """The resolved plan of ``(symbol, timeframe)``; the defaults without one."""
+
+        return self._plans.get((symbol, timeframe), self._default_graph)
+
+    def set_plans(self, specs: Mapping[PairKey, Iterable[str]]) -> None:
+        """Replace the per-pair plans: the defaults plus ``specs`` of each pair.
+
+        Unknown or malformed specs are logged and skipped.
+        """
+
+        plans: Dict[PairKey, List[IncrementalIndicator]] = {}
+        built: Dict[str, IncrementalIndicator] = {}
+        for pair, pair_specs in specs.items():
+            extra: List[IncrementalIndicator] = []
+            for spec in sorted(set(pair_specs)):
+                if spec not in built:
+                    try:
+                        built[spec] = create_indicator(spec)
+                    except (TypeError, ValueError) as exc:
+                        self.logger.warning(
+                            "indicator_spec_invalid", spec=spec, error=str(exc)
+                        )
+                        continue
+                extra.append(built[spec])
+            plans[pair] = resolve_graph([*self.indicators.values(), *extra])
+        self._plans = plans
+
+    async def load_plans(
+        self, session: AsyncSession, repository: Optional[UserPairRepository] = None
+    ) -> int:
+        """Build the plans from the subscribers' settings; return the pairs with one."""
+
+        repository = repository or UserPairRepository()
+        specs = collect_indicator_specs(
+            await repository.get_indicator_settings(session)
+        )
+        self.set_plans(specs)
+        self.logger.info("indicator_plans_loaded", pairs=len(specs))
+        return len(specs)
+
+    def get_performance_stats(self) -> Dict[str, Any]:
+        snapshot = self.processing_times.snapshot()
+        if not snapshot.count:
+            return {}
+        return snapshot.summary()
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+"""Run bulk indicator jobs in worker processes.
+
+Seeding, backfill replays and recomputation after cache invalidation walk
+thousands of bars for many pairs at once; done on the event loop they stall
+WebSocket receiving. :class:`IndicatorExecutor` packs the price series of a
+batch into one shared-memory ``float64`` block, hands each worker a list of
+``(offset, length)`` slices and gets back only the small result dicts, so
+prices are never pickled. Small batches are still computed inline, where
+process hand-off would cost more than the maths. :meth:`IndicatorExecutor.call`
+offloads any other picklable replay, such as an engine warm-up, the same way.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+import numpy as np
+
+from src.services.indicators.indicator_math import INDICATOR_FUNCTIONS, IndicatorResult
+from src.utils.logger import LoggerMixin
+from src.utils.metrics_registry import metrics_registry
+from src.utils.time_helpers import get_high_precision_timestamp, get_time_since_ms
+
+# (indicator, period, offset, length) into the shared price block
+_Slice = Tuple[str, int, int, int]
+
+T = TypeVar("T")
+
+
+@dataclass
+class IndicatorJob:
+    """One indicator computation over a price series (oldest first)."""
+
+    indicator: str
+    symbol: str
+    timeframe: str
+    period: int
+    prices: Sequence[float]
+
+
+def _compute_inline(jobs: Sequence[IndicatorJob]) -> List[IndicatorResult]:
+    return [INDICATOR_FUNCTIONS[job.indicator](job.prices, job.period) for job in jobs]
+
+
+def _compute_slices(
+    shm_name: str, size: int, slices: List[_Slice]
+) -> List[IndicatorResult]:
+    """Worker entry point: compute ``slices`` of the shared price block."""
+
+    shm = SharedMemory(name=shm_name)
+    try:
+        prices = np.ndarray((size,), dtype=np.float64, buffer=shm.buf)
+        results = [
+            INDICATOR_FUNCTIONS[indicator](
+                prices[offset : offset + length].tolist(), period
+            )
+            for indicator, period, offset, length in slices
+        ]
+        del prices
+        return results
+    finally:
+        shm.close()
+
+
+def _warm_worker() -> int:
+    return os.getpid()
+
+
+class IndicatorExecutor(LoggerMixin):
+    """Dispatch bulk indicator jobs to a process pool."""
+
+    MIN_OFFLOAD_PRICES = 20_000
+    PACK_YIELD_PRICES = 200_000
+    CHUNKS_PER_WORKER = 4
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        min_offload_prices: int = MIN_OFFLOAD_PRICES,
+    ) -> None:  # noqa: D401 - short
+        super().__init__()
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.min_offload_prices = min_offload_prices
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.batch_times = metrics_registry.histogram("indicator_batch_ms")
+        self._jobs = metrics_registry.counter("indicator_jobs_total", {"mode": "pool"})
+        self._inline_jobs = metrics_registry.counter(
+            "indicator_jobs_total", {"mode": "inline"}
+        )
+
+    async def start(self) -> None:
+        """Create the pool and spawn its workers ahead of the first batch."""
+
+        if self._pool is not None:
+            return
+        # fork would copy the loop's threads and sockets into the workers
+        method = (
+            "forkserver"
+            if "forkserver" in multiprocessing.get_all_start_methods()
+            else "spawn"
+        )
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context(method),
+        )
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(self._pool, _warm_worker)
+                for _ in range(self.max_workers)
+            )
+        )
+        self.logger.info(
+            "indicator_executor_started", workers=self.max_workers, method=method
+        )
+
+    async def shutdown(self) -> None:
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.to_thread(pool.shutdown, True, cancel_futures=True)
+
+    async def run(self, jobs: Sequence[IndicatorJob]) -> List[IndicatorResult]:
+        """Compute ``jobs`` and return their results in the same order."""
+
+        if not jobs:
+            return []
+        start = get_high_precision_timestamp()
+        total = sum(len(job.prices) for job in jobs)
+        if self._pool is None or total < self.min_offload_prices:
+            results = _compute_inline(jobs)
+            self._inline_jobs.inc(len(jobs))
+        else:
+            results = await self._run_pooled(jobs)
+            self._jobs.inc(len(jobs))
+        self.batch_times.record(get_time_since_ms(start))
+        return results
+
+    async def call(self, func: Callable[..., T], *args: Any, size: int = 0) -> T:
+        """Return ``func(*args)``, computed in a worker process for big inputs.
+
+        ``size`` is the work in price-equivalents (e.g. candles times
+        indicators); below ``min_offload_prices`` or without a started pool
+        ``func`` runs inline. ``func`` and ``args`` must be picklable.
+        """
+
+        start = get_high_precision_timestamp()
+        if self._pool is None or size < self.min_offload_prices:
+            result = func(*args)
+            self._inline_jobs.inc()
+        else:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._pool, func, *args)
+            self._jobs.inc()
+        self.batch_times.record(get_time_since_ms(start))
+        return result
+
+    async def _run_pooled(self, jobs: Sequence[IndicatorJob]) -> List[IndicatorResult]:
+        assert self._pool is not None
+        # several indicators of one pair usually share a series: store it once
+        series: Dict[int, Tuple[int, Sequence[float]]] = {}
+        total = 0
+        for job in jobs:
+            if id(job.prices) not in series:
+                series[id(job.prices)] = (total, job.prices)
+                total += len(job.prices)
+
+        shm = SharedMemory(create=True, size=max(total, 1) * 8)
+        try:
+            block = np.ndarray((total,), dtype=np.float64, buffer=shm.buf)
+            packed = 0
+            for offset, prices in series.values():
+                block[offset : offset + len(prices)] = prices
+                packed += len(prices)
+                if packed >= self.PACK_YIELD_PRICES:
+                    packed = 0
+                    await asyncio.sleep(0)  # let the loop breathe
+            del block
+            slices: List[_Slice] = [
+                (job.indicator, job.period, series[id(job.prices)][0], len(job.prices))
+                for job in jobs
+            ]
+
+            chunk_count = min(len(slices), self.max_workers * self.CHUNKS_PER_WORKER)
+            step = -(-len(slices) // chunk_count)
+            loop = asyncio.get_running_loop()
+            chunks = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        self._pool,
+                        _compute_slices,
+                        shm.name,
+                        total,
+                        slices[i : i + step],
+                    )
+                    for i in range(0, len(slices), step)
+                )
+            )
+        finally:
+            shm.close()
+            shm.unlink()
+        return [result for chunk in chunks for result in chunk]
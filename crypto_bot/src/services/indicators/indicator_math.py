@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+"""Pure indicator maths over price sequences.
+
+These functions hold no I/O or shared state, so the same code runs inline on
+the event loop and inside :mod:`indicator_executor` worker processes.
+"""
+
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+IndicatorResult = Optional[Dict[str, Any]]
+
+
+def rsi_from_averages(avg_gain: float, avg_loss: float) -> float:
+    return 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def rsi_step(
+    state: Mapping[str, Any], price: float, period: int
+) -> Tuple[float, float, float]:
+    """Return ``(rsi, avg_gain, avg_loss)`` after one more close at ``price``.
+
+    ``state`` is not modified: committed state advances with this once per
+    closed candle, previews of the open candle call it and discard the
+    averages.
+    """
+
+    previous = state.get("previous_price", price)
+    change = price - previous
+    keep = period - 1
+    avg_gain = (
+        state.get("avg_gain", 0.0) * keep + (change if change > 0 else 0.0)
+    ) / period
+    avg_loss = (
+        state.get("avg_loss", 0.0) * keep + (-change if change < 0 else 0.0)
+    ) / period
+    return rsi_from_averages(avg_gain, avg_loss), avg_gain, avg_loss
+
+
+def rsi_seed(prices: Sequence[float], period: int) -> IndicatorResult:
+    """Seed RSI state from ``prices`` (oldest first).
+
+    The first ``period`` changes are averaged, the remaining ones are folded
+    in with Wilder's smoothing. The returned state is what
+    :func:`rsi_step` continues from.
+
+    Wilder's recursion ``avg = avg * (1 - 1/n) + x / n`` is expanded into one
+    weighted sum, so a long warm-up costs a single numpy pass instead of a
+    Python loop per bar.
+    """
+
+    if period <= 0 or len(prices) < period + 1:
+        return None
+    changes = np.diff(np.asarray(prices, dtype=np.float64))
+    gains = np.maximum(changes, 0.0)
+    losses = np.maximum(-changes, 0.0)
+    avg_gain = float(gains[:period].mean())
+    avg_loss = float(losses[:period].mean())
+    rest = changes.size - period
+    if rest:
+        decay = (period - 1) / period
+        # weight of each later change in the final average, newest last
+        weights = decay ** np.arange(rest - 1, -1, -1, dtype=np.float64) / period
+        carry = decay**rest
+        avg_gain = avg_gain * carry + float(gains[period:] @ weights)
+        avg_loss = avg_loss * carry + float(losses[period:] @ weights)
+    return {
+        "rsi": rsi_from_averages(avg_gain, avg_loss),
+        "avg_gain": avg_gain,
+        "avg_loss": avg_loss,
+        "previous_price": float(prices[-1]),
+        "period": period,
+    }
+
+
+def ema_seed(prices: Sequence[float], period: int) -> IndicatorResult:
+    """Seed an EMA from ``prices``: SMA of the first ``period``, then EMA."""
+
+    if period <= 0 or len(prices) < period:
+        return None
+    ema = sum(prices[:period]) / period
+    k = 2 / (period + 1)
+    for price in prices[period:]:
+        ema = price * k + ema * (1 - k)
+    return {"ema": ema, "period": period}
+
+
+INDICATOR_FUNCTIONS: Dict[str, Callable[[Sequence[float], int], IndicatorResult]] = {
+    "rsi": rsi_seed,
+    "ema": ema_seed,
+}
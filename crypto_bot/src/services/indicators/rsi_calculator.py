@@ -1,25 +1,51 @@
 import asyncio
-from typing import Any, Dict, List, Tuple
-import math
+from typing import Any, Dict, Optional, Sequence, Tuple
 from datetime import datetime, timezone, timedelta
 
 from src.services.cache.indicator_cache import IndicatorCache
 from src.services.cache.candle_cache import CandleCache
+from src.services.indicators.indicator_executor import IndicatorExecutor, IndicatorJob
+from src.services.indicators.indicator_math import rsi_from_averages, rsi_step
 from src.utils.logger import LoggerMixin
-from src.utils.math_helpers import safe_divide
+from src.utils.metrics_registry import metrics_registry
+from src.utils.constants import RSI_WARMUP_PERIODS
 from src.utils.performance_utils import measure_time
-from src.utils.time_helpers import get_high_precision_timestamp, get_time_since_ms
+from src.utils.time_helpers import (
+    get_high_precision_timestamp,
+    get_time_since_ms,
+    timeframe_state_ttl,
+    timeframe_to_milliseconds,
+    to_timestamp_ms,
+)
 from src.utils.validators import validate_rsi_inputs
 
 
 class RSICalculator(LoggerMixin):
     """Calculate Relative Strength Index values in real time."""
 
-    def __init__(self, indicator_cache: IndicatorCache, candle_cache: CandleCache) -> None:
+    def __init__(
+        self,
+        indicator_cache: IndicatorCache,
+        candle_cache: CandleCache,
+        executor: Optional[IndicatorExecutor] = None,
+        warmup_periods: int = RSI_WARMUP_PERIODS,
+    ) -> None:
         super().__init__()
         self.indicator_cache = indicator_cache
         self.candle_cache = candle_cache
-        self.processing_times: List[int] = []
+        self.executor = executor or IndicatorExecutor()
+        self.warmup_periods = max(1, warmup_periods)
+        self.processing_times = metrics_registry.histogram("rsi_calculation_ms")
+        self._short_history = metrics_registry.counter("rsi_seed_short_history_total")
+        # cold-start seeds in progress, shared by concurrent callers
+        self._seeding: Dict[
+            Tuple[str, str, int], asyncio.Task[Dict[str, Any] | None]
+        ] = {}
+
+    def warmup_size(self, period: int) -> int:
+        """Number of closed candles a seed of ``period`` reads and requires."""
+
+        return period * self.warmup_periods + 1
 
     @measure_time(target_ms=100)
     async def calculate_real_time_rsi(
@@ -28,55 +54,101 @@ class RSICalculator(LoggerMixin):
         timeframe: str,
         current_price: float,
         period: int = 14,
-    ) -> Tuple[float | None, int]:
-        """Return RSI value for ``symbol`` and processing time in ms."""
+        *,
+        is_closed: bool = True,
+        close_time_ms: Optional[int] = None,
+    ) -> Tuple[float | None, float]:
+        """Return RSI value for ``symbol`` and processing time in ms.
+
+        Only a closed candle advances (and saves) the committed Wilder
+        averages. For the still open candle a preview is computed from the
+        committed state without writing anything, so it can be called on
+        every tick. A close at or before the committed ``close_time_ms``
+        (a replayed message) is not folded in twice, and one more than a
+        candle after it reseeds the state from the cache.
+        """
 
         start = get_high_precision_timestamp()
-        state = await self._get_cached_rsi_state(symbol, timeframe, period)
+        state = await self._get_cached_rsi_state(
+            symbol, timeframe, period, close_time_ms
+        )
         if state is None:
-            rsi, state = await self.calculate_rsi(symbol, timeframe, period)
+            # seeded from closed candles, including the one closing now
+            state = await self._seed_rsi_state(symbol, timeframe, period)
+            if state is None:
+                rsi = None
+            elif is_closed:
+                rsi = rsi_from_averages(state["avg_gain"], state["avg_loss"])
+                if close_time_ms is not None:
+                    state["close_time_ms"] = close_time_ms
+                await self._save_rsi_state(symbol, timeframe, period, state)
+            else:
+                await self._save_rsi_state(symbol, timeframe, period, state)
+                rsi = self.preview_rsi(state, current_price, period)
+        elif not is_closed:
+            rsi = self.preview_rsi(state, current_price, period)
+        elif close_time_ms is not None and close_time_ms <= state.get(
+            "close_time_ms", -1
+        ):
+            rsi = rsi_from_averages(state["avg_gain"], state["avg_loss"])
         else:
             rsi, state = self.update_rsi_incremental(state, current_price, period)
-        state["previous_price"] = current_price
-        state["last_update"] = datetime.now(timezone.utc).isoformat()
-        await self._save_rsi_state(symbol, timeframe, period, state)
-        elapsed = int(get_time_since_ms(start))
-        self.processing_times.append(elapsed)
+            state["previous_price"] = current_price
+            if close_time_ms is not None:
+                state["close_time_ms"] = close_time_ms
+            state["last_update"] = datetime.now(timezone.utc).isoformat()
+            await self._save_rsi_state(symbol, timeframe, period, state)
+        elapsed = get_time_since_ms(start)
+        self.processing_times.record(elapsed)
         return rsi, elapsed
 
     def update_rsi_incremental(
         self, state: Dict[str, Any], current_price: float, period: int
     ) -> Tuple[float, Dict[str, Any]]:
-        """Update RSI values using incremental formula."""
-
-        previous_price = state.get("previous_price", current_price)
-        gain = max(0.0, current_price - previous_price)
-        loss = max(0.0, previous_price - current_price)
-        avg_gain = (state.get("avg_gain", 0.0) * (period - 1) + gain) / period
-        avg_loss = (state.get("avg_loss", 0.0) * (period - 1) + loss) / period
-        if avg_loss == 0:
-            rsi = 100.0
-        else:
-            rs = safe_divide(avg_gain, avg_loss)
-            rsi = 100 - (100 / (1 + rs))
+        """Advance the committed averages by one closed candle."""
+
+        rsi, avg_gain, avg_loss = rsi_step(state, current_price, period)
         state.update({"avg_gain": avg_gain, "avg_loss": avg_loss})
         return rsi, state
 
+    @staticmethod
+    def preview_rsi(state: Dict[str, Any], current_price: float, period: int) -> float:
+        """RSI as if the open candle closed at ``current_price``; ``state`` is kept."""
+
+        return rsi_step(state, current_price, period)[0]
+
     async def _get_cached_rsi_state(
-        self, symbol: str, timeframe: str, period: int
+        self,
+        symbol: str,
+        timeframe: str,
+        period: int,
+        close_time_ms: Optional[int] = None,
     ) -> Dict[str, Any] | None:
-        """Return cached RSI state if it is not older than an hour."""
+        """Return cached RSI state unless it missed a candle close.
+
+        The state is dropped when ``close_time_ms`` is more than one candle
+        after the committed close, or when it was not updated within
+        :func:`timeframe_state_ttl`; either way the caller reseeds it.
+        """
 
         state = await self.indicator_cache.get_calculation_state(
             "rsi", symbol, timeframe, period
         )
         if not state:
             return None
+        last_close = state.get("close_time_ms")
+        if (
+            close_time_ms is not None
+            and last_close is not None
+            and close_time_ms - last_close > timeframe_to_milliseconds(timeframe)
+        ):
+            return None
         ts = state.get("last_update")
         if ts:
             try:
                 dt = datetime.fromisoformat(ts)
-                if datetime.now(timezone.utc) - dt > timedelta(hours=1):
+                max_age = timedelta(seconds=timeframe_state_ttl(timeframe))
+                if datetime.now(timezone.utc) - dt > max_age:
                     return None
             except Exception:  # noqa: BLE001 - defensive
                 return None
@@ -86,46 +158,105 @@ class RSICalculator(LoggerMixin):
         self, symbol: str, timeframe: str, period: int, state: Dict[str, Any]
     ) -> None:
         await self.indicator_cache.save_calculation_state(
-            "rsi", symbol, timeframe, period, state, ttl=3600
+            "rsi", symbol, timeframe, period, state, ttl=timeframe_state_ttl(timeframe)
         )
 
-    async def calculate_rsi(
+    async def _seed_rsi_state(
         self, symbol: str, timeframe: str, period: int
-    ) -> Tuple[float | None, Dict[str, Any]]:
-        """Perform full RSI calculation from historical prices."""
+    ) -> Dict[str, Any] | None:
+        """Seed state once even if several updates of a cold pair overlap."""
 
+        key = (symbol, timeframe, period)
+        task = self._seeding.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute_seed(symbol, timeframe, period))
+            self._seeding[key] = task
+            task.add_done_callback(lambda _: self._seeding.pop(key, None))
+        state = await asyncio.shield(task)
+        # every caller goes on to modify its own copy
+        return dict(state) if state is not None else None
+
+    async def _compute_seed(
+        self, symbol: str, timeframe: str, period: int
+    ) -> Dict[str, Any] | None:
+        size = self.warmup_size(period)
         prices = await self.candle_cache.get_recent_prices(
-            symbol, timeframe, limit=period + 1
+            symbol, timeframe, limit=size, closed_only=True
         )
+        if len(prices) < size:
+            # a shorter seed is biased and produces false crossings, so
+            # there is no RSI until the cache holds the full warm-up
+            self._short_history.inc()
+            return None
         if not validate_rsi_inputs(prices, period):
+            return None
+        job = IndicatorJob("rsi", symbol, timeframe, period, prices)
+        (state,) = await self.executor.run([job])
+        if state is not None:
+            state.pop("rsi")
+            state["last_update"] = datetime.now(timezone.utc).isoformat()
+        return state
+
+    async def calculate_rsi(
+        self, symbol: str, timeframe: str, period: int
+    ) -> Tuple[float | None, Dict[str, Any]]:
+        """Perform full RSI calculation from the closed candles in the cache."""
+
+        state = await self._seed_rsi_state(symbol, timeframe, period)
+        if state is None:
             return None, {}
-        gains: List[float] = []
-        losses: List[float] = []
-        for prev, curr in zip(prices, prices[1:]):
-            change = curr - prev
-            gains.append(max(0.0, change))
-            losses.append(max(0.0, -change))
-        avg_gain = sum(gains) / period
-        avg_loss = sum(losses) / period
-        if avg_loss == 0:
-            rsi = 100.0
-        else:
-            rs = safe_divide(avg_gain, avg_loss)
-            rsi = 100 - (100 / (1 + rs))
-        state = {
-            "previous_price": prices[-1],
-            "avg_gain": avg_gain,
-            "avg_loss": avg_loss,
-            "period": period,
-            "last_update": datetime.now(timezone.utc).isoformat(),
-        }
         await self._save_rsi_state(symbol, timeframe, period, state)
-        return rsi, state
+        return rsi_from_averages(state["avg_gain"], state["avg_loss"]), state
+
+    async def recalculate_many(
+        self,
+        pairs: Sequence[Tuple[str, str]],
+        period: int = 14,
+        history: Optional[int] = None,
+    ) -> Dict[Tuple[str, str], float | None]:
+        """Seed RSI state for many ``(symbol, timeframe)`` pairs at once.
+
+        Used for warm-ups, backfills and recomputation after invalidation;
+        the maths runs in the executor's worker processes when it is started.
+        Pairs with fewer than :meth:`warmup_size` closed candles get ``None``.
+        The saved states record the close time of the last candle read, so a
+        redelivered candle is not folded in again.
+        """
+
+        limit = max(history or 0, self.warmup_size(period))
+        histories = await asyncio.gather(
+            *(self.candle_cache.get_closed_candles(s, tf, limit) for s, tf in pairs)
+        )
+        values: Dict[Tuple[str, str], float | None] = {}
+        jobs = []
+        close_times = []
+        for (symbol, timeframe), candles in zip(pairs, histories):
+            if len(candles) < self.warmup_size(period):
+                self._short_history.inc()
+                values[(symbol, timeframe)] = None
+                continue
+            prices = [float(c.get("close_price") or c.get("c", 0.0)) for c in candles]
+            jobs.append(IndicatorJob("rsi", symbol, timeframe, period, prices))
+            close_times.append(to_timestamp_ms(candles[-1].get("close_time")))
+        results = await self.executor.run(jobs)
+        now = datetime.now(timezone.utc).isoformat()
+        saves = []
+        for job, result, close_time_ms in zip(jobs, results, close_times):
+            if result is None:
+                values[(job.symbol, job.timeframe)] = None
+                continue
+            values[(job.symbol, job.timeframe)] = result.pop("rsi")
+            result["last_update"] = now
+            if close_time_ms is not None:
+                result["close_time_ms"] = close_time_ms
+            saves.append(
+                self._save_rsi_state(job.symbol, job.timeframe, period, result)
+            )
+        await asyncio.gather(*saves)
+        return values
 
     def get_performance_stats(self) -> Dict[str, Any]:
-        if not self.processing_times:
+        snapshot = self.processing_times.snapshot()
+        if not snapshot.count:
             return {}
-        times = sorted(self.processing_times)
-        avg = sum(times) / len(times)
-        p95 = times[int(len(times) * 0.95) - 1]
-        return {"avg_ms": avg, "max_ms": max(times), "p95_ms": p95}
+        return snapshot.summary()
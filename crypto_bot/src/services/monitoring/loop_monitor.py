@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+"""Event-loop health: scheduling lag and slow callbacks.
+
+Telegram polling, the WebSocket receive loop, indicator maths and DB/Redis
+I/O all share one asyncio loop, so any CPU-heavy step delays everything
+else. :class:`EventLoopMonitor` measures that delay in two ways:
+
+* a probe task sleeps for a fixed interval and records how late it wakes
+  up into :class:`PerformanceMonitor` under ``event_loop_lag``;
+* a watchdog thread notices when the probe's heartbeat is overdue by more
+  than ``slow_callback_ms`` and captures the loop thread's stack while the
+  stall is still in progress, so the offending coroutine is logged.
+
+asyncio's own debug slow-callback logging is not used: aiogram installs
+uvloop when it is available, and uvloop has no such hook.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+from collections import deque
+from time import perf_counter_ns
+from typing import Any, Deque, Dict, List, Optional
+
+from src.services.real_time.performance_monitor import PerformanceMonitor
+from src.utils.logger import LoggerMixin
+from src.utils.metrics_registry import metrics_registry
+
+LOOP_LAG_OPERATION = "event_loop_lag"
+
+_NS_PER_MS = 1_000_000
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+_STACK_DEPTH = 12
+
+
+def describe_stack(frame) -> Dict[str, Any]:  # type: ignore[no-untyped-def]
+    """Return the culprit (innermost non-asyncio frame) and a short stack."""
+
+    stack: List[str] = []
+    culprit: Optional[str] = None
+    while frame is not None:
+        code = frame.f_code
+        location = (
+            f"{getattr(code, 'co_qualname', code.co_name)} "
+            f"({code.co_filename}:{frame.f_lineno})"
+        )
+        if culprit is None and not code.co_filename.startswith(_ASYNCIO_DIR):
+            culprit = location
+        if len(stack) < _STACK_DEPTH:
+            stack.append(location)
+        frame = frame.f_back
+    return {"callback": culprit or (stack[0] if stack else "<unknown>"), "stack": stack}
+
+
+class EventLoopMonitor(LoggerMixin):
+    """Measure scheduling lag and report callbacks that stall the loop."""
+
+    RECENT_SLOW_CALLBACKS = 20
+
+    def __init__(
+        self,
+        performance_monitor: PerformanceMonitor,
+        interval_ms: float = 100.0,
+        slow_callback_ms: float = 50.0,
+    ) -> None:  # noqa: D401 - short
+        super().__init__()
+        self.performance_monitor = performance_monitor
+        self.interval = interval_ms / 1000
+        self.slow_callback_ns = int(slow_callback_ms * _NS_PER_MS)
+        self.recent_slow: Deque[Dict[str, Any]] = deque(
+            maxlen=self.RECENT_SLOW_CALLBACKS
+        )
+        self._slow_counter = metrics_registry.counter("event_loop_slow_callbacks_total")
+        self._task: Optional[asyncio.Task[None]] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread = 0
+        self._due_ns = 0
+        self._pending: Optional[Dict[str, Any]] = None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._due_ns = perf_counter_ns() + int(self.interval * 1_000_000_000)
+        self._stop.clear()
+        self._task = asyncio.create_task(self._probe())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._watchdog is not None:
+            self._stop.set()
+            self._watchdog.join()
+            self._watchdog = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        hist = self.performance_monitor.times.get(LOOP_LAG_OPERATION)
+        stats: Dict[str, Any] = hist.snapshot().summary() if hist is not None else {}
+        stats["slow_callbacks"] = int(self._slow_counter.value)
+        stats["recent_slow_callbacks"] = list(self.recent_slow)
+        return stats
+
+    # ------------------------------------------------------------------
+    async def _probe(self) -> None:
+        interval_ns = int(self.interval * 1_000_000_000)
+        while True:
+            await asyncio.sleep(self.interval)
+            now = perf_counter_ns()
+            lag_ns = max(0, now - self._due_ns)
+            self._due_ns = now + interval_ns
+            self.performance_monitor.record_processing_time(
+                LOOP_LAG_OPERATION, lag_ns / _NS_PER_MS
+            )
+            stall, self._pending = self._pending, None
+            if stall is not None:
+                # the stall is over: report its full length
+                stall["time_ms"] = lag_ns / _NS_PER_MS
+                self.logger.warning(
+                    "slow_event_loop_callback",
+                    callback=stall["callback"],
+                    time_ms=stall["time_ms"],
+                    stack=stall["stack"],
+                )
+
+    def _watch(self) -> None:
+        check_interval = self.slow_callback_ns / _NS_PER_MS / 1000 / 2
+        reported_due = 0
+        while not self._stop.wait(check_interval):
+            due = self._due_ns
+            overdue = perf_counter_ns() - due
+            if overdue <= self.slow_callback_ns or due == reported_due:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            reported_due = due
+            entry = describe_stack(frame)
+            entry["time_ms"] = overdue / _NS_PER_MS
+            self._slow_counter.inc()
+            self.recent_slow.append(entry)
+            self._pending = entry
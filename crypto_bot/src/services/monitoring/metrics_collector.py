@@ -8,8 +8,7 @@ from typing import Any, Dict
 
 import psutil
 
-from src.data.redis_client import get_redis
-from src.utils.time_helpers import get_current_timestamp
+from src.utils.metrics_registry import MetricsRegistry, metrics_registry
 
 
 @dataclass
@@ -35,10 +34,14 @@ class PerformanceMetrics:
 
 
 class MetricsCollector:
-    """Collect metrics and store in Redis time-series structures."""
+    """Collect system metrics into in-process gauges.
 
-    def __init__(self) -> None:
-        self.redis = get_redis()
+    Values are served by :class:`MetricsExporter`; history is kept by the
+    scraping Prometheus server, so nothing is written to Redis.
+    """
+
+    def __init__(self, registry: MetricsRegistry = metrics_registry) -> None:
+        self.registry = registry
 
     async def collect_all_metrics(self) -> Dict[str, Any]:
         """Collect system metrics."""
@@ -59,14 +62,10 @@ class MetricsCollector:
         return metrics
 
     async def store_metrics(self, metrics: Dict[str, Any]) -> None:
-        """Store metrics in Redis sorted sets."""
+        """Publish metrics as ``system_<name>`` gauges."""
 
-        timestamp = get_current_timestamp()
         for metric_name, value in metrics.items():
-            key = f"metrics:{metric_name}"
-            await self.redis.zadd(key, {str(value): timestamp})
-            cutoff = timestamp - 86400
-            await self.redis.zremrangebyscore(key, 0, cutoff)
+            self.registry.gauge(f"system_{metric_name}").set(float(value))
 
     async def generate_performance_report(self) -> Dict[str, Any]:  # pragma: no cover - placeholder
         return {}
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+"""HTTP endpoint exposing the metrics registry in Prometheus text format."""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import orjson
+from aiohttp import web
+
+from src.utils.logger import LoggerMixin
+from src.utils.metrics_registry import LabelKey, MetricsRegistry, metrics_registry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+HealthFunc = Callable[[], Awaitable[Dict[str, Any]]]
+SUMMARY_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key: LabelKey, extra: Optional[tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    body = ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs)
+    return "{" + body + "}"
+
+
+def render_metrics(registry: MetricsRegistry = metrics_registry) -> str:
+    """Render all metrics of ``registry`` as Prometheus exposition text.
+
+    Histograms are exported as summaries (p50/p95/p99 plus ``_sum`` and
+    ``_count``) since their log buckets are far too many to expose.
+    """
+
+    lines: List[str] = []
+    typed: set[str] = set()
+
+    def header(name: str, kind: str) -> None:
+        if name in typed:
+            return
+        typed.add(name)
+        help_text = registry.help_for(name)
+        if help_text:
+            lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    for name, key, counter in registry.counters():
+        header(name, "counter")
+        lines.append(f"{name}{_labels(key)} {counter.value}")
+    for name, key, gauge in registry.gauges():
+        header(name, "gauge")
+        lines.append(f"{name}{_labels(key)} {gauge.value}")
+    for name, key, hist in registry.histograms():
+        header(name, "summary")
+        snapshot = hist.snapshot()
+        for q in SUMMARY_QUANTILES:
+            value = snapshot.percentile(q * 100)
+            lines.append(f"{name}{_labels(key, ('quantile', str(q)))} {value}")
+        lines.append(f"{name}_sum{_labels(key)} {snapshot.total}")
+        lines.append(f"{name}_count{_labels(key)} {snapshot.count}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter(LoggerMixin):
+    """Serve ``GET /metrics`` from memory for Prometheus scrapes.
+
+    With ``health_func`` a ``GET /health`` JSON endpoint is served as well.
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry = metrics_registry,
+        host: str = "0.0.0.0",
+        port: int = 9100,
+        health_func: Optional[HealthFunc] = None,
+    ) -> None:  # noqa: D401 - short
+        super().__init__()
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.health_func = health_func
+        self._runner: Optional[web.AppRunner] = None
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_metrics)
+        if self.health_func is not None:
+            app.router.add_get("/health", self.handle_health)
+        return app
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=render_metrics(self.registry).encode(),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        assert self.health_func is not None
+        return web.Response(
+            body=orjson.dumps(await self.health_func(), default=str),
+            content_type="application/json",
+        )
+
+    async def start(self) -> None:
+        if self._runner is not None:
+            return
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.logger.info("metrics_exporter_started", host=self.host, port=self.port)
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
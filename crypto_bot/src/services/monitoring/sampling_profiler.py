@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+"""On-demand sampling profiler for the event loop thread.
+
+A background thread periodically reads the loop thread's current frame via
+:func:`sys._current_frames` and counts the stacks it sees. Only the coroutine
+that is actually running shows up, so the samples describe where the loop
+spends its time rather than where tasks are parked. Every sample is also
+attributed to the innermost ``src`` frame's class (``RealTimeProcessor``,
+``IndicatorCache``, ``AntiSpamManager`` ...). Results are written to
+``logs/`` as collapsed stacks (flamegraph.pl / speedscope) and as a
+speedscope JSON file.
+
+Nothing is hooked while the profiler is off; when on, the loop thread only
+pays for the GIL hand-offs to the sampler.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.logger import LoggerMixin
+
+FrameKey = Tuple[str, str, int]
+
+_SRC_MARKER = f"{os.sep}src{os.sep}"
+IDLE_COMPONENT = "<idle>"
+OTHER_COMPONENT = "<other>"
+
+
+@dataclass
+class ProfileResult:
+    """Outcome of one profiling session."""
+
+    samples: int
+    duration_s: float
+    components: Dict[str, float] = field(default_factory=dict)
+    collapsed_path: Optional[str] = None
+    speedscope_path: Optional[str] = None
+
+    def top_components(self, limit: int = 8) -> List[Tuple[str, float]]:
+        ordered = sorted(
+            self.components.items(), key=lambda item: item[1], reverse=True
+        )
+        return ordered[:limit]
+
+
+def _frame_key(frame) -> FrameKey:  # type: ignore[no-untyped-def]
+    code = frame.f_code
+    return (
+        code.co_filename,
+        getattr(code, "co_qualname", code.co_name),
+        code.co_firstlineno,
+    )
+
+
+def _component(stack: Tuple[FrameKey, ...]) -> str:
+    for filename, qualname, _ in reversed(stack):
+        if _SRC_MARKER in filename:
+            return qualname.split(".", 1)[0] if "." in qualname else qualname
+    if stack and stack[-1][1].endswith("select"):
+        return IDLE_COMPONENT
+    return OTHER_COMPONENT
+
+
+def _frame_name(key: FrameKey) -> str:
+    filename, qualname, _ = key
+    module = os.path.splitext(os.path.basename(filename))[0]
+    return f"{module}:{qualname}"
+
+
+class SamplingProfiler(LoggerMixin):
+    """Sample one thread's stack at a fixed interval for a bounded time."""
+
+    MAX_DURATION_S = 300.0
+
+    def __init__(
+        self,
+        interval_ms: float = 5.0,
+        output_dir: str = "logs",
+        max_depth: int = 128,
+    ) -> None:  # noqa: D401 - short
+        super().__init__()
+        self.interval = interval_ms / 1000
+        self.output_dir = output_dir
+        self.max_depth = max_depth
+        self.last_result: Optional[ProfileResult] = None
+        self._stacks: Counter[Tuple[FrameKey, ...]] = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float, thread_id: Optional[int] = None) -> bool:
+        """Profile ``thread_id`` (default: the caller's thread) for ``duration`` s.
+
+        Returns ``False`` if a session is already running. Safe to call from a
+        signal handler; the files are written by the sampler thread when the
+        session ends.
+        """
+
+        if self.is_running:
+            return False
+        duration = min(max(duration, self.interval), self.MAX_DURATION_S)
+        target = thread_id if thread_id is not None else threading.get_ident()
+        self._stacks = Counter()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(target, duration),
+            name="sampling-profiler",
+            daemon=True,
+        )
+        self._thread.start()
+        self.logger.info(
+            "profiler_started", duration_s=duration, interval_s=self.interval
+        )
+        return True
+
+    def stop(self) -> Optional[ProfileResult]:
+        """End the running session early and return its result."""
+
+        thread = self._thread
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+            self._thread = None
+        return self.last_result
+
+    async def profile_for(self, duration: float) -> Optional[ProfileResult]:
+        """Profile the calling event loop for ``duration`` seconds (capped)."""
+
+        duration = min(duration, self.MAX_DURATION_S)
+        if not self.start(duration):
+            return None
+        await asyncio.sleep(duration)
+        return await asyncio.to_thread(self.stop)
+
+    # ------------------------------------------------------------------
+    def _run(self, target: int, duration: float) -> None:
+        started = time.monotonic()
+        deadline = started + duration
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            frame = sys._current_frames().get(target)
+            if frame is not None:
+                self._stacks[self._walk(frame)] += 1
+            self._stop.wait(self.interval)
+        self.last_result = self._write(time.monotonic() - started)
+
+    def _walk(self, frame) -> Tuple[FrameKey, ...]:  # type: ignore[no-untyped-def]
+        keys: List[FrameKey] = []
+        while frame is not None and len(keys) < self.max_depth:
+            keys.append(_frame_key(frame))
+            frame = frame.f_back
+        keys.reverse()  # root first
+        return tuple(keys)
+
+    def _write(self, duration: float) -> ProfileResult:
+        total = sum(self._stacks.values())
+        per_component: Counter[str] = Counter()
+        for stack, count in self._stacks.items():
+            per_component[_component(stack)] += count
+        result = ProfileResult(
+            samples=total,
+            duration_s=duration,
+            components={
+                name: count * 100 / total for name, count in per_component.items()
+            }
+            if total
+            else {},
+        )
+        if not total:
+            self.logger.warning("profiler_no_samples")
+            return result
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        base = os.path.join(self.output_dir, f"profile-{stamp}")
+        result.collapsed_path = base + ".folded"
+        result.speedscope_path = base + ".speedscope.json"
+
+        with open(result.collapsed_path, "w", encoding="utf-8") as fh:
+            for stack, count in self._stacks.most_common():
+                fh.write(";".join(_frame_name(key) for key in stack))
+                fh.write(f" {count}\n")
+
+        frames: Dict[FrameKey, int] = {}
+        samples: List[List[int]] = []
+        weights: List[float] = []
+        interval_ms = self.interval * 1000
+        for stack, count in self._stacks.items():
+            samples.append([frames.setdefault(key, len(frames)) for key in stack])
+            weights.append(count * interval_ms)
+        document = {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {
+                "frames": [
+                    {"name": _frame_name(key), "file": key[0], "line": key[2]}
+                    for key in frames
+                ]
+            },
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": "event loop",
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+            "name": os.path.basename(base),
+            "exporter": "crypto_bot.sampling_profiler",
+        }
+        with open(result.speedscope_path, "w", encoding="utf-8") as fh:
+            json.dump(document, fh)
+
+        self.logger.info(
+            "profiler_finished",
+            samples=total,
+            duration_s=round(duration, 2),
+            top=result.top_components(5),
+            path=result.speedscope_path,
+        )
+        return result
+
+
+sampling_profiler = SamplingProfiler()
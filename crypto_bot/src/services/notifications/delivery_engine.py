@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+"""Rate-limited Telegram delivery engine with a pool of concurrent senders."""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+
+from src.utils.exceptions import DeliveryFailedError
+from src.utils.logger import LoggerMixin
+from src.utils.metrics_registry import metrics_registry
+
+SendFunc = Callable[[int, str], Awaitable[Any]]
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``rate`` tokens/s."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now: float | None = None) -> float:
+        """Take a token if available and return 0, else seconds to wait."""
+
+        now = time.monotonic() if now is None else now
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self) -> None:
+        while True:
+            wait = self.reserve()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def block_for(self, seconds: float) -> None:
+        """Refuse tokens for ``seconds`` (used to honour ``retry_after``)."""
+
+        now = time.monotonic()
+        self.blocked_until = max(self.blocked_until, now + seconds)
+        self.tokens = 0.0
+        self.updated = now
+
+    def is_idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity and now >= self.blocked_until
+
+
+@dataclass
+class DeliveryResult:
+    chat_id: int
+    success: bool
+    latency_ms: float
+    attempts: int
+    error: Optional[str] = None
+    retriable: bool = True
+
+
+@dataclass(eq=False)
+class _Delivery:
+    chat_id: int
+    text: str
+    future: "asyncio.Future[DeliveryResult]"
+    enqueued_at: float = field(default_factory=time.monotonic)
+    attempts: int = 0
+
+
+class DeliveryEngine(LoggerMixin):
+    """Deliver messages near Telegram limits without triggering 429s.
+
+    A global bucket (~30 msg/s) and one bucket per chat (~1 msg/s) gate a
+    pool of worker tasks. A message whose chat bucket is empty is re-queued
+    after the required delay instead of holding a worker, so one busy chat
+    cannot stall deliveries to everyone else. ``retry_after`` from a 429
+    blocks that chat's bucket for the requested time before the retry.
+    Messages still waiting to be re-queued when the engine stops fail with
+    :class:`DeliveryFailedError`.
+    """
+
+    IDLE_BUCKET_PRUNE_INTERVAL = 60.0
+    LATENCY_SAMPLES = 10_000
+
+    def __init__(
+        self,
+        send_func: SendFunc,
+        *,
+        global_rate: float = 30.0,
+        per_chat_rate: float = 1.0,
+        workers: int = 8,
+        max_attempts: int = 3,
+        on_blocked: Callable[[int], None] | None = None,
+    ) -> None:
+        super().__init__()
+        self._send = send_func
+        # Capacity 1 spreads sends evenly instead of bursting a full second's
+        # worth at once, which a sliding-window limiter would reject.
+        self._global_bucket = TokenBucket(global_rate, capacity=1.0)
+        self._per_chat_rate = per_chat_rate
+        self._chat_buckets: Dict[int, TokenBucket] = {}
+        self._workers_count = workers
+        self._max_attempts = max_attempts
+        self._on_blocked = on_blocked
+        self._queue: "asyncio.Queue[_Delivery]" = asyncio.Queue()
+        self._workers: List[asyncio.Task[None]] = []
+        self._delayed: Dict[_Delivery, asyncio.TimerHandle] = {}
+        self._last_prune = time.monotonic()
+        self._latencies: Deque[float] = deque(maxlen=self.LATENCY_SAMPLES)
+        self._stats = {"sent": 0, "failed": 0, "retried": 0, "rate_limited": 0}
+        self._outcomes = {
+            outcome: metrics_registry.counter(
+                "telegram_deliveries_total", {"outcome": outcome}
+            )
+            for outcome in self._stats
+        }
+        self._latency = metrics_registry.histogram("telegram_delivery_latency_ms")
+        metrics_registry.gauge("delivery_queue_depth").set_function(self._queue.qsize)
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self._workers_count)
+        ]
+        self.logger.info("delivery_engine_started", workers=self._workers_count)
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        delayed, self._delayed = self._delayed, {}
+        for item, handle in delayed.items():
+            handle.cancel()
+            if not item.future.done():
+                item.future.set_exception(
+                    DeliveryFailedError("delivery engine stopped")
+                )
+
+    def submit(self, chat_id: int, text: str) -> "asyncio.Future[DeliveryResult]":
+        """Queue ``text`` for ``chat_id`` and return a future with the result."""
+
+        future: "asyncio.Future[DeliveryResult]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._queue.put_nowait(_Delivery(chat_id, text, future))
+        return future
+
+    async def deliver_many(
+        self, messages: List[Dict[str, Any]]
+    ) -> List[DeliveryResult]:
+        """Deliver ``{"user_id", "message"}`` dicts and wait for all results."""
+
+        await self.start()
+        futures = [self.submit(m["user_id"], m["message"]) for m in messages]
+        return list(await asyncio.gather(*futures))
+
+    def get_queue_size(self) -> int:
+        return self._queue.qsize()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._stats)
+        if self._latencies:
+            ordered = sorted(self._latencies)
+            stats["p50_latency_ms"] = ordered[len(ordered) // 2]
+            stats["p99_latency_ms"] = ordered[
+                min(len(ordered) - 1, int(len(ordered) * 0.99))
+            ]
+            stats["max_latency_ms"] = ordered[-1]
+        return stats
+
+    # ------------------------------------------------------------------
+    async def _worker(self) -> None:
+        while True:
+            item = await self._queue.get()
+            try:
+                await self._process(item)
+            except Exception as exc:  # noqa: BLE001 - keep worker alive
+                self._finish(item, False, repr(exc))
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, item: _Delivery) -> None:
+        now = time.monotonic()
+        wait = self._chat_bucket(item.chat_id).reserve(now)
+        if wait > 0:
+            self._requeue_later(item, wait)
+            return
+        await self._global_bucket.acquire()
+        item.attempts += 1
+        try:
+            await self._send(item.chat_id, item.text)
+        except TelegramRetryAfter as exc:
+            self._stats["rate_limited"] += 1
+            self._outcomes["rate_limited"].inc()
+            self._chat_bucket(item.chat_id).block_for(exc.retry_after)
+            self._retry(item, f"retry_after={exc.retry_after}", exc.retry_after)
+        except TelegramForbiddenError as exc:
+            if self._on_blocked is not None:
+                self._on_blocked(item.chat_id)
+            self._finish(item, False, exc.message, retriable=False)
+        except Exception as exc:  # noqa: BLE001 - network and API errors
+            self._retry(item, repr(exc), float(2**item.attempts))
+        else:
+            self._finish(item, True)
+        self._prune_idle_buckets(now)
+
+    def _retry(self, item: _Delivery, error: str, delay: float) -> None:
+        if item.attempts >= self._max_attempts:
+            self._finish(item, False, error)
+            return
+        self._stats["retried"] += 1
+        self._outcomes["retried"].inc()
+        self.logger.warning(
+            "delivery_retry", chat_id=item.chat_id, attempts=item.attempts, error=error
+        )
+        self._requeue_later(item, delay)
+
+    def _requeue_later(self, item: _Delivery, delay: float) -> None:
+        self._delayed[item] = asyncio.get_running_loop().call_later(
+            delay, self._requeue, item
+        )
+
+    def _requeue(self, item: _Delivery) -> None:
+        del self._delayed[item]
+        self._queue.put_nowait(item)
+
+    def _finish(
+        self,
+        item: _Delivery,
+        success: bool,
+        error: str | None = None,
+        *,
+        retriable: bool = True,
+    ) -> None:
+        latency_ms = (time.monotonic() - item.enqueued_at) * 1000
+        if success:
+            self._stats["sent"] += 1
+            self._outcomes["sent"].inc()
+            self._latencies.append(latency_ms)
+            self._latency.record(latency_ms)
+        else:
+            self._stats["failed"] += 1
+            self._outcomes["failed"].inc()
+            self.logger.warning("delivery_failed", chat_id=item.chat_id, error=error)
+        if not item.future.done():
+            item.future.set_result(
+                DeliveryResult(
+                    item.chat_id, success, latency_ms, item.attempts, error, retriable
+                )
+            )
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self._per_chat_rate, capacity=1.0)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _prune_idle_buckets(self, now: float) -> None:
+        if now - self._last_prune < self.IDLE_BUCKET_PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        self._chat_buckets = {
+            chat_id: bucket
+            for chat_id, bucket in self._chat_buckets.items()
+            if not bucket.is_idle(now)
+        }
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+"""Per-user buffer merging bursts of signals into one digest message."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Set
+
+from src.services.notifications.fanout_scheduler import (
+    PRIORITY_CRITICAL,
+    PRIORITY_NORMAL,
+)
+from src.services.notifications.message_formatter import (
+    DEFAULT_LOCALE,
+    MessageFormatter,
+    message_formatter,
+)
+from src.utils.logger import LoggerMixin
+from src.utils.metrics_registry import metrics_registry
+
+Sink = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class DigestBuffer(LoggerMixin):
+    """Collect a user's notifications for ``window`` seconds and merge them.
+
+    The first notification for a user opens a window; everything arriving
+    for that user before it closes is sent as one message through ``sink``.
+    A critical notification or reaching ``max_items`` closes the window
+    immediately, and :meth:`flush_all` closes every window (e.g. on a candle
+    close tick). A window holding a single notification passes it through
+    unchanged.
+
+    :meth:`add` returns once the message carrying the notification went
+    through ``sink`` and re-raises the sink's error, so a
+    :class:`NotificationQueue` entry handled by it is only acknowledged
+    after delivery.
+    """
+
+    def __init__(
+        self,
+        sink: Sink,
+        *,
+        window: float = 2.0,
+        max_items: int = 20,
+        formatter: MessageFormatter | None = None,
+    ) -> None:  # noqa: D401 - short
+        super().__init__()
+        self._sink = sink
+        self._window = window
+        self._max_items = max_items
+        self._formatter = formatter or message_formatter
+        self._buffers: Dict[int, List[Dict[str, Any]]] = {}
+        self._waiters: Dict[int, List["asyncio.Future[None]"]] = {}
+        self._timers: Dict[int, asyncio.TimerHandle] = {}
+        self._flushing: Set[asyncio.Task[None]] = set()
+        self._stats = {"received": 0, "messages": 0}
+        metrics_registry.gauge("digest_pending_users").set_function(
+            self.get_pending_users
+        )
+
+    async def add(self, notification: Dict[str, Any]) -> None:
+        """Buffer ``notification`` and wait until its message was sent."""
+
+        self._stats["received"] += 1
+        user_id = notification["user_id"]
+        loop = asyncio.get_running_loop()
+        sent: "asyncio.Future[None]" = loop.create_future()
+        items = self._buffers.setdefault(user_id, [])
+        items.append(notification)
+        self._waiters.setdefault(user_id, []).append(sent)
+        if (
+            notification.get("priority") == PRIORITY_CRITICAL
+            or len(items) >= self._max_items
+        ):
+            await self.flush_user(user_id)
+        elif user_id not in self._timers:
+            self._timers[user_id] = loop.call_later(
+                self._window, self._schedule_flush, user_id
+            )
+        await sent
+
+    async def flush_user(self, user_id: int) -> None:
+        timer = self._timers.pop(user_id, None)
+        if timer is not None:
+            timer.cancel()
+        items = self._buffers.pop(user_id, None)
+        waiters = self._waiters.pop(user_id, [])
+        if not items:
+            return
+        self._stats["messages"] += 1
+        try:
+            await self._sink(self._merge(items))
+        except asyncio.CancelledError:
+            for waiter in waiters:
+                waiter.cancel()
+            raise
+        except Exception as exc:  # noqa: BLE001 - raised by every waiting add()
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(exc)
+            return
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def flush_all(self) -> None:
+        for user_id in list(self._buffers):
+            await self.flush_user(user_id)
+
+    def get_pending_users(self) -> int:
+        return len(self._buffers)
+
+    def get_stats(self) -> Dict[str, float]:
+        received = self._stats["received"]
+        messages = self._stats["messages"]
+        return {
+            "received": received,
+            "messages": messages,
+            "calls_saved": received - messages - sum(map(len, self._buffers.values())),
+        }
+
+    # ------------------------------------------------------------------
+    def _schedule_flush(self, user_id: int) -> None:
+        self._timers.pop(user_id, None)
+        task = asyncio.create_task(self.flush_user(user_id))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    def _merge(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if len(items) == 1:
+            return items[0]
+        first = items[0]
+        created = [
+            i["created_at_ms"] for i in items if i.get("created_at_ms") is not None
+        ]
+        events = [
+            i["event_time_ms"] for i in items if i.get("event_time_ms") is not None
+        ]
+        locale = first.get("locale", DEFAULT_LOCALE)
+        return {
+            "user_id": first["user_id"],
+            "symbol": "digest",
+            "timeframe": first.get("timeframe"),
+            "signal_type": "digest",
+            "locale": locale,
+            "priority": min(item.get("priority", PRIORITY_NORMAL) for item in items),
+            "created_at_ms": min(created, default=None),
+            "event_time_ms": min(events, default=None),
+            "message": self._formatter.format_digest_message(items, locale),
+            "signals": len(items),
+        }
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+"""Fair, paced scheduling of notification fan-outs onto the delivery engine."""
+
+import asyncio
+import functools
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Hashable, Optional, Tuple
+
+from src.services.notifications.delivery_engine import DeliveryEngine, DeliveryResult
+from src.services.signals.anti_spam import AntiSpamManager
+from src.utils.exceptions import DeliveryFailedError
+from src.utils.logger import LoggerMixin
+from src.utils.metrics_registry import metrics_registry
+from src.utils.tracing import tracer
+
+PRIORITY_CRITICAL = 0
+PRIORITY_NORMAL = 1
+
+Scheduled = Tuple[Dict[str, Any], "asyncio.Future[DeliveryResult]"]
+
+
+def priority_for_signal(signal: Dict[str, Any]) -> int:
+    """Return the queue priority of ``signal`` based on its criticality."""
+
+    critical = AntiSpamManager.is_critical_signal(
+        signal.get("signal_type", ""), signal.get("rsi_value")
+    )
+    return PRIORITY_CRITICAL if critical else PRIORITY_NORMAL
+
+
+class FanoutScheduler(LoggerMixin):
+    """Release notifications to the delivery engine in a fair, paced order.
+
+    Notifications are grouped by priority and, within a priority, by
+    fan-out (symbol, timeframe, signal type). The pacing loop releases one
+    notification per ``1 / rate`` seconds, always from the highest non-empty
+    priority and round-robin across its fan-outs, so a 10k-user fan-out is
+    interleaved with smaller ones instead of delaying them by minutes.
+    End-to-end latency is measured from the payload's ``created_at_ms``.
+
+    :meth:`submit` returns a future of the delivery result;
+    :meth:`deliver` waits for it and raises on a retriable failure, which
+    makes it a :class:`NotificationQueue` handler that only lets delivered
+    entries be acknowledged.
+    """
+
+    LATENCY_SAMPLES = 10_000
+    MAX_BACKLOG = 50_000
+
+    def __init__(
+        self, engine: DeliveryEngine, rate: float = 28.0
+    ) -> None:  # noqa: D401 - short
+        super().__init__()
+        self._engine = engine
+        self._interval = 1.0 / rate
+        self._lanes: Dict[int, "OrderedDict[Hashable, Deque[Scheduled]]"] = {}
+        self._pending = 0
+        self._has_work = asyncio.Event()
+        self._capacity = asyncio.Event()
+        self._capacity.set()
+        self._task: Optional[asyncio.Task[None]] = None
+        self._latencies: Dict[int, Deque[float]] = {}
+        metrics_registry.gauge("fanout_backlog").set_function(self.get_backlog_size)
+
+    async def start(self) -> None:
+        if self._task is None:
+            await self._engine.start()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # never sent: their queue entries stay pending and are reclaimed
+        for lane in self._lanes.values():
+            for items in lane.values():
+                for _, waiter in items:
+                    waiter.cancel()
+        self._lanes.clear()
+        self._pending = 0
+        self._capacity.set()
+
+    async def submit(
+        self, notification: Dict[str, Any]
+    ) -> "asyncio.Future[DeliveryResult]":
+        """Schedule ``notification``; waits while the backlog is full.
+
+        The returned future resolves once the delivery engine has sent the
+        message or given up on it.
+        """
+
+        await self._capacity.wait()
+        priority = notification.get("priority")
+        if priority is None:
+            priority = priority_for_signal(notification)
+        key = (
+            notification.get("symbol"),
+            notification.get("timeframe"),
+            notification.get("signal_type"),
+        )
+        waiter: "asyncio.Future[DeliveryResult]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        lane = self._lanes.setdefault(priority, OrderedDict())
+        lane.setdefault(key, deque()).append((notification, waiter))
+        self._pending += 1
+        if self._pending >= self.MAX_BACKLOG:
+            self._capacity.clear()
+        self._has_work.set()
+        return waiter
+
+    async def deliver(self, notification: Dict[str, Any]) -> DeliveryResult:
+        """Schedule ``notification`` and wait until it is delivered.
+
+        Raises :class:`DeliveryFailedError` when the engine gave up on a
+        retriable error (a blocked chat is not retried) or stopped while the
+        message waited for a retry.
+        """
+
+        result = await (await self.submit(notification))
+        if not result.success and result.retriable:
+            raise DeliveryFailedError(result.error or "delivery failed")
+        return result
+
+    def get_backlog_size(self) -> int:
+        return self._pending
+
+    def get_latency_stats(self) -> Dict[int, Dict[str, float]]:
+        """Return end-to-end latency percentiles per priority."""
+
+        stats: Dict[int, Dict[str, float]] = {}
+        for priority, samples in sorted(self._latencies.items()):
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            stats[priority] = {
+                "count": len(ordered),
+                "p50_ms": ordered[len(ordered) // 2],
+                "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+            }
+        return stats
+
+    # ------------------------------------------------------------------
+    def _next(self) -> Optional[Tuple[int, Scheduled]]:
+        for priority in sorted(self._lanes):
+            lane = self._lanes[priority]
+            if not lane:
+                continue
+            key, items = next(iter(lane.items()))
+            scheduled = items.popleft()
+            if items:
+                lane.move_to_end(key)  # round-robin across fan-outs
+            else:
+                del lane[key]
+            self._pending -= 1
+            if self._pending < self.MAX_BACKLOG:
+                self._capacity.set()
+            return priority, scheduled
+        return None
+
+    async def _run(self) -> None:
+        next_slot = time.monotonic()
+        while True:
+            nxt = self._next()
+            if nxt is None:
+                self._has_work.clear()
+                await self._has_work.wait()
+                next_slot = max(next_slot, time.monotonic())
+                continue
+            priority, (notification, waiter) = nxt
+            if waiter.done():  # the submitter went away
+                continue
+            delay = next_slot - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            next_slot = max(
+                next_slot + self._interval, time.monotonic() - self._interval
+            )
+            future = self._engine.submit(
+                notification["user_id"], notification["message"]
+            )
+            future.add_done_callback(
+                functools.partial(self._record, priority, notification, waiter)
+            )
+
+    def _record(
+        self,
+        priority: int,
+        notification: Dict[str, Any],
+        waiter: "asyncio.Future[DeliveryResult]",
+        future: "asyncio.Future[DeliveryResult]",
+    ) -> None:
+        if future.cancelled():
+            waiter.cancel()
+            return
+        if future.exception() is not None:
+            if not waiter.done():
+                waiter.set_exception(future.exception())
+            return
+        if not waiter.done():
+            waiter.set_result(future.result())
+        if not future.result().success:
+            return
+        tracer.record_since_event(
+            "exchange_to_delivery", notification.get("event_time_ms")
+        )
+        created_at_ms = notification.get("created_at_ms")
+        if created_at_ms is None:
+            return
+        latency_ms = time.time() * 1000 - created_at_ms
+        samples = self._latencies.setdefault(
+            priority, deque(maxlen=self.LATENCY_SAMPLES)
+        )
+        samples.append(latency_ms)
+        metrics_registry.histogram(
+            "fanout_delivery_ms", {"priority": str(priority)}
+        ).record(latency_ms)
@@ -2,19 +2,160 @@ from __future__ import annotations
 
 """Helpers for building human friendly notification messages."""
 
-from typing import Any, Dict
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from string import Template
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 from src.utils.constants import get_performance_emoji
+from src.utils.metrics_registry import metrics_registry
+
+DEFAULT_LOCALE = "en"
+
+# Section templates per locale. ``$name`` placeholders are per-user fields
+# left in the shared render and substituted for each recipient.
+_SECTIONS: Dict[str, Dict[str, str]] = {
+    "en": {
+        "header": "🚨 {signal_type} - {symbol} ({timeframe})",
+        "price": "💰 Price: {price}",
+        "performance": "⚡ Processing: {processing_time_ms:.1f}ms {emoji}",
+        "digest_header": "📬 {count} signals",
+        "digest_line": "• {signal_type} - {symbol} ({timeframe}): {price}",
+    },
+    "ru": {
+        "header": "🚨 {signal_type} - {symbol} ({timeframe})",
+        "price": "💰 Цена: {price}",
+        "performance": "⚡ Обработка: {processing_time_ms:.1f}ms {emoji}",
+        "digest_header": "📬 Сигналов: {count}",
+        "digest_line": "• {signal_type} - {symbol} ({timeframe}): {price}",
+    },
+}
+
+_RENDER_HITS = metrics_registry.counter(
+    "cache_requests_total", {"cache": "message_render", "result": "hit"}
+)
+_RENDER_MISSES = metrics_registry.counter(
+    "cache_requests_total", {"cache": "message_render", "result": "miss"}
+)
+
+_LAYOUTS: Dict[str, Tuple[str, ...]] = {
+    "rsi": ("header", "price", "performance"),
+    "ema": ("header", "performance"),
+}
+
+
+@lru_cache(maxsize=None)
+def _compile_template(kind: str, locale: str) -> str:
+    """Join the sections of ``kind`` into one format string for ``locale``."""
+
+    sections = _SECTIONS.get(locale, _SECTIONS[DEFAULT_LOCALE])
+    return "\n".join(sections[name] for name in _LAYOUTS[kind])
+
+
+@dataclass(frozen=True)
+class RenderedSignal:
+    """Signal text rendered once and shared by every recipient."""
+
+    text: str
+    user_fields: frozenset[str]
+
+    def for_user(self, fields: Optional[Mapping[str, Any]] = None) -> str:
+        """Return the message for one recipient.
+
+        Without per-user placeholders the shared ``text`` object itself is
+        returned, so a fan-out does not copy the message per user.
+        """
+
+        if not self.user_fields or not fields:
+            return self.text
+        return Template(self.text).safe_substitute(fields)
 
 
 class MessageFormatter:
     """Format messages for different types of signals."""
 
+    RENDER_CACHE_SIZE = 1024
+
+    def __init__(self) -> None:  # noqa: D401 - short
+        self._render_cache: "OrderedDict[Tuple[Any, ...], RenderedSignal]" = (
+            OrderedDict()
+        )
+        self._render_calls = 0
+        self._render_hits = 0
+
+    @staticmethod
+    def resolve_locale(language_code: Optional[str]) -> str:
+        """Map a Telegram ``language_code`` to a supported locale."""
+
+        if language_code:
+            base = language_code.split("-")[0].lower()
+            if base in _SECTIONS:
+                return base
+        return DEFAULT_LOCALE
+
+    def render_signal(
+        self, signal: Dict[str, Any], locale: str = DEFAULT_LOCALE
+    ) -> RenderedSignal:
+        """Render ``signal`` once per ``locale`` and cache the result."""
+
+        self._render_calls += 1
+        key = (
+            locale,
+            signal.get("symbol"),
+            signal.get("timeframe"),
+            signal.get("signal_type"),
+            signal.get("price"),
+            signal.get("processing_time_ms", 0),
+        )
+        cached = self._render_cache.get(key)
+        if cached is not None:
+            self._render_hits += 1
+            _RENDER_HITS.inc()
+            self._render_cache.move_to_end(key)
+            return cached
+
+        _RENDER_MISSES.inc()
+        text = self._render(signal, locale)
+        rendered = RenderedSignal(text, frozenset(Template(text).get_identifiers()))
+        self._render_cache[key] = rendered
+        if len(self._render_cache) > self.RENDER_CACHE_SIZE:
+            self._render_cache.popitem(last=False)
+        return rendered
+
+    def get_render_cache_stats(self) -> Dict[str, float]:
+        return {
+            "renders": self._render_calls,
+            "hits": self._render_hits,
+            "hit_rate": (
+                self._render_hits / self._render_calls if self._render_calls else 0.0
+            ),
+            "size": len(self._render_cache),
+        }
+
     def format_real_time_signal_message(self, signal: Dict[str, Any]) -> str:
         if signal.get("signal_type", "").startswith("rsi"):
             return self.format_rsi_signal(signal)
         return self.format_ema_signal(signal)
 
+    def format_digest_message(
+        self, signals: List[Dict[str, Any]], locale: str = DEFAULT_LOCALE
+    ) -> str:
+        """Combine ``signals`` for one user into a single message."""
+
+        sections = _SECTIONS.get(locale, _SECTIONS[DEFAULT_LOCALE])
+        lines = [sections["digest_header"].format(count=len(signals))]
+        for signal in signals:
+            lines.append(
+                sections["digest_line"].format(
+                    signal_type=signal.get("signal_type"),
+                    symbol=signal.get("symbol"),
+                    timeframe=signal.get("timeframe"),
+                    price=signal.get("price"),
+                )
+            )
+        return "\n".join(lines)
+
     def format_rsi_signal(self, signal: Dict[str, Any]) -> str:
         header = self.create_signal_header(signal)
         price = self.create_price_section(signal)
@@ -39,4 +180,19 @@ class MessageFormatter:
     def create_real_time_performance_section(self, signal: Dict[str, Any]) -> str:
         proc = signal.get("processing_time_ms", 0)
         emoji = get_performance_emoji(proc, 200)
-        return f"⚡ Processing: {proc}ms {emoji}"
+        return f"⚡ Processing: {proc:.1f}ms {emoji}"
+
+    def _render(self, signal: Dict[str, Any], locale: str) -> str:
+        kind = "rsi" if signal.get("signal_type", "").startswith("rsi") else "ema"
+        proc = signal.get("processing_time_ms", 0)
+        return _compile_template(kind, locale).format(
+            symbol=signal.get("symbol"),
+            timeframe=signal.get("timeframe"),
+            signal_type=signal.get("signal_type"),
+            price=signal.get("price"),
+            processing_time_ms=proc,
+            emoji=get_performance_emoji(proc, 200),
+        )
+
+
+message_formatter = MessageFormatter()
@@ -1,43 +1,342 @@
 from __future__ import annotations
 
-"""Priority queue for outgoing notifications."""
+"""Durable priority queue for outgoing notifications on Redis Streams."""
 
 import asyncio
-from typing import Any, Dict, Tuple
+import os
+import socket
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
 
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from src.data.redis_client import get_redis
 from src.utils.logger import LoggerMixin
 
+Handler = Callable[[Dict[str, Any]], Awaitable[Any]]
+Entry = Tuple[str, str, Dict[str, Any], int]  # stream, id, notification, attempts
+
 
 class NotificationQueue(LoggerMixin):
-    """Maintain a priority queue for real-time notifications."""
+    """Maintain priority lanes of notifications shared by all processes.
+
+    Each priority is a Redis stream read through one consumer group, so any
+    number of delivery processes can share the work. Lanes are polled in
+    priority order. Every entry read is handled in its own task, and an
+    entry is acknowledged and deleted once its handler succeeds, so a
+    handler that waits for the delivery acks only what was sent. Workers
+    keep reading while handlers wait, up to ``max_in_flight`` entries per
+    process, so a scheduler behind the handler sees more than the first
+    fan-out in the stream. While handlers run, their entries are re-claimed
+    every ``CLAIM_IDLE_MS / 2`` so other consumers do not take them over.
+    A failed entry is re-added with an incremented attempt count until
+    ``MAX_ATTEMPTS`` and then moved to the dead-letter stream. Entries left
+    pending by a crashed consumer are reclaimed with ``XAUTOCLAIM`` after
+    ``CLAIM_IDLE_MS``, by one timer per process rather than on every read.
+    """
+
+    STREAM_PREFIX = "notifications:p"
+    DEAD_LETTER_STREAM = "notifications:dead"
+    GROUP = "delivery"
+    PRIORITY_LANES = 3  # 0 = critical ... 2 = low
+    MAX_ATTEMPTS = 3
+    CLAIM_IDLE_MS = 30_000
+    BLOCK_MS = 1_000
+    READ_COUNT = 32
+    CLAIM_CHUNK = 1_000
+    STREAM_MAXLEN = 100_000
 
-    def __init__(self) -> None:  # noqa: D401 - short
+    def __init__(
+        self, redis: Redis | None = None, consumer: str | None = None
+    ) -> None:  # noqa: D401 - short
         super().__init__()
-        self._queue: "asyncio.PriorityQueue[Tuple[int, Dict[str, Any]]]" = asyncio.PriorityQueue()
+        self._redis_client = redis
+        self._consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self._groups_ready = False
+        self._workers: List[asyncio.Task[None]] = []
+        self._in_flight: Dict[asyncio.Task[None], Entry] = {}
+        self._slots = asyncio.Semaphore(1)
+
+    @property
+    def _redis(self) -> Redis:
+        if self._redis_client is None:
+            self._redis_client = get_redis()
+        return self._redis_client
+
+    @property
+    def streams(self) -> List[str]:
+        return [self._lane(p) for p in range(self.PRIORITY_LANES)]
 
     async def add_real_time_notification(
         self, notification: Dict[str, Any], priority: int = 0
     ) -> None:
         """Add ``notification`` with ``priority`` (lower value = higher priority)."""
 
-        await self._queue.put((priority, notification))
+        await self._ensure_groups()
+        await self._redis.xadd(
+            self._lane(priority),
+            {"data": orjson.dumps(notification), "attempts": 0},
+            maxlen=self.STREAM_MAXLEN,
+            approximate=True,
+        )
+
+    async def process_notifications(self, handler: Handler) -> int:
+        """Process all currently queued notifications using ``handler``."""
+
+        processed = 0
+        while True:
+            entries = await self._read(block_ms=None)
+            if not entries:
+                return processed
+            await self._handle_batch(entries, handler)
+            processed += len(entries)
+
+    async def start_workers(
+        self,
+        handler: Handler,
+        concurrency: int = 4,
+        max_in_flight: int | None = None,
+    ) -> None:
+        """Run ``concurrency`` reading workers in this process.
+
+        At most ``max_in_flight`` entries (default: one read per worker) are
+        handled at a time; a worker reads again as soon as slots are free,
+        without waiting for the entries it read before.
+        """
+
+        if self._workers:
+            return
+        await self._ensure_groups()
+        self._slots = asyncio.Semaphore(max_in_flight or concurrency * self.READ_COUNT)
+        self._workers = [
+            asyncio.create_task(self._worker_loop(handler)) for _ in range(concurrency)
+        ]
+        self._workers.append(asyncio.create_task(self._maintenance_loop()))
+        self.logger.info(
+            "notification_workers_started",
+            consumer=self._consumer,
+            concurrency=concurrency,
+        )
+
+    async def stop_workers(self) -> None:
+        # unfinished entries stay pending and are reclaimed later
+        tasks = [*self._workers, *self._in_flight]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._in_flight.clear()
+
+    async def get_real_time_queue_size(self) -> int:
+        """Return number of queued and in-flight notifications."""
+
+        pipeline = self._redis.pipeline(transaction=False)
+        for stream in self.streams:
+            pipeline.xlen(stream)
+        return sum(await pipeline.execute())
+
+    async def get_dead_letter_size(self) -> int:
+        return await self._redis.xlen(self.DEAD_LETTER_STREAM)
 
-    async def process_notifications(self, handler) -> None:
-        """Process all queued notifications using ``handler`` coroutine."""
+    async def retry_failed_notifications(self, min_idle_ms: int | None = None) -> int:
+        """Requeue entries left pending by dead consumers; return count."""
 
-        while not self._queue.empty():
-            priority, item = await self._queue.get()
+        await self._ensure_groups()
+        idle = self.CLAIM_IDLE_MS if min_idle_ms is None else min_idle_ms
+        reclaimed = 0
+        for stream in self.streams:
+            start = "0-0"
+            while True:
+                reply = await self._redis.xautoclaim(
+                    stream,
+                    self.GROUP,
+                    self._consumer,
+                    min_idle_time=idle,
+                    start_id=start,
+                    count=self.READ_COUNT,
+                )
+                start, claimed = reply[0], reply[1]
+                for entry_id, fields in claimed:
+                    if not fields:  # deleted while pending
+                        await self._redis.xack(stream, self.GROUP, entry_id)
+                        continue
+                    entry = self._decode(stream, entry_id, fields)
+                    await self._retry(entry, "consumer_timeout")
+                    reclaimed += 1
+                if start in ("0-0", b"0-0"):
+                    break
+        if reclaimed:
+            self.logger.warning("notifications_reclaimed", count=reclaimed)
+        return reclaimed
+
+    # ------------------------------------------------------------------
+    def _lane(self, priority: int) -> str:
+        lane = min(max(priority, 0), self.PRIORITY_LANES - 1)
+        return f"{self.STREAM_PREFIX}{lane}"
+
+    async def _ensure_groups(self) -> None:
+        if self._groups_ready:
+            return
+        for stream in self.streams:
+            try:
+                await self._redis.xgroup_create(
+                    stream, self.GROUP, id="0", mkstream=True
+                )
+            except ResponseError as exc:
+                if "BUSYGROUP" not in str(exc):
+                    raise
+        self._groups_ready = True
+
+    async def _read(
+        self, block_ms: Optional[int], count: Optional[int] = None
+    ) -> List[Entry]:
+        await self._ensure_groups()
+        count = count or self.READ_COUNT
+        for stream in self.streams:
+            reply = await self._redis.xreadgroup(
+                self.GROUP, self._consumer, {stream: ">"}, count=count
+            )
+            if reply:
+                return self._decode_reply(reply)
+        if block_ms is None:
+            return []
+        reply = await self._redis.xreadgroup(
+            self.GROUP,
+            self._consumer,
+            {stream: ">" for stream in self.streams},
+            count=count,
+            block=block_ms,
+        )
+        return self._decode_reply(reply or [])
+
+    def _decode_reply(self, reply: List[Any]) -> List[Entry]:
+        entries: List[Entry] = []
+        for stream, items in reply:
+            stream_name = stream.decode() if isinstance(stream, bytes) else stream
+            for entry_id, fields in items:
+                entries.append(self._decode(stream_name, entry_id, fields))
+        return entries
+
+    @staticmethod
+    def _decode(stream: str, entry_id: Any, fields: Dict[Any, Any]) -> Entry:
+        data = fields.get("data", fields.get(b"data"))
+        attempts = fields.get("attempts", fields.get(b"attempts", 0))
+        if isinstance(entry_id, bytes):
+            entry_id = entry_id.decode()
+        return stream, entry_id, orjson.loads(data), int(attempts)
+
+    async def _maintenance_loop(self) -> None:
+        """Keep in-flight entries claimed, then reclaim those of dead consumers."""
+
+        while True:
+            await asyncio.sleep(self.CLAIM_IDLE_MS / 2000)
             try:
-                await handler(item)
+                await self._claim(self._in_flight.values())
+                await self.retry_failed_notifications()
+            except Exception as exc:  # noqa: BLE001 - retried on the next tick
+                self.logger.error("notification_reclaim_error", error=str(exc))
+
+    async def _worker_loop(self, handler: Handler) -> None:
+        while True:
+            await self._slots.acquire()
+            taken = 1
+            try:
+                while taken < self.READ_COUNT and not self._slots.locked():
+                    await self._slots.acquire()
+                    taken += 1
+                entries = await self._read(block_ms=self.BLOCK_MS, count=taken)
+                for entry in entries:
+                    task = asyncio.create_task(self._handle(entry, handler))
+                    self._in_flight[task] = entry
+                    task.add_done_callback(self._release)
+                    taken -= 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001 - keep worker alive
+                self.logger.error("notification_worker_error", error=str(exc))
+                await asyncio.sleep(1)
             finally:
-                self._queue.task_done()
+                for _ in range(taken):
+                    self._slots.release()
+
+    def _release(self, task: "asyncio.Task[None]") -> None:
+        self._in_flight.pop(task, None)
+        self._slots.release()
+        if not task.cancelled() and task.exception() is not None:
+            # the entry stays pending and is reclaimed later
+            self.logger.error("notification_worker_error", error=str(task.exception()))
+
+    async def _handle_batch(self, entries: List[Entry], handler: Handler) -> None:
+        keeper = asyncio.create_task(self._keep_claimed(entries))
+        try:
+            await asyncio.gather(*(self._handle(entry, handler) for entry in entries))
+        finally:
+            keeper.cancel()
+            await asyncio.gather(keeper, return_exceptions=True)
+
+    async def _keep_claimed(self, entries: List[Entry]) -> None:
+        """Reset the idle time of in-flight ``entries`` until cancelled."""
+
+        while True:
+            await asyncio.sleep(self.CLAIM_IDLE_MS / 2000)
+            await self._claim(entries)
+
+    async def _claim(self, entries: Iterable[Entry]) -> None:
+        ids: Dict[str, List[str]] = defaultdict(list)
+        for stream, entry_id, _, _ in entries:
+            ids[stream].append(entry_id)
+        if not ids:
+            return
+        pipeline = self._redis.pipeline(transaction=False)
+        for stream, stream_ids in ids.items():
+            for start in range(0, len(stream_ids), self.CLAIM_CHUNK):
+                # acknowledged ids are no longer pending and are skipped
+                pipeline.xclaim(
+                    stream,
+                    self.GROUP,
+                    self._consumer,
+                    min_idle_time=0,
+                    message_ids=stream_ids[start : start + self.CLAIM_CHUNK],
+                    justid=True,
+                )
+        await pipeline.execute()
 
-    def get_real_time_queue_size(self) -> int:
-        """Return current queue size."""
+    async def _handle(self, entry: Entry, handler: Handler) -> None:
+        stream, entry_id, notification, _ = entry
+        try:
+            await handler(notification)
+        except Exception as exc:  # noqa: BLE001 - retried or dead-lettered
+            await self._retry(entry, str(exc))
+            return
+        pipeline = self._redis.pipeline(transaction=True)
+        pipeline.xack(stream, self.GROUP, entry_id)
+        pipeline.xdel(stream, entry_id)
+        await pipeline.execute()
 
-        return self._queue.qsize()
+    async def _retry(self, entry: Entry, error: str) -> None:
+        stream, entry_id, notification, attempts = entry
+        attempts += 1
+        target = stream if attempts < self.MAX_ATTEMPTS else self.DEAD_LETTER_STREAM
+        fields: Dict[str, Any] = {
+            "data": orjson.dumps(notification),
+            "attempts": attempts,
+        }
+        if target == self.DEAD_LETTER_STREAM:
+            fields["error"] = error
+            fields["source"] = stream
+        pipeline = self._redis.pipeline(transaction=True)
+        pipeline.xadd(target, fields, maxlen=self.STREAM_MAXLEN, approximate=True)
+        pipeline.xack(stream, self.GROUP, entry_id)
+        pipeline.xdel(stream, entry_id)
+        await pipeline.execute()
+        self.logger.warning(
+            "notification_retry" if target == stream else "notification_dead_lettered",
+            stream=stream,
+            attempts=attempts,
+            error=error,
+        )
 
-    async def retry_failed_notifications(self) -> None:
-        """Placeholder for retry logic."""
 
-        return None
+notification_queue = NotificationQueue()
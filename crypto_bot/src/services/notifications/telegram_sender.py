@@ -1,28 +1,77 @@
 from __future__ import annotations
 
-"""Simplified Telegram notification sender."""
+"""Telegram notification sender backed by :class:`DeliveryEngine`."""
 
-from typing import Any, Dict, List, Tuple
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
 
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+
+from src.services.notifications.delivery_engine import DeliveryEngine, DeliveryResult
+from src.services.notifications.message_formatter import (
+    DEFAULT_LOCALE,
+    message_formatter,
+)
 from src.utils.logger import LoggerMixin
 from src.utils.performance_utils import measure_time
+from src.utils.tracing import tracer
 
 
 class TelegramSender(LoggerMixin):
     """Send notifications to Telegram users."""
 
-    def __init__(self) -> None:  # noqa: D401 - short
+    DELIVERY_SAMPLES = 10_000
+
+    def __init__(
+        self,
+        bot: Bot,
+        *,
+        global_rate: float = 30.0,
+        per_chat_rate: float = 1.0,
+        workers: int = 8,
+    ) -> None:  # noqa: D401 - short
         super().__init__()
-        self._delivery_times: List[int] = []
+        self._bot = bot
+        self._delivery_times: Deque[float] = deque(maxlen=self.DELIVERY_SAMPLES)
+        self._engine = DeliveryEngine(
+            self._send_raw,
+            global_rate=global_rate,
+            per_chat_rate=per_chat_rate,
+            workers=workers,
+            on_blocked=self.handle_blocked_user,
+        )
+
+    @property
+    def engine(self) -> DeliveryEngine:
+        return self._engine
+
+    async def _send_raw(self, user_id: int, message: str) -> None:
+        await self._bot.send_message(user_id, message)
 
     @measure_time(target_ms=500)
     async def send_signal_notification_real_time(
         self, user_id: int, message: str
-    ) -> Tuple[bool, int]:
-        """Send ``message`` to ``user_id`` and return success flag and time."""
+    ) -> Tuple[bool, float]:
+        """Send ``message`` to ``user_id`` and return success flag and time.
+
+        This path bypasses the rate limiter and is meant for direct replies;
+        signal fan-outs go through :meth:`send_bulk_real_time_notifications`.
+        """
 
-        # In real implementation this would call Telegram API.
-        return True, 0
+        start = time.perf_counter()
+        try:
+            await self._send_raw(user_id, message)
+        except TelegramForbiddenError:
+            self.handle_blocked_user(user_id)
+            return False, (time.perf_counter() - start) * 1000
+        except TelegramRetryAfter as exc:
+            self.logger.warning(
+                "telegram_rate_limited", user_id=user_id, retry_after=exc.retry_after
+            )
+            return False, (time.perf_counter() - start) * 1000
+        return True, (time.perf_counter() - start) * 1000
 
     async def send_message_to_user(self, user_id: int, message: str) -> bool:
         success, ms = await self.send_signal_notification_real_time(user_id, message)
@@ -32,9 +81,33 @@ class TelegramSender(LoggerMixin):
 
     async def send_bulk_real_time_notifications(
         self, notifications: List[Dict[str, Any]]
-    ) -> None:
-        for note in notifications:
-            await self.send_message_to_user(note["user_id"], note["message"])
+    ) -> List[DeliveryResult]:
+        """Deliver ``notifications`` concurrently within Telegram limits."""
+
+        results = await self._engine.deliver_many(notifications)
+        for note, result in zip(notifications, results):
+            if result.success:
+                self._delivery_times.append(result.latency_ms)
+                tracer.record_since_event(
+                    "exchange_to_delivery", note.get("event_time_ms")
+                )
+        return results
+
+    async def send_signal_fanout(
+        self, signal: Dict[str, Any], user_ids: List[int], locale: str = DEFAULT_LOCALE
+    ) -> List[DeliveryResult]:
+        """Render ``signal`` once and deliver the shared text to ``user_ids``."""
+
+        rendered = message_formatter.render_signal(signal, locale)
+        return await self.send_bulk_real_time_notifications(
+            [
+                {"user_id": user_id, "message": rendered.for_user()}
+                for user_id in user_ids
+            ]
+        )
+
+    async def close(self) -> None:
+        await self._engine.stop()
 
     def handle_blocked_user(self, user_id: int) -> None:
         self.logger.warning("user_blocked", user_id=user_id)
@@ -43,4 +116,9 @@ class TelegramSender(LoggerMixin):
         if not self._delivery_times:
             return {}
         avg = sum(self._delivery_times) / len(self._delivery_times)
-        return {"avg_delivery_ms": avg, "max_delivery_ms": max(self._delivery_times)}
+        stats: Dict[str, float] = {
+            "avg_delivery_ms": avg,
+            "max_delivery_ms": max(self._delivery_times),
+        }
+        stats.update(self._engine.get_stats())
+        return stats
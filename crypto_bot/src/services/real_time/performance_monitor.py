@@ -1,9 +1,14 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict
 
 from src.utils.logger import LoggerMixin
-from src.utils.constants import INDICATOR_CALCULATION_TIMEOUTS, PERFORMANCE_ALERT_THRESHOLDS
+from src.utils.metrics_registry import Histogram, metrics_registry
+from src.utils.constants import (
+    INDICATOR_CALCULATION_TIMEOUTS,
+    PERFORMANCE_ALERT_PERCENTILES,
+    PERFORMANCE_ALERT_THRESHOLDS,
+)
 from src.utils.time_helpers import get_high_precision_timestamp, get_time_since_ms
 
 
@@ -12,40 +17,53 @@ class PerformanceMonitor(LoggerMixin):
 
     def __init__(self) -> None:
         super().__init__()
-        self.times: Dict[str, List[int]] = {}
+        self.times: Dict[str, Histogram] = {}
 
-    def start_timing(self) -> float:
+    def start_timing(self) -> int:
         return get_high_precision_timestamp()
 
-    def end_timing(self, operation: str, start: float) -> int:
-        elapsed = int(get_time_since_ms(start))
+    def end_timing(self, operation: str, start: int) -> float:
+        elapsed = get_time_since_ms(start)
         self.record_processing_time(operation, elapsed)
         return elapsed
 
-    def record_processing_time(self, operation: str, time_ms: int) -> None:
-        self.times.setdefault(operation, []).append(time_ms)
+    def record_processing_time(self, operation: str, time_ms: float) -> None:
+        hist = self.times.get(operation)
+        if hist is None:
+            hist = self.times[operation] = metrics_registry.histogram(
+                "operation_ms", {"operation": operation}
+            )
+        hist.record(time_ms)
 
     def check_performance_targets(self) -> Dict[str, bool]:
         results: Dict[str, bool] = {}
-        for op, values in self.times.items():
+        for op, hist in self.times.items():
             target = INDICATOR_CALCULATION_TIMEOUTS.get(op)
-            if target is None:
+            if target is None or not hist.count:
                 continue
-            avg = sum(values) / len(values)
-            results[op] = avg <= target
+            results[op] = self._observed(op, hist) <= target
         return results
 
-    def get_bottlenecks(self) -> Dict[str, int]:
-        return {op: max(times) for op, times in self.times.items()}
+    def get_bottlenecks(self) -> Dict[str, float]:
+        return {op: hist.max for op, hist in self.times.items() if hist.count}
 
     def alert_on_performance_degradation(self) -> Dict[str, Any]:
         alerts = {}
-        for op, values in self.times.items():
+        for op, hist in self.times.items():
             target = INDICATOR_CALCULATION_TIMEOUTS.get(op)
-            if target is None:
+            if target is None or not hist.count:
                 continue
-            avg = sum(values) / len(values)
-            if avg > target * PERFORMANCE_ALERT_THRESHOLDS["warning"]:
-                alerts[op] = avg
-                self.logger.warning("performance_degradation", operation=op, avg_ms=avg)
+            observed = self._observed(op, hist)
+            if observed > target * PERFORMANCE_ALERT_THRESHOLDS["warning"]:
+                alerts[op] = observed
+                self.logger.warning(
+                    "performance_degradation", operation=op, time_ms=observed
+                )
         return alerts
+
+    @staticmethod
+    def _observed(operation: str, hist: Histogram) -> float:
+        percentile = PERFORMANCE_ALERT_PERCENTILES.get(operation)
+        if percentile is None:
+            return hist.total / hist.count
+        return hist.percentile(percentile)
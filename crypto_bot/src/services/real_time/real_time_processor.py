@@ -1,15 +1,19 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 from src.services.indicators.rsi_calculator import RSICalculator
 from src.services.indicators.ema_calculator import EMACalculator
+from src.services.indicators.indicator_engine import IndicatorEngine
 from src.services.real_time.performance_monitor import PerformanceMonitor
 from src.services.signals.signal_aggregator import signal_aggregator, SignalAggregator
 from src.utils.logger import LoggerMixin
+from src.utils.metrics_registry import metrics_registry
 from src.utils.performance_utils import TimingContext
 from src.utils.constants import EMA_PERIODS
+from src.utils.time_helpers import to_timestamp_ms
+from src.utils.tracing import tracer
 
 
 class RealTimeProcessor(LoggerMixin):
@@ -21,14 +25,16 @@ class RealTimeProcessor(LoggerMixin):
         ema_calculator: EMACalculator,
         performance_monitor: PerformanceMonitor,
         signal_aggregator: SignalAggregator = signal_aggregator,
+        indicator_engine: Optional[IndicatorEngine] = None,
     ) -> None:
         super().__init__()
         self.rsi_calculator = rsi_calculator
         self.ema_calculator = ema_calculator
         self.performance_monitor = performance_monitor
         self.signal_aggregator = signal_aggregator
-        self.processing_times: list[int] = []
-        self.signal_times: list[int] = []
+        self.indicator_engine = indicator_engine
+        self.processing_times = metrics_registry.histogram("total_processing_ms")
+        self.signal_times = metrics_registry.histogram("signals_per_update")
 
     async def start(self) -> None:
         self.logger.info("real_time_processor_started")
@@ -46,31 +52,67 @@ class RealTimeProcessor(LoggerMixin):
         price = float(candle.get("close_price"))
         with TimingContext("total_processing", target_ms=1000) as timer:
             rsi_task = asyncio.create_task(
-                self._update_rsi_real_time(symbol, timeframe, price)
+                self._update_rsi_real_time(
+                    symbol,
+                    timeframe,
+                    price,
+                    is_closed=bool(candle.get("is_closed", True)),
+                    close_time_ms=to_timestamp_ms(candle.get("close_time")),
+                )
             )
-            ema_task = asyncio.create_task(
-                self._update_ema_real_time(symbol, timeframe, price)
-            )
-            rsi_result, ema_result = await asyncio.gather(rsi_task, ema_task)
-            signals = await self._generate_real_time_notifications(
-                session, symbol, timeframe, price, rsi_result, ema_result
-            )
-        self.processing_times.append(int(timer.elapsed_ms))
+            tasks = [rsi_task, self._update_engine_indicators(candle)]
+            if self.indicator_engine is None:
+                tasks.append(self._update_ema_real_time(symbol, timeframe, price))
+            with tracer.span("indicators"):
+                rsi_result, extra, *ema = await asyncio.gather(*tasks)
+            # with an engine the EMAs are nodes of its graph, shared with MACD
+            # and the crossover/trend rules, instead of a second computation
+            ema_result = ema[0] if ema else self._ema_from_engine(extra)
+            with tracer.span("signal_generation"):
+                signals = await self._generate_real_time_notifications(
+                    session, symbol, timeframe, price, rsi_result, ema_result, extra
+                )
+        self.processing_times.record(timer.elapsed_ms)
+        tracer.finish()
         return {
             "rsi": rsi_result,
             "ema": ema_result,
+            "indicators": extra,
             "signals": signals,
-            "processing_time_ms": int(timer.elapsed_ms),
+            "processing_time_ms": timer.elapsed_ms,
         }
 
     async def _update_rsi_real_time(
-        self, symbol: str, timeframe: str, price: float
-    ) -> Tuple[float | None, int]:
-        return await self.rsi_calculator.calculate_real_time_rsi(symbol, timeframe, price)
+        self,
+        symbol: str,
+        timeframe: str,
+        price: float,
+        *,
+        is_closed: bool = True,
+        close_time_ms: int | None = None,
+    ) -> Tuple[float | None, float]:
+        return await self.rsi_calculator.calculate_real_time_rsi(
+            symbol, timeframe, price, is_closed=is_closed, close_time_ms=close_time_ms
+        )
+
+    async def _update_engine_indicators(self, candle: Dict[str, Any]) -> Dict[str, Any]:
+        if self.indicator_engine is None:
+            return {}
+        return await self.indicator_engine.update(
+            candle["symbol"], candle["timeframe"], candle
+        )
+
+    @staticmethod
+    def _ema_from_engine(
+        values: Dict[str, Any],
+    ) -> Dict[int, Tuple[float | None, float]]:
+        return {
+            p: (values[f"ema:{p}"], 0.0) for p in EMA_PERIODS if f"ema:{p}" in values
+        }
 
     async def _update_ema_real_time(
         self, symbol: str, timeframe: str, price: float
-    ) -> Dict[int, Tuple[float | None, int]]:
+    ) -> Dict[int, Tuple[float | None, float]]:
         return await self.ema_calculator.calculate_multiple_ema_real_time(
             symbol, timeframe, price, EMA_PERIODS
         )
@@ -81,33 +123,37 @@ class RealTimeProcessor(LoggerMixin):
         symbol: str,
         timeframe: str,
         price: float,
-        rsi_result: Tuple[float | None, int],
-        ema_result: Dict[int, Tuple[float | None, int]],
+        rsi_result: Tuple[float | None, float],
+        ema_result: Dict[int, Tuple[float | None, float]],
+        indicators: Optional[Dict[str, Any]] = None,
     ) -> int:
+        indicators = indicators or {}
         candle_data = {
             "rsi": rsi_result[0],
             "ema": {p: v[0] for p, v in ema_result.items()},
+            "indicators": indicators,
+            "volume_change_percent": next(
+                (v for k, v in indicators.items() if k.startswith("volume_spike")), None
+            ),
             "price": price,
             "processing_time_ms": rsi_result[1],
         }
         count = await self.signal_aggregator.process_candle_update_real_time(
             session, symbol, timeframe, candle_data
         )
-        self.signal_times.append(count)
+        self.signal_times.record(count)
         return count
 
     def get_signal_generation_stats(self) -> Dict[str, float]:
-        if not self.signal_times:
+        if not self.signal_times.count:
             return {}
-        avg = sum(self.signal_times) / len(self.signal_times)
-        return {"avg_signals": avg}
+        return {"avg_signals": self.signal_times.snapshot().mean}
 
-    def validate_total_processing_time(self, elapsed_ms: int) -> bool:
+    def validate_total_processing_time(self, elapsed_ms: float) -> bool:
         return elapsed_ms <= 1000
 
     def get_processing_performance_stats(self) -> Dict[str, Any]:
-        if not self.processing_times:
+        snapshot = self.processing_times.snapshot()
+        if not snapshot.count:
             return {}
-        times = sorted(self.processing_times)
-        avg = sum(times) / len(times)
-        return {"avg_ms": avg, "max_ms": max(times)}
+        return snapshot.summary()
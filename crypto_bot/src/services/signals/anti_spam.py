@@ -2,25 +2,128 @@ from __future__ import annotations
 
 """Anti-spam manager ensuring signals are not sent too frequently."""
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-import json
+import math
+
+from redis.asyncio import Redis
 
 from src.data.redis_client import get_redis
 from src.utils.constants import SIGNAL_REPEAT_INTERVALS
 from src.utils.time_helpers import get_current_timestamp
 from src.utils.logger import LoggerMixin
+from src.utils.metrics_registry import metrics_registry
+
+_ALLOWED = metrics_registry.counter(
+    "anti_spam_decisions_total", {"decision": "allowed"}
+)
+_SUPPRESSED = metrics_registry.counter(
+    "anti_spam_decisions_total", {"decision": "suppressed"}
+)
+_CACHE_HITS = metrics_registry.counter(
+    "cache_requests_total", {"cache": "anti_spam_decisions", "result": "hit"}
+)
+_CACHE_MISSES = metrics_registry.counter(
+    "cache_requests_total", {"cache": "anti_spam_decisions", "result": "miss"}
+)
+
+# KEYS: one state hash per user.
+# ARGV: now, repeat interval, hourly limit, state ttl, field, critical flag,
+# window length.
+# Each hash field holds "last:window_start:current:previous" for one
+# (symbol, timeframe, signal_type); the hourly cap uses a sliding-window
+# counter over the current and previous windows.
+# Returns, per key in KEYS order, 0 when the send is allowed (and recorded
+# atomically) or the earliest timestamp at which it could be allowed.
+_FILTER_AND_RECORD_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+local field = ARGV[5]
+local critical = ARGV[6] == '1'
+local window = tonumber(ARGV[7])
+local window_start = now - (now % window)
+local result = {}
+for i, key in ipairs(KEYS) do
+    local last, current, previous = 0, 0, 0
+    local raw = redis.call('HGET', key, field)
+    if raw then
+        local parts = {}
+        for part in string.gmatch(raw, '[^:]+') do
+            parts[#parts + 1] = tonumber(part)
+        end
+        last = parts[1]
+        if parts[2] == window_start then
+            current, previous = parts[3], parts[4]
+        elseif parts[2] == window_start - window then
+            previous = parts[3]
+        end
+    end
+    local suppressed_until = 0
+    if not critical then
+        local weight = (window - (now - window_start)) / window
+        if last > 0 and now - last < interval then
+            suppressed_until = last + interval
+        end
+        if previous * weight + current >= limit then
+            local cap_until = window_start + window
+            if current < limit then
+                cap_until = window_start
+                    + math.ceil(window * (1 - (limit - current) / previous))
+            end
+            suppressed_until = math.max(suppressed_until, cap_until, now + 1)
+        end
+    end
+    if suppressed_until == 0 then
+        current = current + 1
+        redis.call(
+            'HSET', key, field,
+            now .. ':' .. window_start .. ':' .. current .. ':' .. previous
+        )
+        redis.call('EXPIRE', key, ttl)
+    end
+    result[i] = suppressed_until
+end
+return result
+"""
 
 
 class AntiSpamManager(LoggerMixin):
-    """Manage per-user signal rate limits using Redis sorted sets."""
+    """Manage per-user signal rate limits using compact Redis hashes.
 
-    HISTORY_TTL = 24 * 60 * 60  # seconds
+    Each user has a single hash whose fields hold a few integers per
+    (symbol, timeframe, signal_type): the last send time and sliding-window
+    counters for the hourly cap. Signal details are persisted by
+    :class:`SignalRepository`, not here.
 
-    def __init__(self) -> None:  # noqa: D401 - short
+    Negative decisions are cached in-process until the earliest time the
+    next send could be allowed. Other replicas can only push that time
+    further out by recording more sends, so a local suppression never
+    contradicts Redis, and Redis stays the authority once it expires.
+    """
+
+    WINDOW = 60 * 60  # seconds
+    STATE_TTL = 2 * WINDOW  # previous + current window
+    HOURLY_LIMIT = 10
+    CLEANUP_CURSOR_KEY = "anti_spam:cleanup_cursor"
+    CLEANUP_BATCH_SIZE = 500
+    DECISION_CACHE_MAX_SIZE = 100_000
+
+    def __init__(self, redis: Redis | None = None) -> None:  # noqa: D401 - short
         super().__init__()
-        self._redis = get_redis()
+        self._redis_client = redis
+        self._filter_script = None
         self._operation_count = 0
+        self._suppressed_until: Dict[Tuple[int, str, str, str], int] = {}
+        self._cache_lookups = 0
+        self._cache_hits = 0
+
+    @property
+    def _redis(self) -> Redis:
+        if self._redis_client is None:
+            self._redis_client = get_redis()
+        return self._redis_client
 
     async def can_send_signal(
         self,
@@ -33,65 +136,234 @@ class AntiSpamManager(LoggerMixin):
     ) -> bool:
         """Return ``True`` if a signal can be sent to ``user_id``."""
 
-        if self._is_critical_signal(signal_type, rsi_value):
+        if self.is_critical_signal(signal_type, rsi_value):
             return True
 
         now = get_current_timestamp()
-        key = self._build_key(user_id, symbol, timeframe, signal_type)
-        interval = self._get_signal_interval(signal_type)
-        last = await self._redis.zrevrange(key, 0, 0, withscores=True)
-        if last:
-            last_time = int(last[0][1])
-            if now - last_time < interval:
-                return False
-        # global hourly limit
-        hour_ago = now - 3600
-        if await self._redis.zcount(key, hour_ago, now) >= 10:
+        if self._is_locally_suppressed(user_id, symbol, timeframe, signal_type, now):
+            return False
+        raw = await self._redis.hget(
+            self._build_key(user_id), self._build_field(symbol, timeframe, signal_type)
+        )
+        last, current, previous = self._decode_state(raw, now)
+        until = self._get_suppressed_until(
+            last, current, previous, now, self._get_signal_interval(signal_type)
+        )
+        if until:
+            self._suppress(user_id, symbol, timeframe, signal_type, until)
             return False
         return True
 
+    async def filter_allowed_users(
+        self,
+        user_ids: Sequence[int],
+        symbol: str,
+        timeframe: str,
+        signal_type: str,
+        *,
+        rsi_value: Optional[float] = None,
+    ) -> List[int]:
+        """Return users from ``user_ids`` allowed to receive the signal.
+
+        Interval and hourly limits are evaluated for the whole fan-out in a
+        single Lua script, which also records the send for every allowed
+        user, so the check-and-record pair is atomic and costs one round-trip.
+        """
+
+        if not user_ids:
+            return []
+        critical = self.is_critical_signal(signal_type, rsi_value)
+        if critical:
+            candidates = list(user_ids)
+        else:
+            now = get_current_timestamp()
+            candidates = [
+                user_id
+                for user_id in user_ids
+                if not self._is_locally_suppressed(
+                    user_id, symbol, timeframe, signal_type, now
+                )
+            ]
+        _SUPPRESSED.inc(len(user_ids) - len(candidates))
+        if not candidates:
+            self.logger.debug(
+                "anti_spam_batch_cached",
+                symbol=symbol,
+                timeframe=timeframe,
+                signal_type=signal_type,
+                requested=len(user_ids),
+            )
+            return []
+        results = await self._run_filter_script(
+            [self._build_key(user_id) for user_id in candidates],
+            self._build_field(symbol, timeframe, signal_type),
+            self._get_signal_interval(signal_type),
+            critical,
+        )
+        allowed: List[int] = []
+        for user_id, until in zip(candidates, results):
+            if int(until):
+                self._suppress(user_id, symbol, timeframe, signal_type, int(until))
+            else:
+                allowed.append(user_id)
+        _ALLOWED.inc(len(allowed))
+        _SUPPRESSED.inc(len(candidates) - len(allowed))
+        self.logger.debug(
+            "anti_spam_batch",
+            symbol=symbol,
+            timeframe=timeframe,
+            signal_type=signal_type,
+            requested=len(user_ids),
+            checked=len(candidates),
+            allowed=len(allowed),
+            cache_hit_rate=self.get_decision_cache_stats()["hit_rate"],
+        )
+        return allowed
+
     async def record_sent_signal(
         self,
         user_id: int,
         symbol: str,
         timeframe: str,
         signal_type: str,
-        details: Dict[str, Any],
+        details: Optional[Dict[str, Any]] = None,
     ) -> None:
-        """Record a sent signal for spam control."""
+        """Record a sent signal for spam control.
 
-        now = get_current_timestamp()
-        key = self._build_key(user_id, symbol, timeframe, signal_type)
-        await self._redis.zadd(key, {json.dumps(details): now})
-        await self._redis.expire(key, self.HISTORY_TTL)
+        ``details`` is accepted for API compatibility only; signal payloads
+        are stored in ``signal_history`` by :class:`SignalRepository`.
+        """
+
+        key = self._build_key(user_id)
+        await self._run_filter_script(
+            [key], self._build_field(symbol, timeframe, signal_type), 0, True
+        )
+        interval = self._get_signal_interval(signal_type)
+        if interval:
+            self._suppress(
+                user_id,
+                symbol,
+                timeframe,
+                signal_type,
+                get_current_timestamp() + interval,
+            )
         self._operation_count += 1
         if self._operation_count % 100 == 0:
             await self.cleanup_old_records(key)
 
     async def get_user_signal_stats(self, user_id: int) -> Dict[str, Any]:
-        """Return basic statistics for ``user_id`` signal history."""
+        """Return estimated signals sent to ``user_id`` in the last hour.
+
+        Keys of the result are ``"<symbol>:<timeframe>:<signal_type>"``.
+        """
 
-        pattern = f"signal_history:{user_id}:*"
-        keys = await self._redis.keys(pattern)
+        state = await self._redis.hgetall(self._build_key(user_id))
         now = get_current_timestamp()
-        hour_ago = now - 3600
         stats: Dict[str, Any] = {}
-        for key in keys:
-            count = await self._redis.zcount(key, hour_ago, now)
-            stats[key] = count
+        for field, raw in state.items():
+            _last, current, previous = self._decode_state(raw, now)
+            count = self._estimate_hourly_count(current, previous, now)
+            if count:
+                stats[field] = round(count, 2)
         return stats
 
-    async def cleanup_old_records(self, key: Optional[str] = None) -> None:
-        """Remove entries older than 24h."""
+    async def cleanup_old_records(self, key: Optional[str] = None) -> int:
+        """Drop expired per-signal fields and return the number of keys visited.
+
+        Whole hashes expire through their TTL; this only trims fields of
+        signal types a still-active user no longer receives. Without ``key``
+        one ``SCAN`` page is processed per call; the cursor is persisted in
+        Redis so consecutive runs (on any replica) walk the keyspace
+        incrementally.
+        """
 
-        now = get_current_timestamp()
         if key is not None:
-            await self._redis.zremrangebyscore(key, 0, now - self.HISTORY_TTL)
-            return
-        # clean all keys if none provided
-        keys = await self._redis.keys("signal_history:*")
+            keys = [key]
+        else:
+            cursor = int(await self._redis.get(self.CLEANUP_CURSOR_KEY) or 0)
+            cursor, keys = await self._redis.scan(
+                cursor, match="anti_spam:user:*", count=self.CLEANUP_BATCH_SIZE
+            )
+            await self._redis.set(self.CLEANUP_CURSOR_KEY, cursor)
+        if not keys:
+            return 0
+        pipeline = self._redis.pipeline()
         for k in keys:
-            await self._redis.zremrangebyscore(k, 0, now - self.HISTORY_TTL)
+            pipeline.hgetall(k)
+        states = await pipeline.execute()
+        now = get_current_timestamp()
+        pipeline = self._redis.pipeline()
+        for k, state in zip(keys, states):
+            stale = [
+                field
+                for field, raw in state.items()
+                if now - self._decode_state(raw, now)[0] >= self.STATE_TTL
+            ]
+            if stale:
+                pipeline.hdel(k, *stale)
+        await pipeline.execute()
+        return len(keys)
+
+    def get_decision_cache_stats(self) -> Dict[str, Any]:
+        """Return hit rate of the in-process suppression cache."""
+
+        lookups = self._cache_lookups
+        hit_rate = self._cache_hits / lookups if lookups else 0.0
+        return {
+            "lookups": self._cache_lookups,
+            "hits": self._cache_hits,
+            "hit_rate": round(hit_rate, 4),
+            "size": len(self._suppressed_until),
+        }
+
+    def _is_locally_suppressed(
+        self, user_id: int, symbol: str, timeframe: str, signal_type: str, now: int
+    ) -> bool:
+        self._cache_lookups += 1
+        key = (user_id, symbol, timeframe, signal_type)
+        until = self._suppressed_until.get(key)
+        if until is None:
+            _CACHE_MISSES.inc()
+            return False
+        if until <= now:
+            del self._suppressed_until[key]
+            _CACHE_MISSES.inc()
+            return False
+        self._cache_hits += 1
+        _CACHE_HITS.inc()
+        return True
+
+    def _suppress(
+        self, user_id: int, symbol: str, timeframe: str, signal_type: str, until: int
+    ) -> None:
+        if len(self._suppressed_until) >= self.DECISION_CACHE_MAX_SIZE:
+            now = get_current_timestamp()
+            self._suppressed_until = {
+                k: v for k, v in self._suppressed_until.items() if v > now
+            }
+            if len(self._suppressed_until) >= self.DECISION_CACHE_MAX_SIZE:
+                self._suppressed_until.clear()
+        self._suppressed_until[(user_id, symbol, timeframe, signal_type)] = until
+
+    async def _run_filter_script(
+        self, keys: List[str], field: str, interval: int, critical: bool
+    ) -> List[int]:
+        if self._filter_script is None:
+            self._filter_script = self._redis.register_script(
+                _FILTER_AND_RECORD_SCRIPT
+            )
+        return await self._filter_script(
+            keys=keys,
+            args=[
+                get_current_timestamp(),
+                interval,
+                self.HOURLY_LIMIT,
+                self.STATE_TTL,
+                field,
+                int(critical),
+                self.WINDOW,
+            ],
+        )
 
     def _get_signal_interval(self, signal_type: str) -> int:
         """Return repeat interval in seconds for ``signal_type``."""
@@ -102,8 +374,49 @@ class AntiSpamManager(LoggerMixin):
             return SIGNAL_REPEAT_INTERVALS.get("ema", 0)
         return 0
 
+    @classmethod
+    def _decode_state(cls, raw: str | None, now: int) -> Tuple[int, int, int]:
+        """Return ``(last, current, previous)`` rolled forward to ``now``."""
+
+        if not raw:
+            return 0, 0, 0
+        last, window_start, current, previous = (int(p) for p in raw.split(":"))
+        now_window = now - now % cls.WINDOW
+        if window_start == now_window:
+            return last, current, previous
+        if window_start == now_window - cls.WINDOW:
+            return last, 0, current
+        return last, 0, 0
+
+    @classmethod
+    def _get_suppressed_until(
+        cls, last: int, current: int, previous: int, now: int, interval: int
+    ) -> int:
+        """Return the earliest time a send could be allowed, or 0 if allowed now.
+
+        Mirrors the Lua script so single and batched checks agree.
+        """
+
+        until = 0
+        if last and now - last < interval:
+            until = last + interval
+        if cls._estimate_hourly_count(current, previous, now) >= cls.HOURLY_LIMIT:
+            window_start = now - now % cls.WINDOW
+            cap_until = window_start + cls.WINDOW
+            if current < cls.HOURLY_LIMIT:
+                cap_until = window_start + math.ceil(
+                    cls.WINDOW * (1 - (cls.HOURLY_LIMIT - current) / previous)
+                )
+            until = max(until, cap_until, now + 1)
+        return until
+
+    @classmethod
+    def _estimate_hourly_count(cls, current: int, previous: int, now: int) -> float:
+        weight = (cls.WINDOW - now % cls.WINDOW) / cls.WINDOW
+        return previous * weight + current
+
     @staticmethod
-    def _is_critical_signal(signal_type: str, rsi_value: Optional[float] = None) -> bool:
+    def is_critical_signal(signal_type: str, rsi_value: Optional[float] = None) -> bool:
         if signal_type.startswith("rsi") and rsi_value is not None:
             return rsi_value < 15 or rsi_value > 85
         if signal_type == "ema_golden_cross":
@@ -111,5 +424,9 @@ class AntiSpamManager(LoggerMixin):
         return False
 
     @staticmethod
-    def _build_key(user_id: int, symbol: str, timeframe: str, signal_type: str) -> str:
-        return f"signal_history:{user_id}:{symbol}:{timeframe}:{signal_type}"
+    def _build_key(user_id: int) -> str:
+        return f"anti_spam:user:{user_id}"
+
+    @staticmethod
+    def _build_field(symbol: str, timeframe: str, signal_type: str) -> str:
+        return f"{symbol}:{timeframe}:{signal_type}"
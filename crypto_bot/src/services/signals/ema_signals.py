@@ -1,13 +1,32 @@
 from __future__ import annotations
 
-"""EMA based signal generator."""
+"""EMA based signal generator.
 
-from __future__ import annotations
+With the indicator engine the crossover and trend rules read the
+``ema_cross:*`` and ``trend:*`` nodes of the pair's indicator graph, which
+share their EMAs with every other consumer. Without it, crossovers of the
+default pairs are detected from consecutive ``ema_values``.
+"""
 
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 from src.utils.logger import LoggerMixin
 
+DEFAULT_CROSSOVERS = [(20, 50), (50, 200)]
+
+
+def _graph_nodes(
+    indicators: Optional[Mapping[str, Any]], name: str
+) -> List[Tuple[Tuple[int, ...], Any]]:
+    """``(periods, value)`` of the ``name`` nodes in the engine values."""
+
+    prefix = f"{name}:"
+    return [
+        (tuple(int(p) for p in key[len(prefix):].split(":")), value)
+        for key, value in (indicators or {}).items()
+        if key.startswith(prefix)
+    ]
+
 
 class EMASignalGenerator(LoggerMixin):
     """Generate signals using exponential moving averages."""
@@ -22,12 +41,17 @@ class EMASignalGenerator(LoggerMixin):
         timeframe: str,
         ema_values: Dict[int, float],
         price: float,
+        indicators: Optional[Mapping[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
-        """Process EMA updates and return detected signals."""
+        """Process EMA updates (and the engine's ``indicators``) and return signals."""
 
         signals: List[Dict[str, Any]] = []
-        signals.extend(self.detect_ema_crossovers(symbol, timeframe, ema_values))
-        signals.extend(self.determine_trend_strength(symbol, timeframe, ema_values))
+        signals.extend(
+            self.detect_ema_crossovers(symbol, timeframe, ema_values, indicators)
+        )
+        signals.extend(
+            self.determine_trend_strength(symbol, timeframe, ema_values, indicators)
+        )
         signals.extend(
             self.check_price_ema_divergence(symbol, timeframe, ema_values, price)
         )
@@ -36,13 +60,23 @@ class EMASignalGenerator(LoggerMixin):
         return signals
 
     def detect_ema_crossovers(
-        self, symbol: str, timeframe: str, ema_values: Dict[int, float]
+        self,
+        symbol: str,
+        timeframe: str,
+        ema_values: Dict[int, float],
+        indicators: Optional[Mapping[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
         """Detect golden/death cross signals."""
 
+        crosses = _graph_nodes(indicators, "ema_cross")
+        if crosses:
+            return [
+                {"signal_type": f"ema_{value['cross']}_cross", "periods": periods}
+                for periods, value in crosses
+                if value and value.get("cross")
+            ]
         signals: List[Dict[str, Any]] = []
-        pairs = [(20, 50), (50, 200)]
-        for short_p, long_p in pairs:
+        for short_p, long_p in DEFAULT_CROSSOVERS:
             short = ema_values.get(short_p)
             long = ema_values.get(long_p)
             prev_short = self._previous.get((symbol, timeframe, short_p))
@@ -68,11 +102,24 @@ class EMASignalGenerator(LoggerMixin):
         return signals
 
     def determine_trend_strength(
-        self, symbol: str, timeframe: str, ema_values: Dict[int, float]
+        self,
+        symbol: str,
+        timeframe: str,
+        ema_values: Dict[int, float],
+        indicators: Optional[Mapping[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
-        """Placeholder trend strength analysis."""
-
-        return []
+        """Signal when the stacked EMAs of a ``trend`` node turn bullish or bearish."""
+
+        return [
+            {
+                "signal_type": "ema_trend_"
+                + ("bullish" if value["direction"] > 0 else "bearish"),
+                "periods": periods,
+                "spread_percent": value["spread_percent"],
+            }
+            for periods, value in _graph_nodes(indicators, "trend")
+            if value and value.get("changed") and value.get("direction")
+        ]
 
     def check_price_ema_divergence(
         self,
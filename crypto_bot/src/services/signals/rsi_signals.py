@@ -2,6 +2,7 @@ from __future__ import annotations
 
 """RSI signal generator used in real-time processing."""
 
+import time
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -10,8 +11,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.data.repositories.signal_repository import SignalRepository
 from src.data.repositories.user_repository import UserRepository
 from src.services.signals.anti_spam import AntiSpamManager
-from src.services.notifications.notification_queue import NotificationQueue
+from src.services.notifications.fanout_scheduler import priority_for_signal
+from src.services.notifications.message_formatter import message_formatter
+from src.services.notifications.notification_queue import (
+    NotificationQueue,
+    notification_queue,
+)
 from src.utils.logger import LoggerMixin
+from src.utils.tracing import tracer
 from src.utils.performance_utils import measure_time
 from src.utils.constants import RSI_ZONES
 
@@ -29,12 +36,15 @@ class RSIZone(Enum):
 class RSISignalGenerator(LoggerMixin):
     """Generate RSI based signals and enqueue notifications."""
 
-    def __init__(self) -> None:  # noqa: D401 - short
+    def __init__(
+        self, queue: NotificationQueue | None = None
+    ) -> None:  # noqa: D401 - short
         super().__init__()
         self._signal_repo = SignalRepository()
         self._user_repo = UserRepository()
         self._anti_spam = AntiSpamManager()
-        self._notification_queue = NotificationQueue()
+        self._notification_queue = queue or notification_queue
+        self._formatter = message_formatter
         self._previous_rsi: Dict[Tuple[str, str], float] = {}
 
     @measure_time(target_ms=200)
@@ -45,7 +55,7 @@ class RSISignalGenerator(LoggerMixin):
         timeframe: str,
         rsi_value: float,
         price: float,
-        processing_time_ms: int,
+        processing_time_ms: float,
         volume_change_percent: Optional[float] = None,
     ) -> int:
         prev_rsi = self._previous_rsi.get((symbol, timeframe))
@@ -90,6 +100,7 @@ class RSISignalGenerator(LoggerMixin):
                 "signal_type": signal_type,
                 "price": current_price,
                 "rsi_value": current_rsi,
+                "volume_change": volume_change_percent,
             }
         ]
 
@@ -116,30 +127,46 @@ class RSISignalGenerator(LoggerMixin):
         self,
         session: AsyncSession,
         signals: List[Dict[str, Any]],
-        processing_time_ms: int,
+        processing_time_ms: float,
     ) -> int:
         """Create notifications for users and persist history."""
 
         total = 0
         for signal in signals:
-            users = await self._get_users_for_notification(
+            locales = await self._get_users_for_notification(
                 session, signal["symbol"], signal["timeframe"]
             )
-            for user_id in users:
-                if not await self._can_send_signal(
-                    user_id,
-                    signal["symbol"],
-                    signal["timeframe"],
-                    signal["signal_type"],
-                    signal.get("rsi_value"),
-                ):
-                    continue
+            allowed = await self._filter_allowed_users(
+                list(locales),
+                signal["symbol"],
+                signal["timeframe"],
+                signal["signal_type"],
+                signal.get("rsi_value"),
+            )
+            shared = {
+                **signal,
+                "processing_time_ms": processing_time_ms,
+                "priority": priority_for_signal(signal),
+                "created_at_ms": int(time.time() * 1000),
+            }
+            trace = tracer.current()
+            if trace is not None:
+                shared["trace_id"] = trace.trace_id
+                shared["event_time_ms"] = trace.event_time_ms
+            rendered = {
+                locale: self._formatter.render_signal(shared, locale)
+                for locale in {locales[user_id] for user_id in allowed}
+            }
+            for user_id in allowed:
                 payload = {
-                    **signal,
+                    **shared,
                     "user_id": user_id,
-                    "processing_time_ms": processing_time_ms,
+                    "message": rendered[locales[user_id]].for_user(),
+                    "locale": locales[user_id],
                 }
-                await self._notification_queue.add_real_time_notification(payload)
+                await self._notification_queue.add_real_time_notification(
+                    payload, priority=shared["priority"]
+                )
                 await self._signal_repo.save_signal_with_metrics(
                     session,
                     user_id,
@@ -148,6 +175,7 @@ class RSISignalGenerator(LoggerMixin):
                     signal["signal_type"],
                     signal_value=signal.get("rsi_value"),
                     price=signal.get("price"),
+                    volume_change=signal.get("volume_change"),
                     processing_time_ms=processing_time_ms,
                 )
                 total += 1
@@ -155,23 +183,26 @@ class RSISignalGenerator(LoggerMixin):
 
     async def _get_users_for_notification(
         self, session: AsyncSession, symbol: str, timeframe: str
-    ) -> List[int]:
+    ) -> Dict[int, str]:
+        """Return subscribed user ids mapped to their message locale."""
+
         users = await self._user_repo.get_users_with_pair_and_timeframe(
             session, symbol, timeframe
         )
-        return [u.id for u in users]
+        return {u.id: self._formatter.resolve_locale(u.language_code) for u in users}
 
-    async def _can_send_signal(
+    async def _filter_allowed_users(
         self,
-        user_id: int,
+        user_ids: List[int],
         symbol: str,
         timeframe: str,
         signal_type: str,
         rsi_value: Optional[float] = None,
-    ) -> bool:
-        return await self._anti_spam.can_send_signal(
-            user_id, symbol, timeframe, signal_type, rsi_value=rsi_value
-        )
+    ) -> List[int]:
+        with tracer.span("anti_spam"):
+            return await self._anti_spam.filter_allowed_users(
+                user_ids, symbol, timeframe, signal_type, rsi_value=rsi_value
+            )
 
 
 rsi_signal_generator = RSISignalGenerator()
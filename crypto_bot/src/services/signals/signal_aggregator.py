@@ -2,7 +2,7 @@ from __future__ import annotations
 
 """Aggregate different signal generators."""
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -11,6 +11,7 @@ from src.services.signals.ema_signals import ema_signal_generator, EMASignalGene
 from src.utils.logger import LoggerMixin
 from src.utils.performance_utils import measure_time
 from src.utils.constants import get_real_time_target
+from src.utils.tracing import tracer
 
 
 class SignalAggregator(LoggerMixin):
@@ -41,13 +42,21 @@ class SignalAggregator(LoggerMixin):
         processing_time_ms = candle_data.get("processing_time_ms", 0)
         total = 0
         if rsi_value is not None:
-            total += await self._process_rsi_signals_real_time(
-                session, symbol, timeframe, rsi_value, price, processing_time_ms
-            )
+            with tracer.span("rsi_signals"):
+                total += await self._process_rsi_signals_real_time(
+                    session,
+                    symbol,
+                    timeframe,
+                    rsi_value,
+                    price,
+                    processing_time_ms,
+                    candle_data.get("volume_change_percent"),
+                )
         if ema_values:
-            await self._process_ema_signals_real_time(
-                symbol, timeframe, ema_values, price
-            )
+            with tracer.span("ema_signals"):
+                await self._process_ema_signals_real_time(
+                    symbol, timeframe, ema_values, price, candle_data.get("indicators")
+                )
         return total
 
     async def _process_rsi_signals_real_time(
@@ -57,10 +66,17 @@ class SignalAggregator(LoggerMixin):
         timeframe: str,
         rsi_value: float,
         price: float,
-        processing_time_ms: int,
+        processing_time_ms: float,
+        volume_change_percent: Optional[float] = None,
     ) -> int:
         return await self.rsi_generator.process_rsi_update_real_time(
-            session, symbol, timeframe, rsi_value, price, processing_time_ms
+            session,
+            symbol,
+            timeframe,
+            rsi_value,
+            price,
+            processing_time_ms,
+            volume_change_percent,
         )
 
     async def _process_ema_signals_real_time(
@@ -69,12 +85,13 @@ class SignalAggregator(LoggerMixin):
         timeframe: str,
         ema_values: Dict[int, float],
         price: float,
+        indicators: Optional[Dict[str, Any]] = None,
     ) -> None:
         await self.ema_generator.process_ema_update_real_time(
-            symbol, timeframe, ema_values, price
+            symbol, timeframe, ema_values, price, indicators
         )
 
-    def validate_processing_performance(self, elapsed_ms: int) -> bool:
+    def validate_processing_performance(self, elapsed_ms: float) -> bool:
         target = get_real_time_target("signal_generation")
         return elapsed_ms <= target if target else True
 
@@ -24,7 +24,7 @@ class SignalHistoryManager(LoggerMixin):
         symbol: str,
         timeframe: str,
         signal_type: str,
-        processing_time_ms: int,
+        processing_time_ms: float,
         delivery_time_ms: int | None = None,
     ) -> None:
         await self._repo.save_signal_with_metrics(
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+"""Closed-candle hand-off from ingest to compute processes on Redis Streams.
+
+Candles are sharded by a stable hash of their symbol, one stream per shard,
+so every update of a symbol is processed in order by the single compute
+worker owning that shard. Per-symbol state kept in process memory (e.g.
+the previous RSI of :class:`RSISignalGenerator`) therefore stays consistent.
+"""
+
+import asyncio
+import zlib
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from src.data.redis_client import get_redis
+from src.utils.logger import LoggerMixin
+from src.utils.metrics_registry import metrics_registry
+from src.utils.tracing import tracer
+
+CandleHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+def shard_for_symbol(symbol: str, shards: int) -> int:
+    """Return the shard of ``symbol``; identical in every process."""
+
+    # hash() is salted per process, crc32 is not
+    return zlib.crc32(symbol.encode()) % max(shards, 1)
+
+
+def _encode_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+class CandleStream(LoggerMixin):
+    """Publish candles to, and consume them from, per-shard streams.
+
+    :meth:`process_websocket_data` has the signature of
+    :meth:`RealTimeProcessor.process_websocket_data`, so an ingest process
+    passes the stream to :class:`BinanceDataProcessor` in its place.
+    """
+
+    STREAM_PREFIX = "candle_events:"
+    GROUP = "compute"
+    BLOCK_MS = 1_000
+    READ_COUNT = 64
+    STREAM_MAXLEN = 10_000
+
+    def __init__(
+        self, redis: Redis | None = None, shards: int = 1
+    ) -> None:  # noqa: D401 - short
+        super().__init__()
+        self._redis_client = redis
+        self.shards = max(shards, 1)
+        self._published = metrics_registry.counter(
+            "candle_events_total", {"op": "published"}
+        )
+        self._consumed = metrics_registry.counter(
+            "candle_events_total", {"op": "consumed"}
+        )
+        self._failed = metrics_registry.counter("candle_events_total", {"op": "failed"})
+
+    @property
+    def _redis(self) -> Redis:
+        if self._redis_client is None:
+            self._redis_client = get_redis()
+        return self._redis_client
+
+    def stream(self, shard: int) -> str:
+        return f"{self.STREAM_PREFIX}{shard}"
+
+    async def publish(self, candle: Dict[str, Any]) -> None:
+        payload = dict(candle)
+        trace = tracer.current()
+        if trace is not None and trace.event_time_ms is not None:
+            payload.setdefault("event_time_ms", trace.event_time_ms)
+        shard = shard_for_symbol(candle["symbol"], self.shards)
+        await self._redis.xadd(
+            self.stream(shard),
+            {"data": orjson.dumps(payload, default=_encode_default)},
+            maxlen=self.STREAM_MAXLEN,
+            approximate=True,
+        )
+        self._published.inc()
+
+    async def process_websocket_data(self, candle: Dict[str, Any]) -> None:
+        await self.publish(candle)
+
+    async def consume(
+        self,
+        shard: int,
+        handler: CandleHandler,
+        consumer: Optional[str] = None,
+        stop: Optional[asyncio.Event] = None,
+    ) -> None:
+        """Feed candles of ``shard`` to ``handler`` in order until ``stop``.
+
+        The consumer name is stable per shard, so a restarted worker first
+        replays the entries it had read but not acknowledged.
+        """
+
+        stream = self.stream(shard)
+        consumer = consumer or f"shard-{shard}"
+        await self._ensure_group(stream)
+        backlog = True
+        while stop is None or not stop.is_set():
+            reply = await self._redis.xreadgroup(
+                self.GROUP,
+                consumer,
+                {stream: "0" if backlog else ">"},
+                count=self.READ_COUNT,
+                block=None if backlog else self.BLOCK_MS,
+            )
+            entries = reply[0][1] if reply else []
+            if backlog and not entries:
+                backlog = False
+                continue
+            for entry_id, fields in entries:
+                await self._handle(stream, entry_id, fields, handler)
+
+    async def drain(
+        self, shard: int, handler: CandleHandler, consumer: Optional[str] = None
+    ) -> int:
+        """Process everything currently queued for ``shard``; return count."""
+
+        stream = self.stream(shard)
+        consumer = consumer or f"shard-{shard}"
+        await self._ensure_group(stream)
+        processed = 0
+        for start in ("0", ">"):
+            while True:
+                reply = await self._redis.xreadgroup(
+                    self.GROUP, consumer, {stream: start}, count=self.READ_COUNT
+                )
+                entries = reply[0][1] if reply else []
+                if not entries:
+                    break
+                for entry_id, fields in entries:
+                    await self._handle(stream, entry_id, fields, handler)
+                    processed += 1
+        return processed
+
+    async def get_backlog(self) -> Dict[int, int]:
+        pipeline = self._redis.pipeline(transaction=False)
+        for shard in range(self.shards):
+            pipeline.xlen(self.stream(shard))
+        return dict(enumerate(await pipeline.execute()))
+
+    # ------------------------------------------------------------------
+    async def _ensure_group(self, stream: str) -> None:
+        try:
+            await self._redis.xgroup_create(stream, self.GROUP, id="0", mkstream=True)
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    async def _handle(
+        self, stream: str, entry_id: Any, fields: Dict[Any, Any], handler: CandleHandler
+    ) -> None:
+        data = fields.get("data", fields.get(b"data"))
+        try:
+            await handler(orjson.loads(data))
+            self._consumed.inc()
+        except Exception as exc:  # noqa: BLE001 - the next candle supersedes it
+            self._failed.inc()
+            self.logger.error("candle_event_failed", stream=stream, error=str(exc))
+        # candles are not retried: a later candle carries newer state anyway
+        pipeline = self._redis.pipeline(transaction=True)
+        pipeline.xack(stream, self.GROUP, entry_id)
+        pipeline.xdel(stream, entry_id)
+        await pipeline.execute()
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+"""Per-role liveness records shared through Redis.
+
+Every process of the worker topology publishes a small JSON heartbeat under
+``health:<role>:<instance>`` with a TTL of a few intervals; a missing key
+means the process is gone. :func:`get_cluster_health` collects them for the
+``/health`` endpoint and the admin command.
+"""
+
+import asyncio
+import os
+import socket
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import orjson
+from redis.asyncio import Redis
+
+from src.data.redis_client import get_redis
+from src.utils.logger import LoggerMixin
+
+HEALTH_PREFIX = "health:"
+TTL_INTERVALS = 3
+
+StatsFunc = Callable[[], Dict[str, Any]]
+
+
+class RoleHeartbeat(LoggerMixin):
+    """Periodically publish this process' role, pid and stats."""
+
+    def __init__(
+        self,
+        role: str,
+        instance: str = "0",
+        *,
+        interval: float = 5.0,
+        stats_func: Optional[StatsFunc] = None,
+        redis: Redis | None = None,
+    ) -> None:  # noqa: D401 - short
+        super().__init__()
+        self.role = role
+        self.instance = instance
+        self.interval = interval
+        self.stats_func = stats_func
+        self._redis_client = redis
+        self._started_at = time.time()
+        self._task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def _redis(self) -> Redis:
+        if self._redis_client is None:
+            self._redis_client = get_redis()
+        return self._redis_client
+
+    @property
+    def key(self) -> str:
+        return f"{HEALTH_PREFIX}{self.role}:{self.instance}"
+
+    def snapshot(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {}
+        if self.stats_func is not None:
+            try:
+                stats = self.stats_func()
+            except Exception as exc:  # noqa: BLE001 - health must not fail
+                stats = {"error": str(exc)}
+        return {
+            "role": self.role,
+            "instance": self.instance,
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "started_at": self._started_at,
+            "updated_at": time.time(),
+            "stats": stats,
+        }
+
+    async def beat(self) -> None:
+        await self._redis.set(
+            self.key,
+            orjson.dumps(self.snapshot(), default=str),
+            ex=max(1, int(self.interval * TTL_INTERVALS)),
+        )
+
+    async def start(self) -> None:
+        if self._task is None:
+            await self.beat()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._redis.delete(self.key)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.beat()
+            except Exception as exc:  # noqa: BLE001 - retried next interval
+                self.logger.error("heartbeat_failed", role=self.role, error=str(exc))
+
+
+async def get_cluster_health(
+    redis: Redis | None = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Return live heartbeats grouped by role."""
+
+    client = redis or get_redis()
+    keys = [key async for key in client.scan_iter(match=f"{HEALTH_PREFIX}*", count=100)]
+    if not keys:
+        return {}
+    now = time.time()
+    roles: Dict[str, List[Dict[str, Any]]] = {}
+    for raw in await client.mget(keys):
+        if raw is None:  # expired between SCAN and MGET
+            continue
+        record = orjson.loads(raw)
+        record["age_s"] = round(now - record["updated_at"], 1)
+        roles.setdefault(record["role"], []).append(record)
+    for records in roles.values():
+        records.sort(key=lambda record: str(record["instance"]))
+    return roles
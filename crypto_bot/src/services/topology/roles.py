@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+"""Process roles of the multi-process deployment.
+
+``python -m src.worker <role>`` runs one of:
+
+* ``ingest``   - Binance WebSocket receive loop; closed candles go to the
+  per-shard candle streams (:class:`CandleStream`);
+* ``compute``  - indicators and signals for one shard of symbols; rendered
+  notifications go to the Redis notification queue;
+* ``delivery`` - notification queue workers feeding the rate-limited
+  Telegram delivery engine;
+* ``bot``      - aiogram polling for user commands.
+
+Compute processes are told their shard and delivery processes their index
+(``--shard``/``--instance``, below ``compute_shards`` and
+``delivery_processes``). Every role shares :class:`BotConfig`, publishes a
+:class:`RoleHeartbeat` and, when ``metrics_port`` is set, serves
+``/metrics`` and ``/health`` on ``metrics_port + ROLE_PORT_OFFSETS[role] +
+shard``. ``python -m src.main`` still runs everything in one process.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from src.config.bot_config import BotConfig
+from src.services.topology.candle_stream import CandleStream, shard_for_symbol
+from src.services.topology.health import RoleHeartbeat, get_cluster_health
+from src.services.topology.shard_ownership import ShardCoordinator
+from src.utils.logger import LoggerMixin
+from src.utils.tracing import configure_tracing, tracer
+
+# compute shards and delivery indexes take consecutive ports from their offset
+ROLE_PORT_OFFSETS = {"ingest": 0, "bot": 2, "compute": 10, "delivery": 100}
+
+
+class WorkerRole(LoggerMixin):
+    """Base class: set up, serve until stopped, tear down."""
+
+    name = ""
+
+    def __init__(self, config: BotConfig, shard: int = 0) -> None:  # noqa: D401 - short
+        super().__init__()
+        self.config = config
+        self.shard = shard
+        self._closers: List[Any] = []
+
+    @property
+    def instance(self) -> str:
+        return str(self.shard)
+
+    async def setup(self) -> None:
+        raise NotImplementedError
+
+    async def serve(self, stop: asyncio.Event) -> None:
+        await stop.wait()
+
+    async def teardown(self) -> None:
+        for close in reversed(self._closers):
+            try:
+                await close()
+            except Exception as exc:  # noqa: BLE001 - keep shutting down
+                self.logger.error(
+                    "role_teardown_failed", role=self.name, error=str(exc)
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class IngestRole(WorkerRole):
+    name = "ingest"
+
+    async def setup(self) -> None:
+        from src.config.binance_config import get_binance_config
+        from src.data.database import get_sessionmaker, init_database
+        from src.data.redis_client import get_redis
+        from src.data.repositories.user_pair_repository import UserPairRepository
+        from src.services.cache.candle_cache import CandleCache
+        from src.services.websocket.binance_data_processor import BinanceDataProcessor
+        from src.services.websocket.stream_manager import StreamManager
+
+        await init_database()
+        self.candle_stream = CandleStream(shards=self.config.compute_shards)
+        processor = BinanceDataProcessor(
+            CandleCache(get_redis()), real_time_processor=self.candle_stream
+        )
+        self.coordinator = None
+        if self.config.sharding_enabled:
+            self.coordinator = ShardCoordinator(
+                self.config.replica_id, lease_ttl=self.config.shard_lease_ttl_seconds
+            )
+            self._closers.append(self.coordinator.stop)
+        self.stream_manager = StreamManager(
+            get_sessionmaker(),
+            UserPairRepository(),
+            get_binance_config(),
+            processor,
+            coordinator=self.coordinator,
+        )
+        await self.stream_manager.start()
+        if self.stream_manager.websocket is not None:
+            self._closers.append(self.stream_manager.websocket.disconnect)
+
+    def stats(self) -> Dict[str, Any]:
+        websocket = self.stream_manager.websocket
+        stats: Dict[str, Any] = {
+            "streams": len(self.stream_manager.active_streams),
+            "websocket": websocket.state.value if websocket is not None else None,
+        }
+        if self.coordinator is not None:
+            stats.update(self.coordinator.get_stats())
+        return stats
+
+
+class ComputeRole(WorkerRole):
+    name = "compute"
+
+    async def setup(self) -> None:
+        from src.data.database import get_sessionmaker, init_database
+        from src.data.redis_client import get_redis
+        from src.services.cache.candle_cache import CandleCache
+        from src.services.cache.indicator_cache import IndicatorCache
+        from src.services.indicators.ema_calculator import EMACalculator
+        from src.services.indicators.incremental import create_indicator
+        from src.services.indicators.indicator_engine import IndicatorEngine
+        from src.services.indicators.indicator_executor import IndicatorExecutor
+        from src.services.indicators.rsi_calculator import RSICalculator
+        from src.services.real_time.performance_monitor import PerformanceMonitor
+        from src.services.real_time.real_time_processor import RealTimeProcessor
+
+        await init_database()
+        self.sessionmaker = get_sessionmaker()
+        candle_cache = CandleCache(get_redis())
+        indicator_cache = IndicatorCache(get_redis())
+        executor = IndicatorExecutor(max_workers=self.config.indicator_pool_workers)
+        self.engine = engine = IndicatorEngine(
+            indicator_cache,
+            candle_cache,
+            [create_indicator(spec) for spec in self.config.indicator_specs],
+            executor,
+        )
+        async with self.sessionmaker() as session:
+            await engine.load_plans(session)
+        if self.config.indicator_pool_enabled:
+            await executor.start()
+            self._closers.append(executor.shutdown)
+        rsi_calculator = RSICalculator(
+            indicator_cache,
+            candle_cache,
+            executor,
+            warmup_periods=self.config.rsi_warmup_periods,
+        )
+        self.processor = RealTimeProcessor(
+            rsi_calculator,
+            EMACalculator(indicator_cache, candle_cache, executor),
+            PerformanceMonitor(),
+            indicator_engine=engine,
+        )
+        self.candle_stream = CandleStream(shards=self.config.compute_shards)
+        self.processed = 0
+        await self._warm_up(rsi_calculator)
+
+    async def _warm_up(self, rsi_calculator: Any) -> None:
+        """Seed this shard's pairs in executor batches before consuming candles."""
+
+        from src.data.repositories.user_pair_repository import UserPairRepository
+
+        shards = self.config.compute_shards
+        try:
+            async with self.sessionmaker() as session:
+                rows = await UserPairRepository().get_indicator_settings(session)
+            pairs = sorted(
+                {
+                    (symbol, timeframe)
+                    for symbol, timeframes, _ in rows
+                    for timeframe, enabled in (timeframes or {}).items()
+                    if enabled and shard_for_symbol(symbol, shards) == self.shard
+                }
+            )
+            rsi = await rsi_calculator.recalculate_many(pairs)
+            seeded = await self.engine.warm_up(pairs)
+        except Exception as exc:  # noqa: BLE001 - pairs are then seeded lazily
+            self.logger.error("indicator_warm_up_failed", error=str(exc))
+            return
+        self.logger.info(
+            "indicators_warmed_up",
+            pairs=len(pairs),
+            rsi=sum(value is not None for value in rsi.values()),
+            engine=seeded,
+        )
+
+    async def serve(self, stop: asyncio.Event) -> None:
+        refresh = asyncio.create_task(self._refresh_plans())
+        try:
+            await self.candle_stream.consume(self.shard, self.handle_candle, stop=stop)
+        finally:
+            refresh.cancel()
+            await asyncio.gather(refresh, return_exceptions=True)
+
+    async def _refresh_plans(self) -> None:
+        """Pick up indicators subscribers added or removed since the last load."""
+
+        while True:
+            await asyncio.sleep(self.config.indicator_plan_refresh_seconds)
+            try:
+                async with self.sessionmaker() as session:
+                    await self.engine.load_plans(session)
+            except Exception as exc:  # noqa: BLE001 - keeps the current plans
+                self.logger.error("indicator_plans_refresh_failed", error=str(exc))
+
+    async def handle_candle(self, candle: Dict[str, Any]) -> None:
+        tracer.start_trace(candle.get("event_time_ms"), shard=self.shard)
+        async with self.sessionmaker() as session:
+            await self.processor.process_websocket_data(candle, session)
+            await session.commit()
+        self.processed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "shard": self.shard,
+            "shards": self.config.compute_shards,
+            "candles_processed": self.processed,
+            **self.processor.get_processing_performance_stats(),
+        }
+
+
+class DeliveryRole(WorkerRole):
+    name = "delivery"
+
+    async def setup(self) -> None:
+        from src.main import create_bot
+        from src.services.notifications.digest_buffer import DigestBuffer
+        from src.services.notifications.fanout_scheduler import FanoutScheduler
+        from src.services.notifications.notification_queue import notification_queue
+        from src.services.notifications.telegram_sender import TelegramSender
+
+        cfg = self.config
+        # every process sends through the same bot token and its limit
+        global_rate = cfg.delivery_global_rate / max(cfg.delivery_processes, 1)
+        self.bot = await create_bot()
+        self._closers.append(self.bot.session.close)
+        self.sender = TelegramSender(
+            self.bot,
+            global_rate=global_rate,
+            per_chat_rate=cfg.delivery_per_chat_rate,
+            workers=cfg.delivery_workers,
+        )
+        self._closers.append(self.sender.close)
+        self.scheduler = FanoutScheduler(self.sender.engine, rate=global_rate)
+        await self.scheduler.start()
+        self._closers.append(self.scheduler.stop)
+        # handlers return once Telegram accepted the message, so the queue
+        # acks only delivered entries and retries or dead-letters the rest;
+        # it keeps reading up to the scheduler's backlog meanwhile, so every
+        # queued fan-out takes part in the scheduler's round-robin
+        handler = self.scheduler.deliver
+        if cfg.digest_enabled:
+            self.digest = DigestBuffer(
+                self.scheduler.deliver, window=cfg.digest_window_seconds
+            )
+            handler = self.digest.add
+            self._closers.append(self.digest.flush_all)
+        self.queue = notification_queue
+        await self.queue.start_workers(
+            handler,
+            cfg.notification_queue_workers,
+            max_in_flight=self.scheduler.MAX_BACKLOG,
+        )
+        self._closers.append(self.queue.stop_workers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "instance": self.shard,
+            "processes": self.config.delivery_processes,
+            "backlog": self.scheduler.get_backlog_size(),
+            **self.sender.get_real_time_delivery_stats(),
+        }
+
+
+class BotRole(WorkerRole):
+    name = "bot"
+
+    async def setup(self) -> None:
+        from src.data.database import init_database
+        from src.main import create_bot, setup_dispatcher
+
+        await init_database()
+        self.bot = await create_bot()
+        self.dispatcher = await setup_dispatcher(self.bot)
+        self._closers.append(self.bot.session.close)
+
+    async def serve(self, stop: asyncio.Event) -> None:
+        polling = asyncio.create_task(
+            self.dispatcher.start_polling(self.bot, handle_signals=False)
+        )
+        await stop.wait()
+        await self.dispatcher.stop_polling()
+        await asyncio.gather(polling, return_exceptions=True)
+
+
+ROLES = {role.name: role for role in (IngestRole, ComputeRole, DeliveryRole, BotRole)}
+
+
+async def run_role(
+    name: str,
+    shard: int = 0,
+    config: Optional[BotConfig] = None,
+    stop: Optional[asyncio.Event] = None,
+) -> None:
+    """Run role ``name`` in this process until ``stop`` is set."""
+
+    from src.data.redis_client import close_redis, init_redis
+
+    cfg = config or BotConfig()
+    if name == "compute" and not 0 <= shard < cfg.compute_shards:
+        raise ValueError(f"shard must be in [0, {cfg.compute_shards})")
+    if name == "delivery" and not 0 <= shard < cfg.delivery_processes:
+        raise ValueError(f"instance must be in [0, {cfg.delivery_processes})")
+    stop = stop or asyncio.Event()
+    configure_tracing(cfg.trace_export_path, cfg.trace_otlp_endpoint)
+    await init_redis()
+    role = ROLES[name](cfg, shard)
+    await role.setup()
+    heartbeat = RoleHeartbeat(
+        name,
+        role.instance,
+        interval=cfg.heartbeat_interval_seconds,
+        stats_func=role.stats,
+    )
+    await heartbeat.start()
+    exporter = None
+    if cfg.metrics_port:
+        from src.services.monitoring.metrics_exporter import MetricsExporter
+
+        exporter = MetricsExporter(
+            host=cfg.metrics_host,
+            port=cfg.metrics_port + ROLE_PORT_OFFSETS[name] + shard,
+            health_func=get_cluster_health,
+        )
+        await exporter.start()
+    role.logger.info("worker_role_started", role=name, shard=shard)
+    try:
+        await role.serve(stop)
+    finally:
+        if exporter is not None:
+            await exporter.stop()
+        await heartbeat.stop()
+        await role.teardown()
+        await close_redis()
+        role.logger.info("worker_role_stopped", role=name, shard=shard)
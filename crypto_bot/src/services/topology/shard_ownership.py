@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+"""Symbol ownership across bot replicas.
+
+Replicas register under ``replicas:<id>`` with a TTL lease they keep
+renewing. One of them holds the ``shard_leader`` lease and publishes the
+sorted list of live replicas as ``shard_members``; all replicas build the
+same :class:`HashRing` from that list, so they agree on which replica owns
+which symbol. Before streaming a symbol a replica also takes the
+``symbol_owner:<symbol>`` lease, and it gives up symbols the ring assigns
+elsewhere. During a rebalance a symbol therefore has at most one owner: the
+new owner only gets it once the old one has released it, or once the old
+one's lease has expired because the replica died. A replica that cannot
+renew its leases (Redis outage, partition) forgets them before they can
+expire, so it stops streaming before another replica takes over.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import os
+import socket
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+import orjson
+from redis.asyncio import Redis
+
+from src.data.redis_client import get_redis
+from src.utils.logger import LoggerMixin
+from src.utils.metrics_registry import metrics_registry
+
+MEMBER_PREFIX = "replicas:"
+SYMBOL_PREFIX = "symbol_owner:"
+LEADER_KEY = "shard_leader"
+MEMBERS_KEY = "shard_members"
+
+# take or extend each lease held by ARGV[1]; returns 1/0 per key
+_CLAIM_SCRIPT = """
+local result = {}
+for i, key in ipairs(KEYS) do
+    local owner = redis.call('GET', key)
+    if owner == ARGV[1] then
+        redis.call('PEXPIRE', key, ARGV[2])
+        result[i] = 1
+    elseif not owner then
+        redis.call('SET', key, ARGV[1], 'PX', ARGV[2])
+        result[i] = 1
+    else
+        result[i] = 0
+    end
+end
+return result
+"""
+
+# delete each lease still held by ARGV[1]
+_RELEASE_SCRIPT = """
+local released = 0
+for _, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        redis.call('DEL', key)
+        released = released + 1
+    end
+end
+return released
+"""
+
+ChangeCallback = Callable[[], Awaitable[None]]
+
+
+def _position(value: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), "big"
+    )
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes.
+
+    Adding or removing one of ``n`` members moves only about ``1/n`` of the
+    symbols, so a join or a crash does not reshuffle every subscription.
+    """
+
+    def __init__(self, members: Iterable[str], vnodes: int = 64) -> None:
+        points = sorted(
+            (_position(f"{member}#{i}"), member)
+            for member in set(members)
+            for i in range(vnodes)
+        )
+        self._positions = [position for position, _ in points]
+        self._members = [member for _, member in points]
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._positions:
+            return None
+        index = bisect.bisect(self._positions, _position(key)) % len(self._positions)
+        return self._members[index]
+
+
+class ShardCoordinator(LoggerMixin):
+    """Keep this replica's membership and symbol leases in Redis."""
+
+    def __init__(
+        self,
+        replica_id: Optional[str] = None,
+        *,
+        lease_ttl: float = 15.0,
+        redis: Redis | None = None,
+        vnodes: int = 64,
+    ) -> None:  # noqa: D401 - short
+        super().__init__()
+        self.replica_id = replica_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_ttl_ms = int(lease_ttl * 1000)
+        self.renew_interval = lease_ttl / 3
+        self.vnodes = vnodes
+        self._redis_client = redis
+        self._members: List[str] = []
+        self._ring = HashRing([], vnodes)
+        self._owned: Set[str] = set()
+        self._leader = False
+        self._contested: Set[str] = set()
+        self._callbacks: List[ChangeCallback] = []
+        self._task: Optional[asyncio.Task[None]] = None
+        self._renewed_at = time.monotonic()
+        metrics_registry.gauge("owned_symbols").set_function(lambda: len(self._owned))
+
+    @property
+    def _redis(self) -> Redis:
+        if self._redis_client is None:
+            self._redis_client = get_redis()
+        return self._redis_client
+
+    @property
+    def members(self) -> List[str]:
+        return list(self._members)
+
+    @property
+    def owned_symbols(self) -> Set[str]:
+        return set(self._owned)
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader
+
+    def on_change(self, callback: ChangeCallback) -> None:
+        """Call ``callback`` whenever the set of replicas changes."""
+
+        self._callbacks.append(callback)
+
+    async def start(self) -> None:
+        if self._task is None:
+            await self.sync()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._release(self._owned)
+        self._owned.clear()
+        pipeline = self._redis.pipeline(transaction=False)
+        pipeline.delete(f"{MEMBER_PREFIX}{self.replica_id}")
+        pipeline.eval(_RELEASE_SCRIPT, 1, LEADER_KEY, self.replica_id)
+        await pipeline.execute()
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "replica": self.replica_id,
+            "leader": self._leader,
+            "members": len(self._members),
+            "owned_symbols": len(self._owned),
+            "contested_symbols": len(self._contested),
+        }
+
+    def owner_of(self, symbol: str) -> Optional[str]:
+        return self._ring.owner(symbol)
+
+    async def claim(self, symbols: Iterable[str]) -> Set[str]:
+        """Return the subset of ``symbols`` this replica may stream now.
+
+        Symbols the ring assigns to this replica are leased (or their
+        leases renewed); previously owned symbols that now belong elsewhere
+        or are no longer requested are released.
+        """
+
+        wanted = sorted(
+            s for s in set(symbols) if self._ring.owner(s) == self.replica_id
+        )
+        granted: Set[str] = set()
+        if wanted:
+            reply = await self._redis.eval(
+                _CLAIM_SCRIPT,
+                len(wanted),
+                *(f"{SYMBOL_PREFIX}{s}" for s in wanted),
+                self.replica_id,
+                self.lease_ttl_ms,
+            )
+            granted = {symbol for symbol, ok in zip(wanted, reply) if int(ok)}
+        await self._release(self._owned - granted)
+        self._owned = granted
+        self._contested = set(wanted) - granted
+        return set(granted)
+
+    async def sync(self) -> bool:
+        """Renew leases and refresh membership; return ``True`` if it changed."""
+
+        attempt = time.monotonic()
+        member_key = f"{MEMBER_PREFIX}{self.replica_id}"
+        await self._redis.set(member_key, self.replica_id, px=self.lease_ttl_ms)
+        reply = await self._redis.eval(
+            _CLAIM_SCRIPT, 1, LEADER_KEY, self.replica_id, self.lease_ttl_ms
+        )
+        self._leader = bool(int(reply[0]))
+        if self._leader:
+            live = sorted(
+                [
+                    self._decode(key)[len(MEMBER_PREFIX) :]
+                    async for key in self._redis.scan_iter(
+                        match=f"{MEMBER_PREFIX}*", count=100
+                    )
+                ]
+            )
+            await self._redis.set(
+                MEMBERS_KEY, orjson.dumps(live), px=self.lease_ttl_ms * 2
+            )
+            members = live
+        else:
+            raw = await self._redis.get(MEMBERS_KEY)
+            members = (
+                orjson.loads(raw)
+                if raw
+                else sorted(set(self._members) | {self.replica_id})
+            )
+        if self._owned:
+            await self.claim(self._owned)  # renew symbol leases
+        self._renewed_at = attempt
+        if members == self._members:
+            return False
+        self.logger.info(
+            "shard_membership_changed",
+            replica=self.replica_id,
+            members=members,
+            leader=self._leader,
+        )
+        self._members = members
+        self._ring = HashRing(members, self.vnodes)
+        return True
+
+    # ------------------------------------------------------------------
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.renew_interval)
+            try:
+                changed = await self.sync()
+            except Exception as exc:  # noqa: BLE001 - leases expire unless synced
+                self.logger.error("shard_sync_failed", error=str(exc))
+                changed = self._drop_expiring_leases()
+                if not changed:
+                    continue
+            # retry contested symbols until the previous owner lets them go
+            if changed or self._contested:
+                for callback in self._callbacks:
+                    try:
+                        await callback()
+                    except Exception as exc:  # noqa: BLE001 - retried next round
+                        self.logger.error("shard_callback_failed", error=str(exc))
+
+    def _drop_expiring_leases(self) -> bool:
+        """Forget leases that expire before the next renewal; ``True`` if any.
+
+        Membership is forgotten too, so :meth:`claim` grants nothing without
+        touching Redis and the next successful :meth:`sync` reports a change.
+        """
+
+        deadline = self._renewed_at + self.lease_ttl_ms / 1000
+        if time.monotonic() + self.renew_interval < deadline or not self._members:
+            return False
+        self.logger.warning(
+            "shard_leases_expired", replica=self.replica_id, symbols=len(self._owned)
+        )
+        self._owned = set()
+        self._contested = set()
+        self._leader = False
+        self._members = []
+        self._ring = HashRing([], self.vnodes)
+        return True
+
+    async def _release(self, symbols: Iterable[str]) -> None:
+        keys: Sequence[str] = [f"{SYMBOL_PREFIX}{s}" for s in symbols]
+        if keys:
+            await self._redis.eval(_RELEASE_SCRIPT, len(keys), *keys, self.replica_id)
+
+    @staticmethod
+    def _decode(value: bytes | str) -> str:
+        return value.decode() if isinstance(value, bytes) else value
@@ -11,6 +11,7 @@ from src.utils.logger import LoggerMixin
 from src.utils.time_helpers import timestamp_to_datetime
 from src.utils.validators import validate_binance_kline_data_detailed
 from src.utils.performance_utils import measure_time
+from src.utils.tracing import tracer
 
 
 class BinanceDataProcessor(LoggerMixin):
@@ -39,7 +40,10 @@ class BinanceDataProcessor(LoggerMixin):
         if not validate_binance_kline_data_detailed(kline):
             return
         candle = self._convert_kline_to_candle(data["s"], kline["i"], kline)
-        await self.candle_cache.add_new_candle(candle["symbol"], candle["timeframe"], candle)
+        with tracer.span("candle_cache"):
+            await self.candle_cache.add_new_candle(
+                candle["symbol"], candle["timeframe"], candle
+            )
         if candle["is_closed"]:
             await self._trigger_real_time_processing(candle)
 
@@ -13,8 +13,15 @@ from websockets import WebSocketClientProtocol
 from src.config.binance_config import BinanceConfig
 from src.utils.logger import LoggerMixin
 from src.utils.time_helpers import get_high_precision_timestamp, get_time_since_ms
+from src.utils.metrics_registry import metrics_registry
+from src.utils.tracing import tracer
 from src.utils.exceptions import WebSocketConnectionError
 
+_MESSAGES = metrics_registry.counter("websocket_messages_total", {"result": "ok"})
+_DECODE_ERRORS = metrics_registry.counter(
+    "websocket_messages_total", {"result": "decode_error"}
+)
+
 
 class ConnectionState(Enum):
     """Possible states of the WebSocket connection."""
@@ -84,9 +91,18 @@ class BinanceWebSocketClient(LoggerMixin):
             data = json.loads(message)
         except json.JSONDecodeError as exc:
             self.logger.error("json_decode_error", error=str(exc))
+            _DECODE_ERRORS.inc()
             return
+        _MESSAGES.inc()
+        payload = data.get("data", data) if isinstance(data, dict) else {}
+        kline = payload.get("k") or {}
+        tracer.start_trace(
+            payload.get("E") or kline.get("T"),
+            stream=data.get("stream") if isinstance(data, dict) else None,
+        )
         if self.message_handler is not None:
-            await self.message_handler(data)
+            with tracer.span("websocket_handle"):
+                await self.message_handler(data)
         elapsed = get_time_since_ms(start)
         self.logger.debug("message_processed", elapsed_ms=elapsed)
 
@@ -119,6 +135,17 @@ class BinanceWebSocketClient(LoggerMixin):
         await self.ws.send(json.dumps(msg))
         self.active_subscriptions.update(streams)
 
+    async def unsubscribe_from_streams(self, streams: List[str]) -> None:
+        """Unsubscribe from Binance streams."""
+
+        if self.state != ConnectionState.CONNECTED or self.ws is None:
+            self.active_subscriptions.difference_update(streams)
+            return
+        self._id_counter += 1
+        msg = {"method": "UNSUBSCRIBE", "params": streams, "id": self._id_counter}
+        await self.ws.send(json.dumps(msg))
+        self.active_subscriptions.difference_update(streams)
+
     async def disconnect(self) -> None:
         if self.ws is not None:
             await self.ws.close()
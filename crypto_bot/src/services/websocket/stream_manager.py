@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from src.config.binance_config import BinanceConfig
 from src.data.repositories.user_pair_repository import UserPairRepository
+from src.services.topology.shard_ownership import ShardCoordinator
 from src.utils.logger import LoggerMixin
 from src.utils.performance_utils import TimingContext
 from .binance_websocket import BinanceWebSocketClient
@@ -47,14 +48,17 @@ class StreamManager(LoggerMixin):
         repository: UserPairRepository,
         config: BinanceConfig,
         data_processor: BinanceDataProcessor,
+        coordinator: ShardCoordinator | None = None,
     ) -> None:
         super().__init__()
         self.sessionmaker = sessionmaker
         self.repository = repository
         self.config = config
         self.data_processor = data_processor
+        self.coordinator = coordinator
         self.websocket: BinanceWebSocketClient | None = None
         self.active_streams: Set[str] = set()
+        self._update_lock = asyncio.Lock()
 
     async def start(self) -> None:
         """Start the WebSocket client and subscription updater."""
@@ -63,6 +67,9 @@ class StreamManager(LoggerMixin):
             self.config, message_handler=self.handle_websocket_message
         )
         await self.websocket.connect()
+        if self.coordinator is not None:
+            await self.coordinator.start()
+            self.coordinator.on_change(self.update_subscriptions)
         asyncio.create_task(self._periodic_subscription_update())
 
     async def _periodic_subscription_update(self) -> None:
@@ -71,30 +78,51 @@ class StreamManager(LoggerMixin):
             await asyncio.sleep(self.config.subscription_update_interval)
 
     async def add_symbol_stream(self, symbol: str, timeframes: Iterable[str]) -> None:
-        streams: List[str] = [get_ticker_stream_name(symbol)]
-        for tf in timeframes:
-            streams.append(get_kline_stream_name(symbol, tf))
-        if self.websocket:
-            await self.websocket.subscribe_to_streams(streams)
-        self.active_streams.update(streams)
+        async with self._update_lock:
+            if self.coordinator is not None:
+                # the lease, not only the ring, decides: the previous owner
+                # may still be streaming the symbol
+                owned = await self.coordinator.claim(
+                    self.coordinator.owned_symbols | {symbol}
+                )
+                if symbol not in owned:
+                    return  # streamed by the replica owning the symbol
+            streams: List[str] = [get_ticker_stream_name(symbol)]
+            for tf in timeframes:
+                streams.append(get_kline_stream_name(symbol, tf))
+            if self.websocket:
+                await self.websocket.subscribe_to_streams(streams)
+            self.active_streams.update(streams)
 
     async def update_subscriptions(self) -> None:
-        """Refresh subscriptions based on active pairs in DB."""
-
-        async with self.sessionmaker() as session:
-            symbols = await self.repository.get_active_symbols(session)
-        required_streams: Set[str] = set()
-        for symbol in symbols:
-            required_streams.add(get_ticker_stream_name(symbol))
-            required_streams.add(get_kline_stream_name(symbol, "1m"))
-        new_streams = required_streams - self.active_streams
-        if new_streams and self.websocket:
-            await self.websocket.subscribe_to_streams(list(new_streams))
-        self.active_streams.update(new_streams)
-        removed = self.active_streams - required_streams
-        if removed:
-            # Unsubscribe logic could be added here.
-            self.active_streams -= removed
+        """Refresh subscriptions based on active pairs in DB.
+
+        With a coordinator only the symbols leased by this replica are
+        streamed; streams of symbols handed to another replica are dropped.
+        """
+
+        async with self._update_lock:
+            async with self.sessionmaker() as session:
+                symbols = await self.repository.get_active_symbols(session)
+            if self.coordinator is not None:
+                try:
+                    symbols = await self.coordinator.claim(symbols)
+                except Exception as exc:  # noqa: BLE001 - keep only live leases
+                    self.logger.error("symbol_claim_failed", error=str(exc))
+                    symbols = self.coordinator.owned_symbols
+            required_streams: Set[str] = set()
+            for symbol in symbols:
+                required_streams.add(get_ticker_stream_name(symbol))
+                required_streams.add(get_kline_stream_name(symbol, "1m"))
+            removed = self.active_streams - required_streams
+            if removed:
+                if self.websocket:
+                    await self.websocket.unsubscribe_from_streams(sorted(removed))
+                self.active_streams -= removed
+            new_streams = required_streams - self.active_streams
+            if new_streams and self.websocket:
+                await self.websocket.subscribe_to_streams(sorted(new_streams))
+            self.active_streams.update(new_streams)
         self.logger.debug("subscriptions_updated", new=len(new_streams), removed=len(removed))
 
     async def handle_websocket_message(self, message: dict) -> None:
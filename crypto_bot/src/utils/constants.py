@@ -13,6 +13,9 @@ EMOJI: Dict[str, str] = {
 }
 
 EMA_PERIODS: List[int] = [20, 50, 100, 200]
+# Closed candles used to seed Wilder's RSI, in multiples of the period;
+# after 10 periods the seed is within ~0.01 of a long-history RSI
+RSI_WARMUP_PERIODS = 10
 
 PERFORMANCE_ALERT_THRESHOLDS = {"warning": 1.5, "critical": 2.0}
 
@@ -23,6 +26,13 @@ INDICATOR_CALCULATION_TIMEOUTS = {
     "signal_generation": 200,
     "notification_delivery": 500,
     "total_processing": 1000,
+    "event_loop_lag": 20,
+}
+
+# Operations judged by a tail percentile instead of the mean: a few long
+# event-loop stalls matter even when the average lag is tiny.
+PERFORMANCE_ALERT_PERCENTILES: Dict[str, float] = {
+    "event_loop_lag": 99,
 }
 
 REAL_TIME_CACHE_SIZES = {
@@ -59,7 +69,7 @@ def is_real_time_performance_good(time_ms: int, operation: str) -> bool:
     return target == 0 or time_ms <= target
 
 
-def get_performance_emoji(time_ms: int, target_ms: int) -> str:
+def get_performance_emoji(time_ms: float, target_ms: float) -> str:
     if target_ms == 0:
         return "⏱️"
     ratio = time_ms / target_ms if target_ms else 0
@@ -7,3 +7,9 @@ class WebSocketConnectionError(Exception):
     """Raised when a WebSocket connection cannot be established or is lost."""
 
     pass
+
+
+class DeliveryFailedError(Exception):
+    """Raised when a notification could not be delivered and may be retried."""
+
+    pass
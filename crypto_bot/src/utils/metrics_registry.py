@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+"""Fixed-memory metrics (histograms, counters, gauges) shared across the process.
+
+Values are counted in logarithmic buckets whose width is a fixed fraction
+(``precision``) of their lower bound, the same idea as HDR histograms:
+recording is O(1), memory does not grow with the number of samples and any
+percentile is accurate to within ``precision`` relative error. Snapshots
+are plain immutable copies that can be merged, e.g. across workers.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+@dataclass(frozen=True)
+class HistogramSnapshot:
+    """Immutable view of a histogram at one point in time."""
+
+    min_value: float
+    precision: float
+    counts: Tuple[int, ...]
+    count: int
+    total: float
+    min: float
+    max: float
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Return the ``q``-th percentile (0-100)."""
+
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(max(self._bucket_value(index), self.min), self.max)
+        return self.max
+
+    def merge(self, other: "HistogramSnapshot") -> "HistogramSnapshot":
+        if (self.min_value, self.precision, len(self.counts)) != (
+            other.min_value,
+            other.precision,
+            len(other.counts),
+        ):
+            raise ValueError("Cannot merge histograms with different layouts")
+        if not other.count:
+            return self
+        if not self.count:
+            return other
+        return HistogramSnapshot(
+            self.min_value,
+            self.precision,
+            tuple(a + b for a, b in zip(self.counts, other.counts)),
+            self.count + other.count,
+            self.total + other.total,
+            min(self.min, other.min),
+            max(self.max, other.max),
+        )
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "avg_ms": self.mean,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max,
+        }
+
+    def _bucket_value(self, index: int) -> float:
+        if index == 0:
+            return self.min_value
+        # geometric middle of [lower, upper) keeps the error symmetric
+        return self.min_value * (1 + self.precision) ** (index - 0.5)
+
+
+class Histogram:
+    """Log-bucketed histogram with O(1) record and fixed memory."""
+
+    def __init__(
+        self,
+        min_value: float = 0.001,
+        max_value: float = 3_600_000.0,
+        precision: float = 0.01,
+    ) -> None:
+        self.min_value = min_value
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self._buckets = int(math.log(max_value / min_value) / self._log_base) + 2
+        self._counts: List[int] = [0] * self._buckets
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        if value < self.min_value:
+            index = 0
+        else:
+            index = min(
+                int(math.log(value / self.min_value) / self._log_base) + 1,
+                self._buckets - 1,
+            )
+        self._counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self) -> HistogramSnapshot:
+        return HistogramSnapshot(
+            self.min_value,
+            self.precision,
+            tuple(self._counts),
+            self.count,
+            self.total,
+            self.min if self.count else 0.0,
+            self.max,
+        )
+
+    def percentile(self, q: float) -> float:
+        return self.snapshot().percentile(q)
+
+    def reset(self) -> None:
+        self._counts = [0] * self._buckets
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+
+class Counter:
+    """Monotonically increasing count."""
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Gauge:
+    """Point-in-time value, either set directly or read from a callback."""
+
+    def __init__(self) -> None:
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        if self._function is not None:
+            return float(self._function())
+        return self._value
+
+
+def _label_key(labels: Optional[Mapping[str, str]]) -> LabelKey:
+    return tuple(sorted((labels or {}).items()))
+
+
+class MetricsRegistry:
+    """Process-wide registry of named, optionally labelled metrics."""
+
+    def __init__(self) -> None:  # noqa: D401 - short
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, Counter]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, Gauge]] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def help_for(self, name: str) -> Optional[str]:
+        return self._help.get(name)
+
+    def counter(self, name: str, labels: Optional[Mapping[str, str]] = None) -> Counter:
+        series = self._counters.setdefault(name, {})
+        key = _label_key(labels)
+        counter = series.get(key)
+        if counter is None:
+            counter = series[key] = Counter()
+        return counter
+
+    def gauge(self, name: str, labels: Optional[Mapping[str, str]] = None) -> Gauge:
+        series = self._gauges.setdefault(name, {})
+        key = _label_key(labels)
+        gauge = series.get(key)
+        if gauge is None:
+            gauge = series[key] = Gauge()
+        return gauge
+
+    def counters(self) -> Iterable[Tuple[str, LabelKey, Counter]]:
+        for name, series in self._counters.items():
+            for key, counter in series.items():
+                yield name, key, counter
+
+    def gauges(self) -> Iterable[Tuple[str, LabelKey, Gauge]]:
+        for name, series in self._gauges.items():
+            for key, gauge in series.items():
+                yield name, key, gauge
+
+    def histogram(
+        self, name: str, labels: Optional[Mapping[str, str]] = None
+    ) -> Histogram:
+        series = self._histograms.setdefault(name, {})
+        key = _label_key(labels)
+        hist = series.get(key)
+        if hist is None:
+            hist = series[key] = Histogram()
+        return hist
+
+    def histograms(self) -> Iterable[Tuple[str, LabelKey, Histogram]]:
+        for name, series in self._histograms.items():
+            for key, hist in series.items():
+                yield name, key, hist
+
+    def snapshot(self) -> Dict[str, Dict[LabelKey, HistogramSnapshot]]:
+        return {
+            name: {key: hist.snapshot() for key, hist in series.items()}
+            for name, series in self._histograms.items()
+        }
+
+    def reset(self) -> None:
+        for _, _, hist in self.histograms():
+            hist.reset()
+        for _, _, counter in self.counters():
+            counter.value = 0.0
+
+
+metrics_registry = MetricsRegistry()
@@ -1,59 +1,83 @@
 from __future__ import annotations
 
-"""Performance measurement helpers."""
+"""Performance measurement helpers.
+
+Timings are taken with :func:`time.perf_counter_ns`, kept as integer
+nanoseconds internally and reported as float milliseconds, so sub-millisecond
+operations no longer collapse to ``0``. The decorators below sit on hot paths;
+their added cost per call is checked against
+``DECORATOR_OVERHEAD_BUDGET_NS`` by ``src.benchmarks.timing_overhead``.
+"""
 
 from typing import Any, Callable, Dict, List, TypeVar
 import asyncio
+from time import perf_counter_ns
 
 import structlog
 
-from .time_helpers import get_high_precision_timestamp, get_time_since_ms
+from .metrics_registry import Histogram, metrics_registry
 
 T = TypeVar("T")
 
+# Upper bound for the time a timing decorator may add to one call.
+DECORATOR_OVERHEAD_BUDGET_NS = 2_000
+
+_NS_PER_MS = 1_000_000
+
 
 class TimingContext:
     """Context manager measuring execution time in milliseconds."""
 
-    def __init__(self, operation: str, target_ms: int | None = None) -> None:
+    def __init__(self, operation: str = "", target_ms: float | None = None) -> None:
         self.operation = operation
         self.target_ms = target_ms
+        self.elapsed_ns = 0
+        self.elapsed_ms = 0.0
 
     def __enter__(self) -> "TimingContext":
-        self.start = get_high_precision_timestamp()
-        self.elapsed_ms = 0
+        self.start = perf_counter_ns()
         return self
 
     def __exit__(self, *exc: Any) -> None:  # noqa: D401 - short
-        self.elapsed_ms = get_time_since_ms(self.start)
+        self.elapsed_ns = perf_counter_ns() - self.start
+        self.elapsed_ms = self.elapsed_ns / _NS_PER_MS
         self.is_within_target = (
             self.target_ms is None or self.elapsed_ms <= self.target_ms
         )
 
 
-def measure_time(target_ms: int | None = None) -> Callable[[Callable[..., T]], Callable[..., T]]:
+def measure_time(
+    target_ms: float | None = None,
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
     """Decorator that measures function execution time.
 
-    The elapsed time in milliseconds is stored on the returned function as
-    ``last_elapsed_ms``.  ``target_ms`` is kept for potential external checks.
+    The elapsed time is stored on the returned function as ``last_elapsed_ns``
+    and ``last_elapsed_ms`` (float).  ``target_ms`` is kept for potential
+    external checks.
     """
 
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         if asyncio.iscoroutinefunction(func):
 
             async def async_wrapper(*args: Any, **kwargs: Any) -> T:
-                start = get_high_precision_timestamp()
+                start = perf_counter_ns()
                 result = await func(*args, **kwargs)
-                async_wrapper.last_elapsed_ms = get_time_since_ms(start)  # type: ignore[attr-defined]
+                elapsed = perf_counter_ns() - start
+                async_wrapper.last_elapsed_ns = elapsed  # type: ignore[attr-defined]
+                elapsed_ms = elapsed / _NS_PER_MS
+                async_wrapper.last_elapsed_ms = elapsed_ms  # type: ignore[attr-defined]
                 return result
 
             async_wrapper.target_ms = target_ms  # type: ignore[attr-defined]
             return async_wrapper  # type: ignore[return-value]
 
         def sync_wrapper(*args: Any, **kwargs: Any) -> T:
-            start = get_high_precision_timestamp()
+            start = perf_counter_ns()
             result = func(*args, **kwargs)
-            sync_wrapper.last_elapsed_ms = get_time_since_ms(start)  # type: ignore[attr-defined]
+            elapsed = perf_counter_ns() - start
+            sync_wrapper.last_elapsed_ns = elapsed  # type: ignore[attr-defined]
+            elapsed_ms = elapsed / _NS_PER_MS
+            sync_wrapper.last_elapsed_ms = elapsed_ms  # type: ignore[attr-defined]
             return result
 
         sync_wrapper.target_ms = target_ms  # type: ignore[attr-defined]
@@ -62,30 +86,41 @@ def measure_time(target_ms: int | None = None) -> Callable[[Callable[..., T]], C
     return decorator
 
 
-def log_slow_operations(target_ms: int) -> Callable[[Callable[..., T]], Callable[..., T]]:
+def log_slow_operations(
+    target_ms: float,
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
     """Decorator logging when execution time exceeds ``target_ms``."""
 
     logger = structlog.get_logger("performance")
+    target_ns = target_ms * _NS_PER_MS
 
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         if asyncio.iscoroutinefunction(func):
 
             async def async_wrapper(*args: Any, **kwargs: Any) -> T:
-                start = get_high_precision_timestamp()
+                start = perf_counter_ns()
                 result = await func(*args, **kwargs)
-                elapsed = get_time_since_ms(start)
-                if elapsed > target_ms:
-                    logger.warning("slow_operation", function=func.__name__, time_ms=elapsed)
+                elapsed = perf_counter_ns() - start
+                if elapsed > target_ns:
+                    logger.warning(
+                        "slow_operation",
+                        function=func.__name__,
+                        time_ms=elapsed / _NS_PER_MS,
+                    )
                 return result
 
             return async_wrapper  # type: ignore[return-value]
 
         def sync_wrapper(*args: Any, **kwargs: Any) -> T:
-            start = get_high_precision_timestamp()
+            start = perf_counter_ns()
             result = func(*args, **kwargs)
-            elapsed = get_time_since_ms(start)
-            if elapsed > target_ms:
-                logger.warning("slow_operation", function=func.__name__, time_ms=elapsed)
+            elapsed = perf_counter_ns() - start
+            if elapsed > target_ns:
+                logger.warning(
+                    "slow_operation",
+                    function=func.__name__,
+                    time_ms=elapsed / _NS_PER_MS,
+                )
             return result
 
         return sync_wrapper
@@ -93,29 +128,38 @@ def log_slow_operations(target_ms: int) -> Callable[[Callable[..., T]], Callable
     return decorator
 
 
-_MONITOR_DATA: Dict[str, List[int]] = {}
+_MONITOR_DATA: Dict[str, Histogram] = {}
+
+
+def _monitor_histogram(operation: str) -> Histogram:
+    hist = _MONITOR_DATA.get(operation)
+    if hist is None:
+        hist = _MONITOR_DATA[operation] = metrics_registry.histogram(
+            "monitored_operation_ms", {"operation": operation}
+        )
+    return hist
 
 
 def monitor_real_time_performance(operation: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
     """Decorator collecting execution times for ``operation``."""
 
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        record = _monitor_histogram(operation).record
+
         if asyncio.iscoroutinefunction(func):
 
             async def async_wrapper(*args: Any, **kwargs: Any) -> T:
-                start = get_high_precision_timestamp()
+                start = perf_counter_ns()
                 result = await func(*args, **kwargs)
-                elapsed = int(get_time_since_ms(start))
-                _MONITOR_DATA.setdefault(operation, []).append(elapsed)
+                record((perf_counter_ns() - start) / _NS_PER_MS)
                 return result
 
             return async_wrapper  # type: ignore[return-value]
 
         def sync_wrapper(*args: Any, **kwargs: Any) -> T:
-            start = get_high_precision_timestamp()
+            start = perf_counter_ns()
             result = func(*args, **kwargs)
-            elapsed = int(get_time_since_ms(start))
-            _MONITOR_DATA.setdefault(operation, []).append(elapsed)
+            record((perf_counter_ns() - start) / _NS_PER_MS)
             return result
 
         return sync_wrapper
@@ -123,7 +167,9 @@ def monitor_real_time_performance(operation: str) -> Callable[[Callable[..., T]]
     return decorator
 
 
-def create_performance_alert(operation: str, time_ms: int, target_ms: int) -> Dict[str, Any]:
+def create_performance_alert(
+    operation: str, time_ms: float, target_ms: float
+) -> Dict[str, Any]:
     """Return structured alert information."""
 
     return {
@@ -134,7 +180,7 @@ def create_performance_alert(operation: str, time_ms: int, target_ms: int) -> Di
     }
 
 
-def detect_performance_regression(history: List[int], new_time: int) -> bool:
+def detect_performance_regression(history: List[float], new_time: float) -> bool:
     """Check if ``new_time`` is slower than historical average."""
 
     if not history:
@@ -147,9 +193,14 @@ def generate_performance_summary() -> Dict[str, Any]:
     """Return aggregated performance metrics for monitored operations."""
 
     summary: Dict[str, Any] = {}
-    for op, values in _MONITOR_DATA.items():
-        if not values:
+    for op, hist in _MONITOR_DATA.items():
+        if not hist.count:
             continue
-        avg = sum(values) / len(values)
-        summary[op] = {"avg_ms": avg, "max_ms": max(values)}
+        snapshot = hist.snapshot()
+        summary[op] = {
+            "avg_ms": snapshot.mean,
+            "max_ms": snapshot.max,
+            "p95_ms": snapshot.percentile(95),
+            "p99_ms": snapshot.percentile(99),
+        }
     return summary
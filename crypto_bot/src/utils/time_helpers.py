@@ -16,13 +16,19 @@ def get_high_precision_timestamp() -> int:
     return time.perf_counter_ns()
 
 
-def get_time_since_ms(start_ns: int) -> int:
-    """Return milliseconds elapsed since ``start_ns``."""
+def get_time_since_ns(start_ns: int) -> int:
+    """Return nanoseconds elapsed since ``start_ns``."""
 
-    return int((time.perf_counter_ns() - start_ns) / 1_000_000)
+    return time.perf_counter_ns() - start_ns
 
 
-def is_within_time_target(start_ns: int, target_ms: int) -> bool:
+def get_time_since_ms(start_ns: int) -> float:
+    """Return milliseconds (with sub-millisecond precision) since ``start_ns``."""
+
+    return (time.perf_counter_ns() - start_ns) / 1_000_000
+
+
+def is_within_time_target(start_ns: int, target_ms: float) -> bool:
     """Check if the elapsed time since ``start_ns`` is within ``target_ms``."""
 
     return get_time_since_ms(start_ns) <= target_ms
@@ -42,6 +48,28 @@ def timeframe_to_milliseconds(timeframe: str) -> int:
     raise ValueError(f"Unsupported timeframe: {timeframe}")
 
 
+def timeframe_state_ttl(timeframe: str, candles: int = 2, minimum: int = 3600) -> int:
+    """Seconds that per-candle state must outlive to survive ``candles`` closes."""
+
+    try:
+        return max(minimum, candles * timeframe_to_milliseconds(timeframe) // 1000)
+    except ValueError:
+        return minimum
+
+
+def to_timestamp_ms(value: Any) -> int | None:
+    """Return a ``datetime``, ISO string or millisecond number as epoch ms."""
+
+    try:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        if isinstance(value, datetime):
+            return int(value.timestamp() * 1000)
+        return None if value is None else int(value)
+    except (TypeError, ValueError):
+        return None
+
+
 def align_timestamp_to_timeframe(timestamp_ms: int, timeframe: str) -> int:
     """Align ``timestamp_ms`` down to the beginning of the timeframe."""
 
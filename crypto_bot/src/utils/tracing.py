@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+"""Lightweight end-to-end latency tracing for the real-time pipeline.
+
+A trace is started for every WebSocket message and stored in a context
+variable, so tasks spawned while handling the message inherit it. Stages
+wrap their work in :meth:`Tracer.span`; durations go into a bounded
+per-stage histogram and, once the trace is finished, to the configured
+exporters. Stage durations are kept in ``pipeline_stage_ms`` histograms of
+the metrics registry. Latency relative to the exchange event time (Binance ``E``/``T``)
+is recorded with :meth:`Tracer.record_since_event`, which also works after
+the trace crossed a process boundary inside a queued payload.
+"""
+
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Protocol
+
+import orjson
+
+from src.utils.logger import LoggerMixin
+from src.utils.metrics_registry import Histogram, MetricsRegistry, metrics_registry
+
+
+@dataclass
+class Span:
+    name: str
+    offset_ms: float
+    duration_ms: float
+
+
+@dataclass
+class Trace:
+    trace_id: str
+    event_time_ms: Optional[int]
+    received_ms: float
+    received_ns: int
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    spans: List[Span] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class TraceExporter(Protocol):
+    def export(self, trace: Trace) -> None:
+        ...
+
+
+class JsonlTraceExporter:
+    """Append finished traces to a local JSON-lines file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, trace: Trace) -> None:
+        with self.path.open("ab") as fh:
+            fh.write(orjson.dumps(trace.to_dict()) + b"\n")
+
+
+class OTLPTraceExporter:
+    """Forward traces to an OTLP collector (needs ``opentelemetry-sdk``)."""
+
+    def __init__(self, endpoint: str) -> None:
+        try:
+            from opentelemetry import trace as otel_trace
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                OTLPSpanExporter,
+            )
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError(
+                "OTLP export requires opentelemetry-sdk and "
+                "opentelemetry-exporter-otlp-proto-http"
+            ) from exc
+        provider = TracerProvider()
+        provider.add_span_processor(
+            BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint))
+        )
+        self._tracer = provider.get_tracer("crypto_bot")
+        self._set_span_in_context = otel_trace.set_span_in_context
+
+    def export(self, trace: Trace) -> None:  # pragma: no cover - optional dependency
+        base_ns = int(trace.received_ms * 1_000_000)
+        root = self._tracer.start_span(
+            "pipeline", start_time=base_ns, attributes=trace.attributes
+        )
+        ctx = self._set_span_in_context(root)
+        end_ns = base_ns
+        for span in trace.spans:
+            start_ns = base_ns + int(span.offset_ms * 1_000_000)
+            stop_ns = start_ns + int(span.duration_ms * 1_000_000)
+            child = self._tracer.start_span(span.name, context=ctx, start_time=start_ns)
+            child.end(end_time=stop_ns)
+            end_ns = max(end_ns, stop_ns)
+        root.end(end_time=end_ns)
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+class Tracer(LoggerMixin):
+    """Collect per-stage latency samples and export finished traces."""
+
+    def __init__(
+        self, registry: MetricsRegistry = metrics_registry
+    ) -> None:  # noqa: D401 - short
+        super().__init__()
+        self._registry = registry
+        self._stages: Dict[str, Histogram] = {}
+        self._exporters: List[TraceExporter] = []
+
+    def add_exporter(self, exporter: TraceExporter) -> None:
+        self._exporters.append(exporter)
+
+    def clear_exporters(self) -> None:
+        self._exporters.clear()
+
+    def start_trace(
+        self, event_time_ms: Optional[int] = None, **attributes: Any
+    ) -> Trace:
+        """Start a trace for the current context and return it."""
+
+        trace = Trace(
+            trace_id=uuid.uuid4().hex[:16],
+            event_time_ms=event_time_ms,
+            received_ms=time.time() * 1000,
+            received_ns=time.perf_counter_ns(),
+            attributes=attributes,
+        )
+        _current_trace.set(trace)
+        if event_time_ms is not None:
+            self.record("exchange_to_receive", trace.received_ms - event_time_ms)
+        return trace
+
+    @staticmethod
+    def current() -> Optional[Trace]:
+        return _current_trace.get()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as stage ``name``."""
+
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            duration_ms = (end - start) / 1_000_000
+            self.record(name, duration_ms)
+            trace = _current_trace.get()
+            if trace is not None:
+                trace.spans.append(
+                    Span(name, (start - trace.received_ns) / 1_000_000, duration_ms)
+                )
+
+    def record(self, stage: str, duration_ms: float) -> None:
+        hist = self._stages.get(stage)
+        if hist is None:
+            hist = self._stages[stage] = self._registry.histogram(
+                "pipeline_stage_ms", {"stage": stage}
+            )
+        hist.record(duration_ms)
+
+    def record_since_event(self, stage: str, event_time_ms: Optional[float]) -> None:
+        """Record wall-clock time elapsed since the exchange event."""
+
+        if event_time_ms is not None:
+            self.record(stage, time.time() * 1000 - event_time_ms)
+
+    def finish(self, trace: Optional[Trace] = None) -> None:
+        """Record total time of ``trace`` and hand it to the exporters."""
+
+        trace = trace or _current_trace.get()
+        if trace is None:
+            return
+        self.record(
+            "pipeline_total", (time.perf_counter_ns() - trace.received_ns) / 1_000_000
+        )
+        for exporter in self._exporters:
+            try:
+                exporter.export(trace)
+            except Exception as exc:  # noqa: BLE001 - never break the pipeline
+                self.logger.warning("trace_export_failed", error=str(exc))
+
+    def get_stage_stats(self) -> Dict[str, Dict[str, float]]:
+        stats: Dict[str, Dict[str, float]] = {}
+        for stage, hist in self._stages.items():
+            if hist.count:
+                stats[stage] = hist.snapshot().summary()
+        return stats
+
+    def reset(self) -> None:
+        for hist in self._stages.values():
+            hist.reset()
+
+
+def configure_tracing(
+    jsonl_path: Optional[str] = None, otlp_endpoint: Optional[str] = None
+) -> None:
+    """Attach exporters to the global tracer from configuration values."""
+
+    tracer.clear_exporters()
+    if jsonl_path:
+        tracer.add_exporter(JsonlTraceExporter(jsonl_path))
+    if otlp_endpoint:
+        tracer.add_exporter(OTLPTraceExporter(otlp_endpoint))
+
+
+tracer = Tracer()
@@ -0,0 +1,40 @@
+"""Run one role of the multi-process deployment.
+
+Usage::
+
+    python -m src.worker ingest
+    python -m src.worker compute --shard 0       # one process per shard,
+    python -m src.worker compute --shard 1       # COMPUTE_SHARDS in total
+    python -m src.worker delivery --instance 0   # one process per index,
+    python -m src.worker delivery --instance 1   # DELIVERY_PROCESSES in total
+    python -m src.worker bot
+"""
+
+import argparse
+import asyncio
+import signal
+
+from src.services.topology.roles import ROLES, run_role
+
+
+async def main(role: str, shard: int) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    await run_role(role, shard, stop=stop)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("role", choices=sorted(ROLES))
+    parser.add_argument(
+        "--shard",
+        "--instance",
+        dest="shard",
+        type=int,
+        default=0,
+        help="compute shard or delivery process index",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.role, args.shard))
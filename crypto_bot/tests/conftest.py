@@ -10,7 +10,9 @@ sys.path.insert(
 
 from unittest.mock import AsyncMock
 
+import fakeredis
 import pytest
+import pytest_asyncio
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -60,6 +62,14 @@ def mock_redis():
     return redis_mock
 
 
+@pytest_asyncio.fixture
+async def redis():
+    """Yield an in-memory Redis for stream, lease and heartbeat tests."""
+    client = fakeredis.FakeAsyncRedis()
+    yield client
+    await client.aclose()
+
+
 @pytest.fixture
 def mock_binance_api():
     """Return mocked Binance API client."""
@@ -43,5 +43,69 @@ def get_test_rsi_prices() -> List[float]:
 
 
 def get_expected_rsi_result() -> float:
-    """Expected RSI value for the sample prices."""
-    return 73.04
+    """Expected Wilder RSI(14) for the sample prices."""
+    return 73.19
+
+
+def get_wilder_reference_closes() -> List[float]:
+    """Closes of the classic published Wilder RSI(14) worked example."""
+    return [
+        44.34,
+        44.09,
+        44.15,
+        43.61,
+        44.33,
+        44.83,
+        45.10,
+        45.42,
+        45.84,
+        46.08,
+        45.89,
+        46.03,
+        45.61,
+        46.28,
+        46.28,
+        46.00,
+        46.03,
+        46.41,
+        46.22,
+        45.64,
+        46.21,
+        46.25,
+        45.71,
+        46.45,
+        45.78,
+        45.35,
+        44.03,
+        44.18,
+        44.22,
+        44.57,
+        43.42,
+        42.66,
+        43.13,
+    ]
+
+
+def get_wilder_reference_rsi() -> List[float]:
+    """Published RSI(14) from the 15th close on, rounded as published."""
+    return [
+        70.53,
+        66.32,
+        66.55,
+        69.41,
+        66.36,
+        57.97,
+        62.93,
+        63.26,
+        56.06,
+        62.38,
+        54.71,
+        50.42,
+        39.99,
+        41.46,
+        41.87,
+        45.46,
+        37.30,
+        33.08,
+        37.77,
+    ]
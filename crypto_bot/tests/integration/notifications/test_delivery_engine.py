@@ -0,0 +1,77 @@
+import pytest
+import pytest_asyncio
+from aiohttp.test_utils import TestServer
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+
+from src.benchmarks.fake_bot_api import FakeBotAPI
+from src.services.notifications.telegram_sender import TelegramSender
+
+
+async def _make_sender(api: FakeBotAPI, **kwargs):
+    server = TestServer(api.make_app())
+    await server.start_server()
+    session = AiohttpSession(
+        api=TelegramAPIServer.from_base(str(server.make_url("")).rstrip("/"))
+    )
+    bot = Bot("123456:ABC", session=session)
+    return server, bot, TelegramSender(bot, **kwargs)
+
+
+class TestDeliveryEngine:
+    @pytest_asyncio.fixture
+    async def setup(self):
+        resources = []
+
+        async def factory(api: FakeBotAPI, **kwargs):
+            server, bot, sender = await _make_sender(api, **kwargs)
+            resources.append((server, bot, sender))
+            return sender
+
+        yield factory
+        for server, bot, sender in resources:
+            await sender.close()
+            await bot.session.close()
+            await server.close()
+
+    @pytest.mark.asyncio
+    async def test_bulk_delivery_respects_limits(self, setup):
+        api = FakeBotAPI(global_rate=30)
+        sender = await setup(api, global_rate=28, per_chat_rate=0.9, workers=8)
+        notes = [{"user_id": i, "message": f"msg {i}"} for i in range(40)]
+        notes += [{"user_id": 1, "message": "second"}]
+
+        results = await sender.send_bulk_real_time_notifications(notes)
+
+        assert all(r.success for r in results)
+        assert len(api.messages) == 41
+        assert api.rejected_429 == 0
+        stats = sender.get_real_time_delivery_stats()
+        assert stats["sent"] == 41
+        assert stats["p99_latency_ms"] >= stats["p50_latency_ms"]
+
+    @pytest.mark.asyncio
+    async def test_retry_after_is_honoured(self, setup):
+        api = FakeBotAPI(global_rate=5)
+        sender = await setup(api, global_rate=50, per_chat_rate=10, workers=8)
+        notes = [{"user_id": i, "message": "hi"} for i in range(8)]
+
+        results = await sender.send_bulk_real_time_notifications(notes)
+
+        assert all(r.success for r in results)
+        assert api.rejected_429 > 0
+        assert any(r.attempts > 1 for r in results)
+
+    @pytest.mark.asyncio
+    async def test_blocked_user_is_not_retried(self, setup):
+        api = FakeBotAPI(blocked_chats={7})
+        sender = await setup(api)
+
+        results = await sender.send_bulk_real_time_notifications(
+            [{"user_id": 7, "message": "hi"}, {"user_id": 8, "message": "hi"}]
+        )
+
+        assert [r.success for r in results] == [False, True]
+        assert results[0].attempts == 1
+        assert "blocked" in results[0].error
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from src.benchmarks.fanout_scale import (
+    hottest_pairs,
+    run_scenario,
+    synthetic_subscriptions,
+)
+
+pytestmark = pytest.mark.performance
+
+
+def test_subscriptions_follow_popularity():
+    symbols, users, links = synthetic_subscriptions(2_000, 20)
+
+    assert len(users) == 2_000
+    assert {row["language_code"] for row in users} <= {"en", "ru", "de"}
+    per_pair = [sum(1 for row in links if row["pair_id"] == i + 1) for i in range(20)]
+    assert per_pair[0] > per_pair[5] > per_pair[19]
+    hot = hottest_pairs(symbols, links, 3)
+    assert hot[0][0][0] == symbols[0]
+    assert hot[0][1] >= hot[1][1] >= hot[2][1]
+
+
+@pytest.mark.asyncio
+async def test_fanout_delivers_every_notification():
+    pytest.importorskip("aiosqlite")
+    report = await run_scenario(
+        300, pairs=10, signal_pairs=2, steps=5, telegram_rate=5_000
+    )
+
+    # every update after the first crosses a threshold on an uncritical level
+    assert report["notifications"] > 0
+    assert report["delivered"] == report["notifications"]
+    assert report["undelivered"] == 0
+    assert report["telegram_429"] == 0
+    assert report["time_to_deliver_ms"]
+    assert all(s["count"] > 0 for s in report["time_to_deliver_ms"].values())
+    assert report["redis"]["ops_per_delivered"] > 0
+    assert report["database"]["statements"] > 0
+    json.dumps(report)
@@ -0,0 +1,41 @@
+import pytest
+
+from src.benchmarks.hot_paths import CASES, compare_reports, run_suite
+
+pytestmark = pytest.mark.performance
+
+
+@pytest.mark.asyncio
+async def test_every_case_runs_at_small_scales():
+    report = await run_suite(scales=(1, 3), repeats=1)
+
+    assert set(report["results"]) == set(CASES)
+    for scales in report["results"].values():
+        assert set(scales) == {"1", "3"}
+        for stats in scales.values():
+            assert 0 < stats["best_us_per_op"] <= stats["us_per_op"]
+
+
+def test_compare_reports_applies_threshold_and_noise_floor():
+    baseline = {
+        "results": {
+            "rsi_real_time": {"100": {"us_per_op": 200.0}},
+            "rsi_incremental": {"100": {"us_per_op": 1.0}},
+            "message_render": {"100": {"us_per_op": 8.0}},
+        }
+    }
+    report = {
+        "results": {
+            "rsi_real_time": {
+                "100": {"us_per_op": 260.0},
+                "1000": {"us_per_op": 900.0},
+            },
+            "rsi_incremental": {"100": {"us_per_op": 1.4}},
+            "message_render": {"100": {"us_per_op": 9.0}},
+        }
+    }
+
+    regressions = compare_reports(report, baseline, threshold=0.25)
+
+    # +40% on a 1 us case is below the noise floor; scale 1000 has no baseline
+    assert [(r["case"], r["scale"]) for r in regressions] == [("rsi_real_time", 100)]
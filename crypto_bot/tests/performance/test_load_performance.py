@@ -1,31 +1,73 @@
-import asyncio
+import json
 
 import pytest
-from src.services.indicators.rsi_calculator import RSICalculator
-from src.utils.time_helpers import get_high_precision_timestamp
 
-pytestmark = pytest.mark.skip(reason="performance tests are disabled")
+from src.benchmarks.pipeline_replay import (
+    compare_reports,
+    load_recording,
+    replay,
+    synthetic_stream,
+)
+
+pytestmark = pytest.mark.performance
 
 
 @pytest.mark.asyncio
-async def test_concurrent_rsi_calculations():
-    rsi_calculator = RSICalculator(None, None)  # type: ignore[arg-type]
-    symbols = ["BTCUSDT", "ETHUSDT", "ADAUSDT", "DOTUSDT", "LINKUSDT"] * 20
-    tasks = [
-        rsi_calculator.calculate_real_time_rsi(symbol, "1m", 45000.0, 14)
-        for symbol in symbols
-    ]
-    start = get_high_precision_timestamp()
-    results = await asyncio.gather(*tasks)
-    end = get_high_precision_timestamp()
-    total = end - start
-    assert total < 5000
-    assert all(r[0] is not None for r in results)
-    times = [r[1] for r in results]
-    avg = sum(times) / len(times)
-    assert avg < 100
+async def test_replay_through_full_pipeline():
+    pytest.importorskip("aiosqlite")
+    messages = synthetic_stream(3, 30, updates_per_candle=2)
+    report = await replay(messages, users_per_pair=2)
+
+    assert report["messages"] == 180
+    assert report["closed_candles"] == 90
+    assert report["candles_failed"] == {}
+    assert report["notifications_queued"] == report["signals"]
+    assert report["throughput"]["messages_per_s"] > 0
+    for stage in ("websocket_handle", "candle_cache", "indicators", "pipeline_total"):
+        assert report["stages"][stage]["count"] > 0
+    assert report["stages"]["pipeline_total"]["count"] == 90
+    redis_report = report["redis"]
+    round_trips = redis_report["round_trips_per_message"]
+    assert redis_report["ops_per_message"] >= round_trips > 0
+    json.dumps(report)
 
 
 @pytest.mark.asyncio
-async def test_end_to_end_performance():
-    assert True
+async def test_replay_paces_by_event_time():
+    pytest.importorskip("aiosqlite")
+    # two one-minute candles at 600x: the second closes ~100 ms after the first
+    messages = synthetic_stream(1, 2, updates_per_candle=1)
+    report = await replay(messages, speed=600)
+
+    assert report["throughput"]["wall_ms"] >= 90
+    assert report["closed_candles"] == 2
+
+
+def test_load_recording_reads_raw_frames(tmp_path):
+    messages = synthetic_stream(2, 2)
+    path = tmp_path / "klines.jsonl"
+    path.write_text("\n".join(raw for _, raw in messages) + "\n\n")
+
+    assert load_recording(path) == messages
+
+
+def test_compare_reports_flags_only_real_regressions():
+    baseline = {
+        "throughput": {"messages_per_s": 1000.0},
+        "redis": {"ops_per_message": 5.0},
+        "memory": {"growth_after_warmup_mb": 1.0},
+        "stages": {"indicators": {"p50_ms": 2.0, "p99_ms": 10.0}},
+    }
+    report = {
+        "throughput": {"messages_per_s": 850.0},
+        "redis": {"ops_per_message": 5.2},
+        "memory": {"growth_after_warmup_mb": 3.0},
+        "stages": {"indicators": {"p50_ms": 2.3, "p99_ms": 14.0}},
+    }
+
+    regressions = {
+        r["metric"] for r in compare_reports(report, baseline, threshold=0.1)
+    }
+
+    # memory and p50 moved by less than their noise floors
+    assert regressions == {"throughput.messages_per_s", "stages.indicators.p99_ms"}
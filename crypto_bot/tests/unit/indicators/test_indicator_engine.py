@@ -0,0 +1,358 @@
+import random
+
+import fakeredis
+import pandas as pd
+import pytest
+
+from src.benchmarks.common import RedisOpCounter
+from src.services.cache.candle_cache import CandleCache
+from src.services.cache.indicator_cache import IndicatorCache
+from src.services.indicators.incremental import (
+    INDICATORS,
+    EMAIndicator,
+    create_indicator,
+    resolve_graph,
+)
+from src.services.indicators.indicator_engine import (
+    IndicatorEngine,
+    collect_indicator_specs,
+)
+from src.services.indicators.indicator_executor import IndicatorExecutor
+from src.services.indicators.indicator_math import ema_seed, rsi_seed
+
+START_MS = 1_700_006_400_000  # a UTC midnight
+MINUTE_MS = 60_000
+
+
+def _candles(count, seed=3, start_ms=START_MS, step_ms=MINUTE_MS):
+    rnd = random.Random(seed)
+    close = 100.0
+    candles = []
+    for index in range(count):
+        open_ = close
+        close = open_ * (1 + rnd.gauss(0, 0.01))
+        candles.append(
+            {
+                "close_time": start_ms + (index + 1) * step_ms - 1,
+                "open_price": open_,
+                "high_price": max(open_, close) * (1 + rnd.random() * 0.005),
+                "low_price": min(open_, close) * (1 - rnd.random() * 0.005),
+                "close_price": close,
+                "volume": rnd.uniform(10, 100) * (5 if index % 50 == 49 else 1),
+                "is_closed": True,
+            }
+        )
+    return candles
+
+
+def _fold(spec, candles):
+    graph = resolve_graph([create_indicator(spec)])
+    states = {node.key: {} for node in graph}
+    values = {}
+    for candle in candles:
+        values = {}
+        for node in graph:
+            values[node.key] = node.update(states[node.key], candle, values)
+    return values.get(graph[-1].key)
+
+
+class TestIncrementalIndicators:
+    def test_specs_round_trip_to_keys(self):
+        assert create_indicator("macd:12:26:9").key == "macd:12:26:9"
+        assert create_indicator("bollinger:20:2.5").key == "bollinger:20:2.5"
+        assert create_indicator("vwap").key == "vwap"
+        names = {
+            "rsi",
+            "ema",
+            "macd",
+            "bollinger",
+            "atr",
+            "vwap",
+            "volume_spike",
+            "trend",
+        }
+        assert names <= set(INDICATORS)
+        with pytest.raises(ValueError):
+            create_indicator("ichimoku:9")
+
+    def test_matches_batch_references(self):
+        candles = _candles(300)
+        frame = pd.DataFrame(candles)
+        closes = frame["close_price"].tolist()
+
+        assert _fold("rsi:14", candles) == pytest.approx(
+            rsi_seed(closes, 14)["rsi"], abs=1e-9
+        )
+        assert _fold("ema:20", candles) == pytest.approx(
+            ema_seed(closes, 20)["ema"], rel=1e-12
+        )
+
+        fast = [ema_seed(closes[: i + 1], 12) for i in range(len(closes))]
+        slow = [ema_seed(closes[: i + 1], 26) for i in range(len(closes))]
+        macd_line = [f["ema"] - s["ema"] for f, s in zip(fast, slow) if s is not None]
+        macd = _fold("macd:12:26:9", candles)
+        assert macd["macd"] == pytest.approx(macd_line[-1], rel=1e-9)
+        assert macd["signal"] == pytest.approx(ema_seed(macd_line, 9)["ema"], rel=1e-9)
+
+        window = frame["close_price"].tail(20)
+        bands = _fold("bollinger:20:2", candles)
+        assert bands["middle"] == pytest.approx(window.mean(), rel=1e-12)
+        assert bands["upper"] == pytest.approx(
+            window.mean() + 2 * window.std(ddof=0), rel=1e-9
+        )
+
+        previous = frame["close_price"].shift()
+        true_range = pd.concat(
+            [
+                frame["high_price"] - frame["low_price"],
+                (frame["high_price"] - previous).abs(),
+                (frame["low_price"] - previous).abs(),
+            ],
+            axis=1,
+        ).max(axis=1)
+        atr = true_range.iloc[:14].mean()
+        for value in true_range.iloc[14:]:
+            atr = (atr * 13 + value) / 14
+        assert _fold("atr:14", candles) == pytest.approx(atr, rel=1e-9)
+
+        typical = (frame["high_price"] + frame["low_price"] + frame["close_price"]) / 3
+        vwap = (typical * frame["volume"]).sum() / frame["volume"].sum()
+        assert _fold("vwap", candles) == pytest.approx(vwap, rel=1e-12)
+
+        spike = _fold("volume_spike:20", candles[:50])
+        average = frame["volume"].iloc[29:49].mean()
+        assert spike == pytest.approx(
+            (frame["volume"].iloc[49] / average - 1) * 100, rel=1e-9
+        )
+
+    def test_graph_shares_dependencies(self):
+        graph = resolve_graph(
+            create_indicator(spec)
+            for spec in ("macd:12:26:9", "ema:26", "ema_cross:12:26", "trend:20:50:200")
+        )
+        keys = [node.key for node in graph]
+
+        assert len(keys) == len(set(keys))
+        assert keys == [
+            "ema:12",
+            "ema:26",
+            "macd:12:26:9",
+            "ema_cross:12:26",
+            "ema:20",
+            "ema:50",
+            "ema:200",
+            "trend:20:50:200",
+        ]
+
+    def test_crossover_and_trend_nodes(self):
+        falling = [{"close_price": 100.0 - i} for i in range(60)]
+        rising = [{"close_price": 41.0 + 3 * i} for i in range(20)]
+        cross = create_indicator("ema_cross:5:20")
+        graph = resolve_graph([cross])
+        states = {node.key: {} for node in graph}
+        crosses = []
+        for candle in falling + rising:
+            values = {}
+            for node in graph:
+                values[node.key] = node.update(states[node.key], candle, values)
+            if values[cross.key] and values[cross.key]["cross"]:
+                crosses.append(values[cross.key]["cross"])
+
+        assert crosses == ["golden"]
+        assert _fold("trend:5:10:20", falling)["direction"] == -1
+        assert _fold("trend:5:10:20", falling + rising)["direction"] == 1
+
+    def test_vwap_restarts_each_utc_day(self):
+        candles = _candles(30, step_ms=3_600_000)
+        frame = pd.DataFrame(candles[24:])
+        typical = (frame["high_price"] + frame["low_price"] + frame["close_price"]) / 3
+        expected = (typical * frame["volume"]).sum() / frame["volume"].sum()
+        assert _fold("vwap", candles) == pytest.approx(expected, rel=1e-12)
+
+
+class TestIndicatorEngine:
+    SPECS = [
+        "rsi:14",
+        "ema:20",
+        "macd:12:26:9",
+        "bollinger:20:2",
+        "atr:14",
+        "vwap",
+        "volume_spike:20",
+    ]
+
+    async def _engine(self, history):
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        candle_cache = CandleCache(redis, ttl=3_600)
+        for candle in history:
+            await candle_cache.add_new_candle("BTCUSDT", "1m", candle)
+        engine = IndicatorEngine(
+            IndicatorCache(redis),
+            candle_cache,
+            [create_indicator(s) for s in self.SPECS],
+        )
+        return engine, candle_cache, redis
+
+    @pytest.mark.asyncio
+    async def test_one_state_read_and_write_per_candle(self):
+        candles = _candles(400)
+        engine, candle_cache, redis = await self._engine(candles[:300])
+        # cold start: seeded from history that already holds the closing candle
+        seeded = await engine.update("BTCUSDT", "1m", candles[299])
+        counter = RedisOpCounter(redis)
+
+        for candle in candles[300:]:
+            values = await engine.update("BTCUSDT", "1m", candle)
+
+        assert counter.ops == 2 * 100
+        for spec in self.SPECS:
+            # seeded from its declared warm-up, then folded live
+            warmup = create_indicator(spec).warmup("1m")
+            expected = _fold(spec, candles[300 - warmup :])
+            assert values[spec] == pytest.approx(expected, rel=1e-9), spec
+        assert seeded["rsi:14"] == pytest.approx(
+            _fold("rsi:14", candles[159:300]), abs=1e-9
+        )
+
+    @pytest.mark.asyncio
+    async def test_warm_up_in_the_pool_matches_a_lazy_seed(self):
+        candles = _candles(302)
+        lazy, _, _ = await self._engine(candles[:300])
+        seeded = await lazy.update("BTCUSDT", "1m", candles[299])
+        expected = await lazy.update("BTCUSDT", "1m", candles[300])
+
+        engine, _, _ = await self._engine(candles[:300])
+        engine.executor = IndicatorExecutor(max_workers=1, min_offload_prices=0)
+        await engine.executor.start()
+        try:
+            warmed = await engine.warm_up([("BTCUSDT", "1m"), ("ETHUSDT", "1m")])
+        finally:
+            await engine.executor.shutdown()
+        # the stream redelivers the last cached candle: it is not folded twice
+        replay = await engine.update("BTCUSDT", "1m", candles[299])
+        values = await engine.update("BTCUSDT", "1m", candles[300])
+
+        assert warmed == 1  # ETHUSDT has no history to replay
+        assert await engine.warm_up([("BTCUSDT", "1m")]) == 0
+        assert replay == seeded
+        assert values == expected
+
+    @pytest.mark.asyncio
+    async def test_previews_and_replays_do_not_advance_state(self):
+        candles = _candles(200)
+        engine, _, redis = await self._engine(candles[:199])
+        committed = await engine.update("BTCUSDT", "1m", candles[198])
+        counter = RedisOpCounter(redis)
+
+        preview = await engine.update(
+            "BTCUSDT", "1m", {**candles[199], "is_closed": False}
+        )
+        replay = await engine.update("BTCUSDT", "1m", candles[198])
+        closed = await engine.update("BTCUSDT", "1m", candles[199])
+
+        assert counter.ops == 1 + 1 + 2  # the preview and the replay only read
+        assert replay == committed
+        assert preview == closed
+        assert closed != committed
+
+    @pytest.mark.asyncio
+    async def test_missed_close_reseeds_every_state(self):
+        candles = _candles(201)
+        engine, candle_cache, _ = await self._engine(candles[:199])
+        await engine.update("BTCUSDT", "1m", candles[198])
+        # the close of candles[199] is cached but never reaches the engine
+        for candle in candles[199:]:
+            await candle_cache.add_new_candle("BTCUSDT", "1m", candle)
+
+        values = await engine.update("BTCUSDT", "1m", candles[200])
+
+        cold, _, _ = await self._engine(candles)
+        assert values == await cold.update("BTCUSDT", "1m", candles[200])
+        stored = await engine.indicator_cache.get_indicator_state(
+            "engine", "BTCUSDT", "1m"
+        )
+        assert stored["close_time_ms"] == candles[200]["close_time"]
+
+    @pytest.mark.asyncio
+    async def test_new_indicator_is_seeded_and_unused_state_dropped(self):
+        candles = _candles(200)
+        engine, _, _ = await self._engine(candles[:199])
+        await engine.update("BTCUSDT", "1m", candles[198], [create_indicator("rsi:14")])
+
+        values = await engine.update(
+            "BTCUSDT", "1m", candles[199], [create_indicator("ema:20")]
+        )
+
+        # the history ends before this candle, so it is folded after seeding
+        assert values["ema:20"] == pytest.approx(
+            _fold("ema:20", candles[-41:]), rel=1e-12
+        )
+        stored = await engine.indicator_cache.get_indicator_state(
+            "engine", "BTCUSDT", "1m"
+        )
+        assert set(stored["states"]) == {"ema:20"}
+
+    @pytest.mark.asyncio
+    async def test_shared_ema_is_computed_once_per_candle(self, monkeypatch):
+        candles = _candles(200)
+        engine, _, _ = await self._engine(candles[:199])
+        specs = ("macd:12:26:9", "ema:12", "ema:26", "ema_cross:12:26")
+        plan = [create_indicator(s) for s in specs]
+        await engine.update("BTCUSDT", "1m", candles[198], plan)
+        calls = []
+        update = EMAIndicator.update
+
+        def counting(self, state, candle, inputs=None):
+            calls.append(self.key)
+            return update(self, state, candle)
+
+        monkeypatch.setattr(EMAIndicator, "update", counting)
+        values = await engine.update("BTCUSDT", "1m", candles[199], plan)
+
+        assert sorted(calls) == ["ema:12", "ema:26"]
+        assert values["macd:12:26:9"]["macd"] == values["ema:12"] - values["ema:26"]
+        assert values["ema_cross:12:26"]["short"] == values["ema:12"]
+        stored = await engine.indicator_cache.get_indicator_state(
+            "engine", "BTCUSDT", "1m"
+        )
+        assert set(stored["states"]) == {
+            "ema:12",
+            "ema:26",
+            "macd:12:26:9",
+            "ema_cross:12:26",
+        }
+
+    @pytest.mark.asyncio
+    async def test_plans_union_subscriber_settings(self):
+        rows = [
+            (
+                "BTCUSDT",
+                {"1m": True, "1h": True},
+                {"indicators": ["ema:9", "ema_cross:9:21"]},
+            ),
+            (
+                "BTCUSDT",
+                {"1m": True, "1h": False},
+                {"indicators": ["ema:9", "bogus:1"]},
+            ),
+            ("ETHUSDT", {"1m": True}, {}),
+            ("ETHUSDT", {"1m": True}, None),
+        ]
+        specs = collect_indicator_specs(rows)
+        assert specs == {
+            ("BTCUSDT", "1m"): {"ema:9", "ema_cross:9:21", "bogus:1"},
+            ("BTCUSDT", "1h"): {"ema:9", "ema_cross:9:21"},
+        }
+
+        candles = _candles(200)
+        engine, _, _ = await self._engine(candles[:199])
+        engine.set_plans(specs)
+        btc = await engine.update("BTCUSDT", "1m", candles[199])
+        eth = engine.graph_for("ETHUSDT", "1m")
+
+        assert set(btc) == {node.key for node in engine.graph_for("BTCUSDT", "1m")}
+        assert {"ema:9", "ema:21", "ema_cross:9:21", *self.SPECS} <= set(btc)
+        assert "bogus:1" not in btc
+        assert [node.key for node in eth] == [
+            node.key for node in resolve_graph(create_indicator(s) for s in self.SPECS)
+        ]
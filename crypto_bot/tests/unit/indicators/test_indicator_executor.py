@@ -0,0 +1,61 @@
+import random
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.services.indicators.indicator_executor import IndicatorExecutor, IndicatorJob
+from src.services.indicators.rsi_calculator import RSICalculator
+
+
+def _prices(count: int, seed: int) -> list:
+    rnd = random.Random(seed)
+    price, prices = 100.0, []
+    for _ in range(count):
+        price *= 1 + rnd.gauss(0, 0.01)
+        prices.append(price)
+    return prices
+
+
+class TestIndicatorExecutor:
+    @pytest.mark.asyncio
+    async def test_pool_matches_inline(self):
+        jobs = []
+        for seed in range(12):
+            prices = _prices(500, seed)
+            jobs.append(IndicatorJob("rsi", f"P{seed}", "1m", 14, prices))
+            jobs.append(IndicatorJob("ema", f"P{seed}", "1m", 50, prices))
+        jobs.append(IndicatorJob("ema", "SHORT", "1m", 50, [1.0, 2.0]))
+
+        inline = await IndicatorExecutor().run(jobs)
+        executor = IndicatorExecutor(max_workers=2, min_offload_prices=0)
+        await executor.start()
+        try:
+            pooled = await executor.run(jobs)
+        finally:
+            await executor.shutdown()
+
+        assert pooled[-1] is None
+        for expected, actual in zip(inline[:-1], pooled[:-1]):
+            assert actual == pytest.approx(expected)
+
+    @pytest.mark.asyncio
+    async def test_bulk_seed_matches_single_calculation(self):
+        prices = _prices(141, 1)
+        single = RSICalculator(AsyncMock(), AsyncMock())
+        single.candle_cache.get_recent_prices.return_value = prices
+        expected, expected_state = await single.calculate_rsi("BTCUSDT", "1m", 14)
+
+        bulk = RSICalculator(AsyncMock(), AsyncMock())
+        bulk.candle_cache.get_closed_candles.return_value = [
+            {"close_price": price, "close_time": index}
+            for index, price in enumerate(prices)
+        ]
+        values = await bulk.recalculate_many([("BTCUSDT", "1m"), ("ETHUSDT", "1m")], 14)
+
+        assert values[("BTCUSDT", "1m")] == pytest.approx(expected)
+        saved = bulk.indicator_cache.save_calculation_state.await_args_list
+        assert len(saved) == 2
+        state = saved[0].args[4]
+        assert state["avg_gain"] == pytest.approx(expected_state["avg_gain"])
+        assert state["previous_price"] == expected_state["previous_price"]
+        assert state["close_time_ms"] == 140
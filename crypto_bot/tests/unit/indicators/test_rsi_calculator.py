@@ -1,10 +1,29 @@
+import asyncio
+import random
 from unittest.mock import AsyncMock
 
+import fakeredis
 import pytest
 import pytest_asyncio
+from src.services.cache.candle_cache import CandleCache
+from src.services.cache.indicator_cache import IndicatorCache
+from src.services.indicators.indicator_math import rsi_seed, rsi_step
 from src.services.indicators.rsi_calculator import RSICalculator
 from src.utils.performance_utils import TimingContext
-from tests.fixtures.test_data import get_expected_rsi_result, get_test_rsi_prices
+from tests.fixtures.test_data import (
+    get_expected_rsi_result,
+    get_test_rsi_prices,
+    get_wilder_reference_closes,
+    get_wilder_reference_rsi,
+)
+
+
+def _random_walk(count, seed=5):
+    rnd = random.Random(seed)
+    prices = [100.0]
+    for _ in range(count - 1):
+        prices.append(prices[-1] * (1 + rnd.gauss(0, 0.01)))
+    return prices
 
 
 class TestRSICalculator:
@@ -18,6 +37,7 @@ class TestRSICalculator:
     async def test_rsi_calculation_accuracy(self, rsi_calculator):
         """Ensure RSI calculation matches known result."""
         prices = get_test_rsi_prices()
+        rsi_calculator.warmup_periods = 1  # the fixture is a single period
         rsi_calculator.candle_cache.get_recent_prices.return_value = prices
         result, _state = await rsi_calculator.calculate_rsi("BTCUSDT", "1m", period=14)
         expected = get_expected_rsi_result()
@@ -55,3 +75,178 @@ class TestRSICalculator:
         state = {"previous_price": 1e6, "avg_gain": 5.0, "avg_loss": 5.0}
         rsi, _ = rsi_calculator.update_rsi_incremental(state, 1e12, 14)
         assert 0 <= rsi <= 100
+
+    @pytest.mark.asyncio
+    async def test_committed_rsi_ignores_intra_candle_ticks(self):
+        """Only closes advance RSI; it matches the published Wilder values."""
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        candle_cache = CandleCache(redis)
+        # the published series is short: seed from its first period
+        calculator = RSICalculator(
+            IndicatorCache(redis), candle_cache, warmup_periods=1
+        )
+        closes = get_wilder_reference_closes()
+        committed = []
+        previews = []
+        for index, close in enumerate(closes):
+            close_time = 1_700_000_000_000 + index * 60_000
+            # noisy ticks of the open candle, then its close
+            for tick in (close * 1.01, close * 0.98, close):
+                candle = {
+                    "close_price": tick,
+                    "close_time": close_time,
+                    "is_closed": False,
+                }
+                await candle_cache.add_new_candle("BTCUSDT", "1m", candle)
+                rsi, _ = await calculator.calculate_real_time_rsi(
+                    "BTCUSDT", "1m", tick, 14, is_closed=False
+                )
+                previews.append(rsi)
+            candle = {"close_price": close, "close_time": close_time, "is_closed": True}
+            await candle_cache.add_new_candle("BTCUSDT", "1m", candle)
+            rsi, _ = await calculator.calculate_real_time_rsi(
+                "BTCUSDT", "1m", close, 14, is_closed=True, close_time_ms=close_time
+            )
+            if index >= 14:
+                committed.append(rsi)
+                expected = rsi_seed(closes[: index + 1], 14)["rsi"]
+                assert rsi == pytest.approx(expected, abs=1e-9)
+                # a replayed close is not folded in twice
+                again, _ = await calculator.calculate_real_time_rsi(
+                    "BTCUSDT", "1m", close, 14, is_closed=True, close_time_ms=close_time
+                )
+                assert again == rsi
+            else:
+                assert rsi is None
+        for ours, published in zip(committed, get_wilder_reference_rsi(), strict=True):
+            assert abs(ours - published) < 0.1
+        assert all(0 <= value <= 100 for value in previews if value is not None)
+
+    @pytest.mark.asyncio
+    async def test_missed_close_reseeds_from_the_cache(self):
+        """A close more than one candle after the committed one reseeds."""
+        prices = _random_walk(30)
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        candle_cache = CandleCache(redis)
+        calculator = RSICalculator(
+            IndicatorCache(redis), candle_cache, warmup_periods=1
+        )
+        for index, price in enumerate(prices):
+            close_time = 1_700_000_000_000 + index * 60_000
+            candle = {"close_price": price, "close_time": close_time, "is_closed": True}
+            await candle_cache.add_new_candle("BTCUSDT", "1m", candle)
+            if index == 20:
+                continue  # this close never reaches the calculator
+            rsi, _ = await calculator.calculate_real_time_rsi(
+                "BTCUSDT", "1m", price, 14, close_time_ms=close_time
+            )
+            # one Wilder series up to the gap, a fresh seed of 15 after it
+            start = 0 if index < 20 else 21 - 14
+            if index >= 14:
+                expected = rsi_seed(prices[start : index + 1], 14)["rsi"]
+                assert rsi == pytest.approx(expected, abs=1e-9), index
+
+    @pytest.mark.asyncio
+    async def test_preview_does_not_write_state(self, rsi_calculator):
+        state = {
+            "previous_price": 100.0,
+            "avg_gain": 1.0,
+            "avg_loss": 0.5,
+            "period": 14,
+        }
+        rsi_calculator.indicator_cache.get_calculation_state.return_value = dict(state)
+        rsi_calculator._save_rsi_state = AsyncMock()
+
+        preview, _ = await rsi_calculator.calculate_real_time_rsi(
+            "BTCUSDT", "1m", 103.0, 14, is_closed=False
+        )
+
+        rsi_calculator._save_rsi_state.assert_not_awaited()
+        committed, _ = rsi_calculator.update_rsi_incremental(dict(state), 103.0, 14)
+        assert preview == committed
+        assert rsi_calculator.preview_rsi(state, 103.0, 14) == preview
+        assert state["avg_gain"] == 1.0
+
+    def test_vectorized_seed_matches_wilder_recursion(self):
+        prices = _random_walk(3_000)
+        first = rsi_seed(prices[:15], 14)
+        state = {k: first[k] for k in ("avg_gain", "avg_loss", "previous_price")}
+        for price in prices[15:]:
+            rsi, avg_gain, avg_loss = rsi_step(state, price, 14)
+            state = {
+                "avg_gain": avg_gain,
+                "avg_loss": avg_loss,
+                "previous_price": price,
+            }
+
+        seeded = rsi_seed(prices, 14)
+        assert seeded["rsi"] == pytest.approx(rsi, abs=1e-9)
+        assert seeded["avg_gain"] == pytest.approx(state["avg_gain"], rel=1e-9)
+
+    @pytest.mark.asyncio
+    async def test_warmup_seed_converges_to_long_history(self):
+        """A 10x period seed agrees with RSI over the whole history."""
+        prices = _random_walk(2_000)
+        reference = rsi_seed(prices, 14)["rsi"]
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        candle_cache = CandleCache(redis, ttl=3_600)
+        await redis.zadd(
+            candle_cache._key("BTCUSDT", "1h"),
+            {
+                f'{{"close_price": {p}, "close_time": {i}}}': i
+                for i, p in enumerate(prices)
+            },
+        )
+
+        warm = RSICalculator(IndicatorCache(redis), candle_cache)
+        cold = RSICalculator(IndicatorCache(redis), candle_cache, warmup_periods=1)
+        warm_rsi, _ = await warm.calculate_rsi("BTCUSDT", "1h", 14)
+        cold_rsi, _ = await cold.calculate_rsi("BTCUSDT", "1h", 14)
+
+        assert abs(warm_rsi - reference) < 0.01
+        assert abs(cold_rsi - reference) > abs(warm_rsi - reference)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_cold_starts_seed_once(self, rsi_calculator):
+        rsi_calculator.indicator_cache.get_calculation_state.return_value = None
+        rsi_calculator.candle_cache.get_recent_prices.return_value = _random_walk(141)
+
+        results = await asyncio.gather(
+            *(
+                rsi_calculator.calculate_real_time_rsi(
+                    "BTCUSDT", "1m", 48.5, 14, is_closed=False
+                )
+                for _ in range(5)
+            )
+        )
+
+        assert rsi_calculator.candle_cache.get_recent_prices.await_count == 1
+        rsi_calculator.candle_cache.get_recent_prices.assert_awaited_with(
+            "BTCUSDT", "1m", limit=141, closed_only=True
+        )
+        assert len({rsi for rsi, _ in results}) == 1
+
+    @pytest.mark.asyncio
+    async def test_no_rsi_until_the_full_warmup_is_cached(self):
+        """A cold start with a short history stays silent instead of guessing."""
+        prices = _random_walk(141)
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        candle_cache = CandleCache(redis, ttl=3_600)
+        calculator = RSICalculator(IndicatorCache(redis), candle_cache)
+        for index, price in enumerate(prices):
+            candle = {"close_price": price, "close_time": index, "is_closed": True}
+            await candle_cache.add_new_candle("BTCUSDT", "1m", candle)
+            rsi, _ = await calculator.calculate_real_time_rsi(
+                "BTCUSDT", "1m", price, 14, close_time_ms=index
+            )
+            if index < 140:
+                assert rsi is None, index
+                state = await calculator.indicator_cache.get_calculation_state(
+                    "rsi", "BTCUSDT", "1m", 14
+                )
+                assert not state
+
+        assert rsi == pytest.approx(rsi_seed(prices, 14)["rsi"], abs=1e-9)
+        assert await calculator.recalculate_many([("ETHUSDT", "1m")]) == {
+            ("ETHUSDT", "1m"): None
+        }
@@ -0,0 +1,32 @@
+import asyncio
+import time
+
+import pytest
+
+from src.services.monitoring.loop_monitor import LOOP_LAG_OPERATION, EventLoopMonitor
+from src.services.real_time.performance_monitor import PerformanceMonitor
+
+
+async def _blocking_step() -> None:
+    time.sleep(0.15)  # CPU-bound work that never yields
+
+
+class TestEventLoopMonitor:
+    @pytest.mark.asyncio
+    async def test_lag_and_slow_callback_reported(self):
+        performance = PerformanceMonitor()
+        monitor = EventLoopMonitor(performance, interval_ms=10, slow_callback_ms=50)
+        await monitor.start()
+        await asyncio.sleep(0.03)
+        await asyncio.create_task(_blocking_step())
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+
+        stats = monitor.get_stats()
+        assert stats["max_ms"] >= 100
+        assert stats["slow_callbacks"] >= 1
+        assert any(
+            "_blocking_step" in entry["callback"]
+            for entry in stats["recent_slow_callbacks"]
+        )
+        assert LOOP_LAG_OPERATION in performance.alert_on_performance_degradation()
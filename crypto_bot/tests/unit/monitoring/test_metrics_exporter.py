@@ -0,0 +1,43 @@
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.services.monitoring.metrics_collector import MetricsCollector
+from src.services.monitoring.metrics_exporter import MetricsExporter, render_metrics
+from src.utils.metrics_registry import MetricsRegistry
+
+
+class TestMetricsExporter:
+    def test_render_all_metric_types(self):
+        registry = MetricsRegistry()
+        registry.describe("deliveries_total", "Telegram deliveries")
+        registry.counter("deliveries_total", {"outcome": "sent"}).inc(3)
+        registry.gauge("queue_depth").set_function(lambda: 7)
+        hist = registry.histogram("latency_ms", {"stage": "rsi"})
+        for value in (1, 2, 3, 4):
+            hist.record(value)
+
+        text = render_metrics(registry)
+
+        assert "# HELP deliveries_total Telegram deliveries" in text
+        assert "# TYPE deliveries_total counter" in text
+        assert 'deliveries_total{outcome="sent"} 3.0' in text
+        assert "queue_depth 7.0" in text
+        assert "# TYPE latency_ms summary" in text
+        assert 'latency_ms{stage="rsi",quantile="0.99"}' in text
+        assert 'latency_ms_count{stage="rsi"} 4' in text
+
+    @pytest.mark.asyncio
+    async def test_scrape_serves_collected_metrics(self):
+        registry = MetricsRegistry()
+        await MetricsCollector(registry).store_metrics({"cpu_percent": 12.5})
+        client = TestClient(TestServer(MetricsExporter(registry).make_app()))
+        await client.start_server()
+        try:
+            response = await client.get("/metrics")
+            body = await response.text()
+        finally:
+            await client.close()
+
+        assert response.status == 200
+        assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert "system_cpu_percent 12.5" in body
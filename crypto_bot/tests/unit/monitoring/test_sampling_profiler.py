@@ -0,0 +1,54 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from src.services.indicators.indicator_math import rsi_seed
+from src.services.monitoring.sampling_profiler import SamplingProfiler
+
+
+def _busy_rsi(seconds: float) -> None:
+    # long seeds keep nearly every sample inside one src frame, rather
+    # than in this loop
+    prices = [100.0 + (i % 17) * 0.5 - (i % 5) * 0.3 for i in range(20_000)]
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        rsi_seed(prices, 14)
+
+
+class TestSamplingProfiler:
+    def test_samples_are_attributed_and_dumped(self, tmp_path):
+        profiler = SamplingProfiler(interval_ms=1, output_dir=str(tmp_path))
+        assert profiler.start(duration=5)
+        assert not profiler.start(duration=5)
+        _busy_rsi(0.3)
+        result = profiler.stop()
+
+        assert result is not None and result.samples > 10
+        assert result.top_components(1)[0][0] == "rsi_seed"
+        assert sum(result.components.values()) == pytest.approx(100)
+
+        with open(result.collapsed_path) as fh:
+            first = fh.readline()
+        assert "indicator_math:rsi_seed" in first
+        with open(result.speedscope_path) as fh:
+            document = json.load(fh)
+        profile = document["profiles"][0]
+        assert profile["type"] == "sampled"
+        assert len(profile["samples"]) == len(profile["weights"])
+
+    @pytest.mark.asyncio
+    async def test_profile_for_is_capped_at_the_maximum(self, tmp_path, monkeypatch):
+        profiler = SamplingProfiler(interval_ms=1, output_dir=str(tmp_path))
+        monkeypatch.setattr(SamplingProfiler, "MAX_DURATION_S", 0.05)
+
+        result = await asyncio.wait_for(profiler.profile_for(3600), timeout=5)
+
+        assert result is not None
+        assert result.duration_s < 1
+
+    def test_idle_when_off(self):
+        profiler = SamplingProfiler()
+        assert not profiler.is_running
+        assert profiler.stop() is None
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from src.services.notifications.digest_buffer import DigestBuffer
+from src.services.notifications.fanout_scheduler import (
+    PRIORITY_CRITICAL,
+    PRIORITY_NORMAL,
+)
+
+
+def _note(user_id, symbol, priority=PRIORITY_NORMAL):
+    return {
+        "user_id": user_id,
+        "symbol": symbol,
+        "timeframe": "1m",
+        "signal_type": "rsi_oversold_entry",
+        "price": 1.0,
+        "priority": priority,
+        "created_at_ms": 1000,
+        "message": symbol,
+    }
+
+
+class TestDigestBuffer:
+    @pytest.mark.asyncio
+    async def test_burst_merged_into_one_message(self):
+        sent = []
+
+        async def sink(note):
+            sent.append(note)
+
+        buffer = DigestBuffer(sink, window=0.05)
+        await asyncio.gather(
+            *(buffer.add(_note(1, s)) for s in ("BTCUSDT", "ETHUSDT", "SOLUSDT")),
+            buffer.add(_note(2, "BTCUSDT")),
+        )
+
+        by_user = {note["user_id"]: note for note in sent}
+        assert len(sent) == 2
+        assert by_user[1]["signals"] == 3
+        assert "3 signals" in by_user[1]["message"]
+        assert "ETHUSDT" in by_user[1]["message"]
+        assert by_user[2]["message"] == "BTCUSDT"
+        assert buffer.get_stats()["calls_saved"] == 2
+
+    @pytest.mark.asyncio
+    async def test_critical_flushes_immediately(self):
+        sent = []
+
+        async def sink(note):
+            sent.append(note)
+
+        buffer = DigestBuffer(sink, window=10)
+        normal = asyncio.create_task(buffer.add(_note(1, "BTCUSDT")))
+        await asyncio.sleep(0)
+        await buffer.add(_note(1, "ETHUSDT", priority=PRIORITY_CRITICAL))
+        await normal
+
+        assert len(sent) == 1
+        assert sent[0]["priority"] == PRIORITY_CRITICAL
+        assert buffer.get_pending_users() == 0
+
+    @pytest.mark.asyncio
+    async def test_add_waits_for_the_sink_and_raises_its_error(self):
+        async def sink(note):
+            raise ConnectionError("telegram down")
+
+        buffer = DigestBuffer(sink, window=0.01)
+        results = await asyncio.gather(
+            buffer.add(_note(1, "BTCUSDT")),
+            buffer.add(_note(1, "ETHUSDT")),
+            return_exceptions=True,
+        )
+
+        assert [type(r) for r in results] == [ConnectionError, ConnectionError]
+        assert buffer.get_pending_users() == 0
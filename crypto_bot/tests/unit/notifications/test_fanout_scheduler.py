@@ -0,0 +1,182 @@
+import asyncio
+import time
+
+import pytest
+from aiogram.exceptions import TelegramForbiddenError
+from aiogram.methods import SendMessage
+
+from src.services.notifications.delivery_engine import DeliveryEngine
+from src.services.notifications.fanout_scheduler import (
+    PRIORITY_CRITICAL,
+    PRIORITY_NORMAL,
+    FanoutScheduler,
+    priority_for_signal,
+)
+from src.services.notifications.notification_queue import NotificationQueue
+from src.utils.exceptions import DeliveryFailedError
+
+
+def _note(user_id, symbol, **extra):
+    return {
+        "user_id": user_id,
+        "symbol": symbol,
+        "timeframe": "1m",
+        "signal_type": "rsi_oversold_entry",
+        "message": symbol,
+        "created_at_ms": time.time() * 1000,
+        **extra,
+    }
+
+
+class TestFanoutScheduler:
+    async def _run(self, notes, count):
+        sent = []
+
+        async def send(chat_id, text):
+            sent.append((chat_id, text))
+
+        engine = DeliveryEngine(
+            send, global_rate=10_000, per_chat_rate=10_000, workers=1
+        )
+        scheduler = FanoutScheduler(engine, rate=1_000)
+        for note in notes:
+            await scheduler.submit(note)
+        await scheduler.start()
+        for _ in range(200):
+            if len(sent) == count:
+                break
+            await asyncio.sleep(0.01)
+        await scheduler.stop()
+        await engine.stop()
+        return scheduler, sent
+
+    def test_priority_from_criticality(self):
+        assert (
+            priority_for_signal({"signal_type": "rsi_oversold_entry", "rsi_value": 10})
+            == PRIORITY_CRITICAL
+        )
+        assert (
+            priority_for_signal({"signal_type": "rsi_oversold_entry", "rsi_value": 25})
+            == PRIORITY_NORMAL
+        )
+        assert (
+            priority_for_signal({"signal_type": "ema_golden_cross"})
+            == PRIORITY_CRITICAL
+        )
+
+    @pytest.mark.asyncio
+    async def test_fanouts_interleaved_and_critical_first(self):
+        notes = [_note(i, "BTCUSDT", rsi_value=25) for i in range(4)]
+        notes += [_note(100 + i, "ETHUSDT", rsi_value=25) for i in range(2)]
+        notes += [_note(200, "SOLUSDT", rsi_value=10)]
+
+        scheduler, sent = await self._run(notes, 7)
+
+        assert [text for _, text in sent] == [
+            "SOLUSDT",
+            "BTCUSDT",
+            "ETHUSDT",
+            "BTCUSDT",
+            "ETHUSDT",
+            "BTCUSDT",
+            "BTCUSDT",
+        ]
+        stats = scheduler.get_latency_stats()
+        assert stats[PRIORITY_CRITICAL]["count"] == 1
+        assert stats[PRIORITY_NORMAL]["count"] == 6
+        assert stats[PRIORITY_NORMAL]["p99_ms"] >= stats[PRIORITY_NORMAL]["p50_ms"]
+
+    @pytest.mark.asyncio
+    async def test_deliver_waits_for_the_send_and_raises_on_failure(self):
+        sent = []
+
+        async def send(chat_id, text):
+            if chat_id == 2:
+                raise ConnectionError("down")
+            if chat_id == 3:
+                method = SendMessage(chat_id=chat_id, text=text)
+                raise TelegramForbiddenError(method=method, message="blocked")
+            sent.append(chat_id)
+
+        engine = DeliveryEngine(
+            send, global_rate=10_000, per_chat_rate=10_000, workers=1, max_attempts=1
+        )
+        scheduler = FanoutScheduler(engine, rate=1_000)
+        await scheduler.start()
+        try:
+            result = await scheduler.deliver(_note(1, "BTCUSDT"))
+            assert result.success and sent == [1]
+            with pytest.raises(DeliveryFailedError):
+                await scheduler.deliver(_note(2, "BTCUSDT"))
+            # a blocked chat is final, not a reason to retry the queue entry
+            blocked = await scheduler.deliver(_note(3, "BTCUSDT"))
+            assert not blocked.success and not blocked.retriable
+        finally:
+            await scheduler.stop()
+            await engine.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_fails_deliveries_waiting_for_a_retry(self):
+        sent = []
+
+        async def send(chat_id, text):
+            sent.append(text)
+
+        engine = DeliveryEngine(send, global_rate=10_000, per_chat_rate=0.1)
+        scheduler = FanoutScheduler(engine, rate=1_000)
+        await scheduler.start()
+        try:
+            first = await scheduler.deliver(_note(1, "BTCUSDT"))
+            # the chat bucket is empty for 10s: re-queued after that delay
+            second = asyncio.ensure_future(scheduler.deliver(_note(1, "ETHUSDT")))
+            await asyncio.sleep(0.05)
+            await engine.stop()
+            with pytest.raises(DeliveryFailedError):
+                await asyncio.wait_for(second, timeout=1)
+        finally:
+            await scheduler.stop()
+            await engine.stop()
+
+        assert first.success and sent == ["BTCUSDT"]
+
+    @pytest.mark.asyncio
+    async def test_queued_small_fanout_is_not_starved_by_a_large_one(self, redis):
+        sent = []
+
+        async def send(chat_id, text):
+            sent.append(text)
+
+        engine = DeliveryEngine(
+            send, global_rate=10_000, per_chat_rate=10_000, workers=1
+        )
+        scheduler = FanoutScheduler(engine, rate=2_000)
+        queue = NotificationQueue(redis, consumer="a")
+        queue.BLOCK_MS = 10
+        for user_id in range(400):
+            await queue.add_real_time_notification(
+                _note(user_id, "BTCUSDT", priority=PRIORITY_NORMAL), PRIORITY_NORMAL
+            )
+        for user_id in range(1_000, 1_002):
+            await queue.add_real_time_notification(
+                _note(user_id, "ETHUSDT", priority=PRIORITY_NORMAL), PRIORITY_NORMAL
+            )
+
+        await scheduler.start()
+        await queue.start_workers(
+            scheduler.deliver, concurrency=2, max_in_flight=scheduler.MAX_BACKLOG
+        )
+        try:
+            for _ in range(300):
+                if len(sent) == 402 and not await queue.get_real_time_queue_size():
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await queue.stop_workers()
+            await scheduler.stop()
+            await engine.stop()
+
+        assert len(sent) == 402
+        # interleaved with the BTCUSDT fan-out queued ahead of it, not after it
+        last_eth = max(i for i, text in enumerate(sent) if text == "ETHUSDT")
+        assert last_eth < 100
+        assert sent[-1] == "BTCUSDT"
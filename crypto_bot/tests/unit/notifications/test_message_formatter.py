@@ -0,0 +1,41 @@
+from src.services.notifications.message_formatter import (
+    MessageFormatter,
+    RenderedSignal,
+)
+
+
+SIGNAL = {
+    "symbol": "BTCUSDT",
+    "timeframe": "1m",
+    "signal_type": "rsi_oversold_entry",
+    "price": 43000.0,
+    "processing_time_ms": 42,
+}
+
+
+class TestMessageFormatter:
+    def test_render_matches_legacy_format(self):
+        formatter = MessageFormatter()
+        for signal in (SIGNAL, {**SIGNAL, "signal_type": "ema_golden_cross"}):
+            rendered = formatter.render_signal(signal)
+            assert rendered.text == formatter.format_real_time_signal_message(signal)
+
+    def test_render_cached_per_signal_and_locale(self):
+        formatter = MessageFormatter()
+        first = formatter.render_signal(SIGNAL, "en")
+        assert formatter.render_signal(dict(SIGNAL), "en") is first
+        assert "Цена" in formatter.render_signal(SIGNAL, "ru").text
+
+        stats = formatter.get_render_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["size"] == 2
+        assert first.for_user() is first.text
+
+    def test_resolve_locale(self):
+        assert MessageFormatter.resolve_locale("ru-RU") == "ru"
+        assert MessageFormatter.resolve_locale("de") == "en"
+        assert MessageFormatter.resolve_locale(None) == "en"
+
+    def test_per_user_fields_substituted(self):
+        rendered = RenderedSignal("Hi $name", frozenset({"name"}))
+        assert rendered.for_user({"name": "Ann"}) == "Hi Ann"
@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+from src.services.notifications.notification_queue import NotificationQueue
+
+
+class TestNotificationQueue:
+    @pytest.mark.asyncio
+    async def test_priority_lanes_order(self, redis):
+        queue = NotificationQueue(redis, consumer="a")
+        await queue.add_real_time_notification({"user_id": 1}, priority=2)
+        await queue.add_real_time_notification({"user_id": 2}, priority=0)
+        await queue.add_real_time_notification({"user_id": 3}, priority=1)
+
+        seen = []
+
+        async def handler(item):
+            seen.append(item["user_id"])
+
+        assert await queue.process_notifications(handler) == 3
+        assert seen == [2, 3, 1]
+        assert await queue.get_real_time_queue_size() == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_notification_dead_lettered(self, redis):
+        queue = NotificationQueue(redis, consumer="a")
+        await queue.add_real_time_notification({"user_id": 1})
+        calls = 0
+
+        async def handler(item):
+            nonlocal calls
+            calls += 1
+            raise RuntimeError("boom")
+
+        await queue.process_notifications(handler)
+
+        assert calls == NotificationQueue.MAX_ATTEMPTS
+        assert await queue.get_real_time_queue_size() == 0
+        assert await queue.get_dead_letter_size() == 1
+
+    @pytest.mark.asyncio
+    async def test_pending_entries_reclaimed_from_dead_consumer(self, redis):
+        crashed = NotificationQueue(redis, consumer="crashed")
+        await crashed.add_real_time_notification({"user_id": 5})
+        assert len(await crashed._read(block_ms=None)) == 1  # never acked
+
+        survivor = NotificationQueue(redis, consumer="survivor")
+        assert await survivor.retry_failed_notifications(min_idle_ms=0) == 1
+
+        seen = []
+
+        async def handler(item):
+            seen.append(item["user_id"])
+
+        await survivor.process_notifications(handler)
+        assert seen == [5]
+
+    @pytest.mark.asyncio
+    async def test_worker_pool_delivers(self, redis):
+        queue = NotificationQueue(redis, consumer="a")
+        queue.BLOCK_MS = 50
+        delivered = []
+
+        async def handler(item):
+            delivered.append(item["user_id"])
+
+        await queue.start_workers(handler, concurrency=3)
+        for user_id in range(10):
+            await queue.add_real_time_notification({"user_id": user_id})
+        for _ in range(100):
+            if len(delivered) == 10:
+                break
+            await asyncio.sleep(0.02)
+        await queue.stop_workers()
+
+        assert sorted(delivered) == list(range(10))
+
+    @pytest.mark.asyncio
+    async def test_workers_reclaim_on_a_timer_not_per_read(self, redis):
+        crashed = NotificationQueue(redis, consumer="crashed")
+        await crashed.add_real_time_notification({"user_id": 5})
+        assert len(await crashed._read(block_ms=None)) == 1  # never acked
+
+        queue = NotificationQueue(redis, consumer="a")
+        queue.BLOCK_MS = 10
+        queue.CLAIM_IDLE_MS = 100
+        reclaims = 0
+        retry = queue.retry_failed_notifications
+
+        async def counting(min_idle_ms=None):
+            nonlocal reclaims
+            reclaims += 1
+            return await retry(min_idle_ms)
+
+        queue.retry_failed_notifications = counting
+        delivered = []
+
+        async def handler(item):
+            delivered.append(item["user_id"])
+
+        await queue.start_workers(handler, concurrency=3)
+        await asyncio.sleep(0.3)
+        await queue.stop_workers()
+
+        assert delivered == [5]
+        # one reclaim per CLAIM_IDLE_MS / 2, however many reads the workers did
+        assert 2 <= reclaims <= 6
+
+    @pytest.mark.asyncio
+    async def test_entries_in_flight_stay_claimed_until_delivered(self, redis):
+        queue = NotificationQueue(redis, consumer="a")
+        queue.CLAIM_IDLE_MS = 40
+        for user_id in (1, 2):
+            await queue.add_real_time_notification({"user_id": user_id})
+        started = []
+        release = asyncio.Event()
+
+        async def deliver(item):
+            started.append(item["user_id"])
+            await release.wait()
+
+        task = asyncio.create_task(queue.process_notifications(deliver))
+        await asyncio.sleep(0.1)
+
+        other = NotificationQueue(redis, consumer="b")
+        assert started == [1, 2]  # handled concurrently
+        assert await other.retry_failed_notifications(min_idle_ms=60) == 0
+        assert await queue.get_real_time_queue_size() == 2  # not acked yet
+
+        release.set()
+        assert await task == 2
+        assert await queue.get_real_time_queue_size() == 0
@@ -0,0 +1,99 @@
+import fakeredis
+import pytest
+import pytest_asyncio
+from src.services.signals.anti_spam import AntiSpamManager
+
+
+class TestAntiSpamManager:
+    @pytest_asyncio.fixture
+    async def anti_spam(self):
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        return AntiSpamManager(redis)
+
+    @pytest.mark.asyncio
+    async def test_batch_filter_records_sends(self, anti_spam):
+        users = [1, 2, 3]
+        allowed = await anti_spam.filter_allowed_users(
+            users, "BTCUSDT", "1m", "rsi_oversold_entry", rsi_value=25.0
+        )
+        assert allowed == users
+        # repeated signal within the interval is suppressed for everyone
+        allowed = await anti_spam.filter_allowed_users(
+            users + [4], "BTCUSDT", "1m", "rsi_oversold_entry", rsi_value=25.0
+        )
+        assert allowed == [4]
+        assert not await anti_spam.can_send_signal(
+            1, "BTCUSDT", "1m", "rsi_oversold_entry"
+        )
+
+    @pytest.mark.asyncio
+    async def test_batch_filter_critical_bypasses_interval(self, anti_spam):
+        await anti_spam.filter_allowed_users([1], "BTCUSDT", "1m", "rsi_oversold_entry")
+        allowed = await anti_spam.filter_allowed_users(
+            [1], "BTCUSDT", "1m", "rsi_oversold_entry", rsi_value=10.0
+        )
+        assert allowed == [1]
+
+    @pytest.mark.asyncio
+    async def test_batch_filter_empty(self, anti_spam):
+        assert await anti_spam.filter_allowed_users([], "BTCUSDT", "1m", "rsi") == []
+
+    @pytest.mark.asyncio
+    async def test_user_stats_from_single_hash(self, anti_spam):
+        await anti_spam.filter_allowed_users([1], "BTCUSDT", "1m", "rsi_oversold_entry")
+        await anti_spam.filter_allowed_users([1], "ETHUSDT", "5m", "ema_death_cross")
+        stats = await anti_spam.get_user_signal_stats(1)
+        assert stats == {
+            "BTCUSDT:1m:rsi_oversold_entry": 1,
+            "ETHUSDT:5m:ema_death_cross": 1,
+        }
+        assert await anti_spam.get_user_signal_stats(2) == {}
+
+    @pytest.mark.asyncio
+    async def test_cleanup_scans_incrementally(self, anti_spam):
+        anti_spam.CLEANUP_BATCH_SIZE = 1
+        await anti_spam.filter_allowed_users(
+            [1, 2, 3], "BTCUSDT", "1m", "rsi_oversold_entry"
+        )
+        visited = 0
+        for _ in range(10):
+            visited += await anti_spam.cleanup_old_records()
+            if await anti_spam._redis.get(anti_spam.CLEANUP_CURSOR_KEY) == "0":
+                break
+        assert visited >= 3
+
+    @pytest.mark.asyncio
+    async def test_hourly_cap_with_sliding_window(self, anti_spam):
+        anti_spam._get_signal_interval = lambda signal_type: 0
+        for _ in range(anti_spam.HOURLY_LIMIT):
+            await anti_spam.record_sent_signal(1, "BTCUSDT", "1m", "rsi_oversold_entry")
+        assert not await anti_spam.can_send_signal(
+            1, "BTCUSDT", "1m", "rsi_oversold_entry"
+        )
+        allowed = await anti_spam.filter_allowed_users(
+            [1, 2], "BTCUSDT", "1m", "rsi_oversold_entry"
+        )
+        assert allowed == [2]
+        assert await anti_spam._redis.hlen(anti_spam._build_key(1)) == 1
+
+    @pytest.mark.asyncio
+    async def test_negative_decisions_cached_locally(self, anti_spam):
+        await anti_spam.filter_allowed_users(
+            [1, 2], "BTCUSDT", "1m", "rsi_oversold_entry"
+        )
+        await anti_spam.filter_allowed_users(
+            [1, 2], "BTCUSDT", "1m", "rsi_oversold_entry"
+        )
+        anti_spam._redis_client = None  # any Redis access would now fail
+        anti_spam._filter_script = None
+        assert (
+            await anti_spam.filter_allowed_users(
+                [1, 2], "BTCUSDT", "1m", "rsi_oversold_entry"
+            )
+            == []
+        )
+        assert not await anti_spam.can_send_signal(
+            1, "BTCUSDT", "1m", "rsi_oversold_entry"
+        )
+        stats = anti_spam.get_decision_cache_stats()
+        assert stats["hits"] == 3 and stats["size"] == 2
@@ -0,0 +1,46 @@
+import pytest
+
+from src.services.signals.ema_signals import EMASignalGenerator
+
+
+class TestEMASignalGenerator:
+    @pytest.mark.asyncio
+    async def test_reads_crossover_and_trend_nodes(self):
+        generator = EMASignalGenerator()
+        indicators = {
+            "ema:9": 101.0,
+            "ema:21": 100.0,
+            "ema_cross:9:21": {"short": 101.0, "long": 100.0, "cross": "golden"},
+            "ema_cross:20:50": {"short": 99.0, "long": 100.0, "cross": None},
+            "trend:20:50:200": {
+                "direction": -1,
+                "changed": True,
+                "spread_percent": -2.0,
+            },
+        }
+
+        signals = await generator.process_ema_update_real_time(
+            "BTCUSDT", "1h", {20: 99.0, 50: 100.0}, 100.5, indicators
+        )
+
+        assert signals == [
+            {"signal_type": "ema_golden_cross", "periods": (9, 21)},
+            {
+                "signal_type": "ema_trend_bearish",
+                "periods": (20, 50, 200),
+                "spread_percent": -2.0,
+            },
+        ]
+
+    @pytest.mark.asyncio
+    async def test_tracks_default_pairs_without_engine(self):
+        generator = EMASignalGenerator()
+        await generator.process_ema_update_real_time(
+            "BTCUSDT", "1h", {20: 99.0, 50: 100.0}, 99.0
+        )
+
+        signals = await generator.process_ema_update_real_time(
+            "BTCUSDT", "1h", {20: 101.0, 50: 100.0}, 102.0
+        )
+
+        assert signals == [{"signal_type": "ema_golden_cross", "periods": (20, 50)}]
@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from src.services.topology.candle_stream import CandleStream, shard_for_symbol
+
+
+def _candle(symbol: str, close: str) -> dict:
+    return {
+        "symbol": symbol,
+        "timeframe": "1m",
+        "close_time": datetime(2024, 1, 1, tzinfo=timezone.utc),
+        "close_price": Decimal(close),
+        "is_closed": True,
+    }
+
+
+class TestCandleStream:
+    def test_shard_is_stable_and_spread(self):
+        symbols = [f"COIN{i}USDT" for i in range(200)]
+        shards = [shard_for_symbol(symbol, 4) for symbol in symbols]
+        assert shard_for_symbol("BTCUSDT", 4) == shard_for_symbol("BTCUSDT", 4)
+        assert set(shards) == {0, 1, 2, 3}
+        assert shard_for_symbol("BTCUSDT", 1) == 0
+
+    @pytest.mark.asyncio
+    async def test_symbols_routed_to_owner_in_order(self, redis):
+        stream = CandleStream(redis, shards=2)
+        symbols = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT"]
+        for close in ("1.5", "2.5", "3.5"):
+            for symbol in symbols:
+                await stream.process_websocket_data(_candle(symbol, close))
+
+        seen = {0: [], 1: []}
+        for shard in (0, 1):
+
+            async def handler(candle, shard=shard):
+                seen[shard].append((candle["symbol"], candle["close_price"]))
+
+            await stream.drain(shard, handler)
+
+        for shard, items in seen.items():
+            assert {s for s, _ in items} == {
+                s for s in symbols if shard_for_symbol(s, 2) == shard
+            }
+        btc = [
+            price
+            for symbol, price in seen[shard_for_symbol("BTCUSDT", 2)]
+            if symbol == "BTCUSDT"
+        ]
+        assert btc == ["1.5", "2.5", "3.5"]
+        assert float(btc[0]) == 1.5
+        assert await stream.get_backlog() == {0: 0, 1: 0}
+
+    @pytest.mark.asyncio
+    async def test_restarted_consumer_replays_unacked(self, redis):
+        stream = CandleStream(redis, shards=1)
+        await stream.publish(_candle("BTCUSDT", "1"))
+        await stream._ensure_group(stream.stream(0))
+        # a worker read the entry and died before acknowledging it
+        await redis.xreadgroup(stream.GROUP, "shard-0", {stream.stream(0): ">"})
+
+        seen = []
+
+        async def handler(candle):
+            seen.append(candle["close_price"])
+
+        assert await stream.drain(0, handler) == 1
+        assert seen == ["1"]
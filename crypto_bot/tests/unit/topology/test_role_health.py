@@ -0,0 +1,43 @@
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.services.monitoring.metrics_exporter import MetricsExporter
+from src.services.topology.health import RoleHeartbeat, get_cluster_health
+from src.utils.metrics_registry import MetricsRegistry
+
+
+class TestRoleHealth:
+    @pytest.mark.asyncio
+    async def test_heartbeats_grouped_by_role(self, redis):
+        beats = [
+            RoleHeartbeat("compute", "1", redis=redis, stats_func=lambda: {"shard": 1}),
+            RoleHeartbeat("compute", "0", redis=redis),
+            RoleHeartbeat("delivery", redis=redis),
+        ]
+        for beat in beats:
+            await beat.start()
+
+        roles = await get_cluster_health(redis)
+        assert sorted(roles) == ["compute", "delivery"]
+        assert [r["instance"] for r in roles["compute"]] == ["0", "1"]
+        assert roles["compute"][1]["stats"] == {"shard": 1}
+        assert 0 < await redis.ttl(beats[0].key) <= 15
+
+        await beats[2].stop()
+        assert "delivery" not in await get_cluster_health(redis)
+        for beat in beats[:2]:
+            await beat.stop()
+
+    @pytest.mark.asyncio
+    async def test_health_endpoint(self, redis):
+        await RoleHeartbeat("ingest", redis=redis).beat()
+
+        async def health():
+            return await get_cluster_health(redis)
+
+        exporter = MetricsExporter(MetricsRegistry(), health_func=health)
+        async with TestClient(TestServer(exporter.make_app())) as client:
+            response = await client.get("/health")
+            assert response.status == 200
+            body = await response.json()
+        assert body["ingest"][0]["pid"] > 0
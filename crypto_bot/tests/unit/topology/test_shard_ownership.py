@@ -0,0 +1,135 @@
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.services.topology.shard_ownership import HashRing, ShardCoordinator
+from src.services.websocket.stream_manager import StreamManager
+
+SYMBOLS = [f"COIN{i}USDT" for i in range(200)]
+
+
+class TestHashRing:
+    def test_removing_member_moves_only_its_symbols(self):
+        before = HashRing(["a", "b", "c"])
+        after = HashRing(["a", "c"])
+        owners = {s: before.owner(s) for s in SYMBOLS}
+        assert set(owners.values()) == {"a", "b", "c"}
+        for symbol, owner in owners.items():
+            if owner != "b":
+                assert after.owner(symbol) == owner
+
+
+class TestShardCoordinator:
+    @pytest.mark.asyncio
+    async def test_replicas_split_symbols_and_take_over_on_death(self, redis):
+        a = ShardCoordinator("a", lease_ttl=0.3, redis=redis)
+        b = ShardCoordinator("b", lease_ttl=0.3, redis=redis)
+        await a.sync()
+        await b.sync()
+        await a.sync()  # leader publishes both members
+        await b.sync()
+        assert a.is_leader and not b.is_leader
+        assert a.members == b.members == ["a", "b"]
+
+        owned_a = await a.claim(SYMBOLS)
+        owned_b = await b.claim(SYMBOLS)
+        assert owned_a and owned_b
+        assert not owned_a & owned_b
+        assert owned_a | owned_b == set(SYMBOLS)
+
+        # "a" dies without releasing anything; its leases run out
+        await asyncio.sleep(0.35)
+        assert await b.sync()
+        assert b.is_leader and b.members == ["b"]
+        assert await b.claim(SYMBOLS) == set(SYMBOLS)
+
+    @pytest.mark.asyncio
+    async def test_new_owner_waits_for_previous_lease(self, redis):
+        a = ShardCoordinator("a", redis=redis)
+        await a.sync()
+        assert await a.claim(SYMBOLS) == set(SYMBOLS)
+
+        b = ShardCoordinator("b", redis=redis)
+        await b.sync()
+        await a.sync()
+        await b.sync()
+        moving = {s for s in SYMBOLS if b.owner_of(s) == "b"}
+        assert await b.claim(SYMBOLS) == set()  # still leased by "a"
+
+        assert await a.claim(SYMBOLS) == set(SYMBOLS) - moving
+        assert await b.claim(SYMBOLS) == moving
+
+    @pytest.mark.asyncio
+    async def test_unrenewable_leases_are_dropped_before_they_expire(self, redis):
+        a = ShardCoordinator("a", lease_ttl=0.3, redis=redis)
+        changed = AsyncMock()
+        a.on_change(changed)
+        await a.start()
+        assert await a.claim(SYMBOLS) == set(SYMBOLS)
+
+        # Redis becomes unreachable for this replica
+        a._redis_client = MagicMock()
+        a._redis_client.set = AsyncMock(side_effect=ConnectionError("partitioned"))
+        await asyncio.sleep(0.35)
+
+        assert a.owned_symbols == set()
+        changed.assert_awaited()
+        # without a ring, claiming needs no Redis: streams can be dropped
+        assert await a.claim(SYMBOLS) == set()
+        a._redis_client = redis
+        await a.stop()
+
+
+class TestStreamManagerSharding:
+    @pytest.mark.asyncio
+    async def test_subscribes_owned_and_unsubscribes_moved(self):
+        repository = MagicMock()
+        repository.get_active_symbols = AsyncMock(return_value=["BTCUSDT", "ETHUSDT"])
+
+        @asynccontextmanager
+        async def sessionmaker():
+            yield None
+
+        coordinator = MagicMock()
+        coordinator.claim = AsyncMock(return_value={"BTCUSDT", "ETHUSDT"})
+        manager = StreamManager(
+            sessionmaker, repository, MagicMock(), MagicMock(), coordinator
+        )
+        manager.websocket = AsyncMock()
+
+        await manager.update_subscriptions()
+        assert manager.active_streams == {
+            "btcusdt@ticker",
+            "btcusdt@kline_1m",
+            "ethusdt@ticker",
+            "ethusdt@kline_1m",
+        }
+
+        coordinator.claim.return_value = {"BTCUSDT"}
+        await manager.update_subscriptions()
+        manager.websocket.unsubscribe_from_streams.assert_awaited_once_with(
+            ["ethusdt@kline_1m", "ethusdt@ticker"]
+        )
+        assert manager.active_streams == {"btcusdt@ticker", "btcusdt@kline_1m"}
+
+    @pytest.mark.asyncio
+    async def test_added_symbol_is_streamed_only_with_its_lease(self):
+        coordinator = MagicMock()
+        coordinator.owned_symbols = {"BTCUSDT"}
+        coordinator.claim = AsyncMock(return_value={"BTCUSDT"})
+        manager = StreamManager(
+            MagicMock(), MagicMock(), MagicMock(), MagicMock(), coordinator
+        )
+        manager.websocket = AsyncMock()
+
+        await manager.add_symbol_stream("ETHUSDT", ["1m"])
+        coordinator.claim.assert_awaited_once_with({"BTCUSDT", "ETHUSDT"})
+        manager.websocket.subscribe_to_streams.assert_not_awaited()
+
+        coordinator.claim.return_value = {"BTCUSDT", "ETHUSDT"}
+        await manager.add_symbol_stream("ETHUSDT", ["1m"])
+        manager.websocket.subscribe_to_streams.assert_awaited_once_with(
+            ["ethusdt@ticker", "ethusdt@kline_1m"]
+        )
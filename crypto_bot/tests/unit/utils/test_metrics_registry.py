@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from src.utils.metrics_registry import Histogram, MetricsRegistry
+
+
+class TestHistogram:
+    def test_percentiles_within_precision(self):
+        values = np.random.default_rng(1).lognormal(mean=2.0, sigma=1.0, size=50_000)
+        hist = Histogram()
+        for value in values:
+            hist.record(float(value))
+
+        for q in (50, 95, 99):
+            expected = float(np.percentile(values, q, method="inverted_cdf"))
+            assert hist.percentile(q) == pytest.approx(expected, rel=0.01)
+        assert hist.count == len(values)
+        assert hist.max == pytest.approx(values.max())
+
+    def test_memory_is_fixed(self):
+        hist = Histogram()
+        buckets = len(hist.snapshot().counts)
+        for value in range(100_000):
+            hist.record(value * 0.37)
+        assert len(hist.snapshot().counts) == buckets
+
+    def test_snapshots_merge(self):
+        first, second = Histogram(), Histogram()
+        for value in range(1, 101):
+            first.record(value)
+            second.record(value + 100)
+        merged = first.snapshot().merge(second.snapshot())
+        assert merged.count == 200
+        assert merged.min == 1 and merged.max == 200
+        assert merged.percentile(50) == pytest.approx(100, rel=0.01)
+
+    def test_registry_labels(self):
+        registry = MetricsRegistry()
+        a = registry.histogram("op_ms", {"operation": "rsi"})
+        assert registry.histogram("op_ms", {"operation": "rsi"}) is a
+        assert registry.histogram("op_ms", {"operation": "ema"}) is not a
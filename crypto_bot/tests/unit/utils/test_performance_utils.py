@@ -0,0 +1,37 @@
+from src.benchmarks.timing_overhead import overhead_ns
+from src.utils.performance_utils import (
+    DECORATOR_OVERHEAD_BUDGET_NS,
+    TimingContext,
+    detect_performance_regression,
+    measure_time,
+    monitor_real_time_performance,
+)
+
+
+def _sub_ms_work() -> int:
+    return sum(range(200))
+
+
+class TestTimingResolution:
+    def test_sub_millisecond_work_is_not_rounded_to_zero(self):
+        with TimingContext("sub_ms", target_ms=1) as timer:
+            _sub_ms_work()
+        assert isinstance(timer.elapsed_ms, float)
+        assert 0 < timer.elapsed_ms < 1
+        assert timer.elapsed_ns > 0
+
+        timed = measure_time()(_sub_ms_work)
+        timed()
+        assert 0 < timed.last_elapsed_ms < 1
+        assert timed.last_elapsed_ns == int(timed.last_elapsed_ns)
+
+    def test_regression_detection_uses_fractional_ms(self):
+        assert detect_performance_regression([0.20, 0.22, 0.21], 0.3)
+        assert not detect_performance_regression([0.20, 0.22, 0.21], 0.2)
+
+    def test_decorator_overhead_within_budget(self):
+        assert overhead_ns(measure_time(), 20_000) < DECORATOR_OVERHEAD_BUDGET_NS
+        assert (
+            overhead_ns(monitor_real_time_performance("test_overhead"), 20_000)
+            < DECORATOR_OVERHEAD_BUDGET_NS
+        )
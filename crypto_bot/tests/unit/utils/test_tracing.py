@@ -0,0 +1,59 @@
+import asyncio
+import json
+import time
+
+import orjson
+import pytest
+
+from src.config.binance_config import BinanceConfig
+from src.services.websocket.binance_websocket import BinanceWebSocketClient
+from src.utils.metrics_registry import MetricsRegistry
+from src.utils.tracing import JsonlTraceExporter, Tracer, tracer
+
+
+class TestTracing:
+    @pytest.mark.asyncio
+    async def test_trace_follows_spawned_tasks(self, tmp_path):
+        tracer.reset()
+        path = tmp_path / "traces.jsonl"
+        tracer.add_exporter(JsonlTraceExporter(path))
+        done = asyncio.Event()
+
+        async def downstream():
+            with tracer.span("indicators"):
+                await asyncio.sleep(0)
+            tracer.finish()
+            done.set()
+
+        async def handler(data):
+            asyncio.create_task(downstream())
+
+        client = BinanceWebSocketClient(BinanceConfig(), handler)
+        event_time = int(time.time() * 1000) - 50
+        try:
+            await client.handle_message(
+                json.dumps({"e": "kline", "E": event_time, "k": {}})
+            )
+            await asyncio.wait_for(done.wait(), 1)
+        finally:
+            tracer.clear_exporters()
+
+        trace = orjson.loads(path.read_bytes().splitlines()[0])
+        assert trace["event_time_ms"] == event_time
+        assert [span["name"] for span in trace["spans"]] == [
+            "websocket_handle",
+            "indicators",
+        ]
+        stats = tracer.get_stage_stats()
+        assert stats["exchange_to_receive"]["p50_ms"] >= 50
+        assert {"websocket_handle", "indicators", "pipeline_total"} <= set(stats)
+
+    def test_stages_recorded_in_registry(self):
+        registry = MetricsRegistry()
+        local = Tracer(registry)
+        for value in range(1, 101):
+            local.record("stage", float(value))
+        stats = local.get_stage_stats()["stage"]
+        assert stats["count"] == 100
+        assert stats["max_ms"] == 100.0
+        assert registry.histogram("pipeline_stage_ms", {"stage": "stage"}).count == 100